@@ -0,0 +1,55 @@
+"""added hot path indexes
+
+Revision ID: c932520b4d2f
+Revises: 04fc1d527be0
+Create Date: 2026-10-18 09:18:17.317278
+
+Indexes the lookups made on every request of their route: the attempts of a user
+(`GET /quiz/attempts`), the answers of an attempt, and users by case-insensitive email (`/login`,
+`/register`, user imports). MCQs by category are already served by `ix_mcq_category_id`. The answers
+referring to an MCQ are indexed too, as deleting an MCQ otherwise scans all answers for its
+foreign key check.
+
+The indexes are built CONCURRENTLY, outside the migration transaction, so the tables stay writable
+while they build. A concurrent build that fails leaves an invalid index behind; it is dropped and
+rebuilt when the migration is run again.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c932520b4d2f'
+down_revision: Union[str, None] = '04fc1d527be0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HOT_PATH_INDEXES = (
+    ('ix_attempt_questions_attempt_id', 'attempt_questions', ['attempt_id']),
+    ('ix_attempt_questions_question_id', 'attempt_questions', ['question_id']),
+    ('ix_quiz_attempts_user_id', 'quiz_attempts', ['user_id']),
+    ('ix_users_email_lower', 'users', [sa.literal_column('lower(email)')]),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        for name, table, columns in HOT_PATH_INDEXES:
+            invalid = connection.execute(sa.text(
+                "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+                "WHERE pg_class.relname = :name AND NOT pg_index.indisvalid"
+            ), {"name": name}).first()
+            if invalid:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+            op.create_index(name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(HOT_PATH_INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -1,13 +1,43 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 
-#from src.app.middlewares import store_request_logs
+from src.app.build_db import IS_SQLITE, async_engine, create_sqlite_schema, get_pool_status
+from src.app.common.attempt_ids import get_attempt_id_generator
+from src.app.common.password_pool import PASSWORD_POOL, shutdown_import_hash_pool
+from src.app.common.utils import auth_cache_stats
+from src.app.config import settings
+from src.app.middlewares.request_logs import REQUEST_LOGS, RequestLogMiddleware
+from src.app.repositories.mcq_repository import ANSWER_KEY_CACHE, CATEGORY_ID_CACHE
+from src.app.repositories.quiz_session_repository import ATTEMPT_STATE_CACHE
 from src.app.routes.mcq_routes import mcq_blueprint
 from src.app.routes.category_routes import category_blueprint
 from src.app.routes.user_routes import user_blueprint
 from src.app.orm.mcq_orm import start_mappers
 from src.app.routes.quiz_routes import quiz_blueprint
+from src.app.services.quiz_services import expire_quiz_sessions
 
-mcq_app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # fail startup, not the first quiz, on a missing or invalid attempt id configuration
+    get_attempt_id_generator()
+    if IS_SQLITE:
+        create_sqlite_schema()
+    if settings.REQUEST_LOGS_ENABLED:
+        REQUEST_LOGS.start()
+    quiz_session_cleanup = asyncio.create_task(expire_quiz_sessions(settings.QUIZ_SESSION_CLEANUP_INTERVAL_SECONDS))
+    yield
+    quiz_session_cleanup.cancel()
+    with suppress(asyncio.CancelledError):
+        await quiz_session_cleanup
+    await REQUEST_LOGS.stop()
+    shutdown_import_hash_pool()
+    # release pooled async connections on the event loop that opened them
+    await async_engine.dispose()
+
+
+mcq_app = FastAPI(lifespan=lifespan)
 
 start_mappers()
 
@@ -16,6 +46,46 @@ mcq_app.include_router(category_blueprint)
 mcq_app.include_router(user_blueprint)
 mcq_app.include_router(quiz_blueprint)
 
+if settings.REQUEST_LOGS_ENABLED:
+    mcq_app.add_middleware(RequestLogMiddleware)
+
 @mcq_app.get("/")
 async def root():
     return {"message": "Welcome, MCQ App is running now...."}
+
+
+@mcq_app.get("/health/db-pool")
+async def db_pool_status():
+    """
+    Connection pool occupancy, overflow and checkout wait times of this worker.
+    """
+    return get_pool_status()
+
+
+@mcq_app.get("/health/caches")
+async def cache_status():
+    """
+    Size and hit/miss counters of the in-process caches of this worker.
+    """
+    return {
+        "answer_keys": ANSWER_KEY_CACHE.stats(),
+        "category_ids": CATEGORY_ID_CACHE.stats(),
+        "attempt_state": ATTEMPT_STATE_CACHE.stats(),
+        "auth_principals": auth_cache_stats(),
+    }
+
+
+@mcq_app.get("/health/password-pool")
+async def password_pool_status():
+    """
+    Queue depth, rejections and wait times of this worker's password hashing pool.
+    """
+    return PASSWORD_POOL.describe()
+
+
+@mcq_app.get("/health/request-logs")
+async def request_log_status():
+    """
+    Queue depth and written, dropped and failed record counts of this worker's request log writer.
+    """
+    return REQUEST_LOGS.describe()
@@ -1,7 +1,17 @@
-from sqlalchemy import create_engine, text
+import dataclasses
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, event, insert, make_url, select, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from src.app.config import settings
+from src.app.orm.mcq_orm import metadata, role
 
 
 DATABASE_URL = (
@@ -9,9 +19,145 @@ DATABASE_URL = (
         f"{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
     )
 
-engine = create_engine(DATABASE_URL, echo=True)
+ASYNC_DATABASE_URL = (
+        f"postgresql+asyncpg://{settings.DB_USER}:{settings.DB_PASSWORD}@"
+        f"{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+    )
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+# named in-memory SQLite database shared by all connections of the process (the memdb VFS keeps
+# SQLite's usual locking, so concurrent transactions wait for each other instead of failing)
+SQLITE_MEMORY_DATABASE = "file:/mcq-app?vfs=memdb"
+
+# open connection to the in-memory SQLite database, which is freed with its last connection
+MEMORY_DATABASE_KEEPER = None
+
+if settings.DATABASE_URL:
+    database_url = make_url(settings.DATABASE_URL)
+    if database_url.get_backend_name() not in ASYNC_DRIVERS:
+        raise ValueError(f"Unsupported DATABASE_URL backend {database_url.get_backend_name()!r}")
+    if database_url.get_backend_name() == "sqlite" and database_url.database in (None, "", ":memory:"):
+        # every connection to ":memory:" opens its own empty database, so both engines and all their
+        # pooled connections share one named in-memory database instead
+        database_url = make_url(f"sqlite:///{SQLITE_MEMORY_DATABASE}&uri=true")
+        MEMORY_DATABASE_KEEPER = sqlite3.connect(SQLITE_MEMORY_DATABASE, uri=True, check_same_thread=False)
+    DATABASE_URL = database_url.render_as_string(hide_password=False)
+    ASYNC_DATABASE_URL = database_url.set(
+        drivername=ASYNC_DRIVERS[database_url.get_backend_name()]).render_as_string(hide_password=False)
+
+IS_SQLITE = make_url(DATABASE_URL).get_backend_name() == "sqlite"
+# the in-memory database lives in this process, so it never has more than one worker
+IS_SQLITE_MEMORY = MEMORY_DATABASE_KEEPER is not None
+
+
+@dataclasses.dataclass
+class PoolStats:
+    """
+    Cumulative checkout counters for one connection pool.
+    """
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_time_total: float = 0.0
+    wait_time_max: float = 0.0
+    _lock: threading.Lock = dataclasses.field(default_factory=threading.Lock, repr=False)
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    pass
+
 
-DEFAULT_SESSION_FACTORY = sessionmaker(bind=create_engine(DATABASE_URL), autocommit=False, autoflush=False)
+def engine_options(poolclass, statement_timeout_args: dict) -> dict:
+    """
+    Engine keyword arguments shared by the sync and async engines, built from MCQAppSettings.
+    """
+    options = {
+        "echo": settings.DB_ECHO,
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if IS_SQLITE:
+        # pooled connections are used by whichever thread checks them out
+        options["connect_args"] = {"check_same_thread": False}
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"] = statement_timeout_args
+    return options
+
+
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite only enforces foreign keys when asked to, per connection
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys = ON")
+    cursor.close()
+
+
+engine = create_engine(
+    DATABASE_URL,
+    **engine_options(InstrumentedQueuePool,
+                     {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"})
+)
+
+DEFAULT_SESSION_FACTORY = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **engine_options(InstrumentedAsyncQueuePool,
+                     {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}})
+)
+
+# expire_on_commit is disabled because async sessions cannot lazy-load expired attributes
+# once the request handler has moved on from the awaited commit.
+DEFAULT_ASYNC_SESSION_FACTORY = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+if IS_SQLITE:
+    event.listen(engine, "connect", enable_sqlite_foreign_keys)
+    event.listen(async_engine.sync_engine, "connect", enable_sqlite_foreign_keys)
+
+
+def create_sqlite_schema():
+    """
+    Create the tables, and the admin and user roles, on a SQLite database (see DATABASE_URL).
+    Alembic migrations are PostgreSQL-only; existing tables and roles are left as they are.
+    """
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        if conn.execute(select(role.c.id)).first() is None:
+            conn.execute(insert(role), [
+                {"id": 1, "role_name": "admin", "created_date": datetime.now()},
+                {"id": 2, "role_name": "user", "created_date": datetime.now()},
+            ])
 
 
 def build_postgresql_engine():
@@ -111,5 +257,38 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with DEFAULT_ASYNC_SESSION_FACTORY() as db:
+        yield db
+
+
+def describe_pool(pool) -> dict:
+    """
+    Point-in-time occupancy and cumulative wait statistics of a connection pool.
+    """
+    stats = pool.stats
+    return {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "avg_wait_ms": round(stats.wait_time_total / stats.checkouts * 1000, 3) if stats.checkouts else 0.0,
+        "max_wait_ms": round(stats.wait_time_max * 1000, 3),
+    }
+
+
+def get_pool_status() -> dict:
+    """
+    Pool statistics of both engines of this worker process.
+    """
+    return {
+        "sync": describe_pool(engine.pool),
+        "async": describe_pool(async_engine.sync_engine.pool),
+    }
+
+
 if __name__ == "__main__":
     build_postgresql_engine()
@@ -0,0 +1,119 @@
+import abc
+import logging
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app.build_db import IS_SQLITE_MEMORY, async_engine
+from src.app.common.constants import ATTEMPT_ID_SEQUENCE, ATTEMPT_ID_SEQUENCE_BLOCK
+from src.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# snowflake layout: milliseconds since ATTEMPT_ID_EPOCH_MS | node | counter, 53 bits in total so the
+# ids stay exact as JSON numbers in JavaScript clients
+ATTEMPT_ID_EPOCH_MS = 1_735_689_600_000  # 2025-01-01T00:00:00Z
+ATTEMPT_ID_NODE_BITS = 6
+ATTEMPT_ID_COUNTER_BITS = 6
+
+
+class AttemptIdGenerator(abc.ABC):
+    """
+    Source of quiz attempt ids that are unique across workers without checking existing attempts.
+    """
+    @abc.abstractmethod
+    async def next_id(self, session: AsyncSession) -> int:
+        raise NotImplementedError
+
+
+class SequenceAttemptIdGenerator(AttemptIdGenerator):
+    """
+    Attempt ids from a database sequence. The sequence steps by `ATTEMPT_ID_SEQUENCE_BLOCK`, so each
+    `nextval` reserves a block of ids that this worker hands out without further round trips.
+    """
+    def __init__(self, block_size: int = ATTEMPT_ID_SEQUENCE_BLOCK):
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0
+
+    async def next_id(self, session: AsyncSession) -> int:
+        if self._next >= self._end:
+            start = (await session.execute(text(f"SELECT nextval('{ATTEMPT_ID_SEQUENCE}')"))).scalar_one()
+            # a concurrent request may have replaced the block meanwhile; the ids left in it are skipped
+            self._next, self._end = start, start + self.block_size
+        attempt_id = self._next
+        self._next += 1
+        return attempt_id
+
+
+class SnowflakeAttemptIdGenerator(AttemptIdGenerator):
+    """
+    Attempt ids built from the time, a node id and a per-millisecond counter, without any database
+    access. Every worker process needs its own node id (0 to 63). Up to 64 ids per millisecond are
+    handed out per node; past that, or while the clock is behind the last id, the ids are taken from
+    the following milliseconds instead of waiting for the clock, so no call blocks the event loop.
+    """
+    def __init__(self, node_id: int):
+        if not 0 <= node_id < 1 << ATTEMPT_ID_NODE_BITS:
+            raise ValueError(f"Attempt id node must be between 0 and {(1 << ATTEMPT_ID_NODE_BITS) - 1}")
+        self.node_id = node_id
+        self._last_ms = 0
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    async def next_id(self, session: AsyncSession) -> int:
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms, self._counter = now_ms, 0
+            elif self._counter + 1 < 1 << ATTEMPT_ID_COUNTER_BITS:
+                self._counter += 1
+            else:
+                # never step back in time, even if the clock does
+                self._last_ms, self._counter = self._last_ms + 1, 0
+            return ((self._last_ms - ATTEMPT_ID_EPOCH_MS) << (ATTEMPT_ID_NODE_BITS + ATTEMPT_ID_COUNTER_BITS)
+                    | self.node_id << ATTEMPT_ID_COUNTER_BITS | self._counter)
+
+
+def build_attempt_id_generator() -> AttemptIdGenerator:
+    """
+    The attempt id generator selected by ATTEMPT_ID_GENERATOR. Databases without sequences (SQLite)
+    always use snowflake ids. Snowflake ids need ATTEMPT_ID_NODE_ID, distinct per worker process;
+    without it the app refuses to start rather than risk two workers handing out the same ids. An
+    in-memory SQLite database is only reachable from its own process, so there the node defaults to 0.
+    """
+    generator = settings.ATTEMPT_ID_GENERATOR
+    if generator not in ("sequence", "snowflake"):
+        raise ValueError(f"Unknown ATTEMPT_ID_GENERATOR {generator!r}")
+    if generator == "sequence" and not async_engine.dialect.supports_sequences:
+        logger.info(f"{async_engine.dialect.name} has no sequences, attempt ids are snowflake ids")
+        generator = "snowflake"
+
+    if generator == "sequence":
+        return SequenceAttemptIdGenerator()
+    node_id = settings.ATTEMPT_ID_NODE_ID
+    if node_id is None and IS_SQLITE_MEMORY:
+        node_id = 0
+    if node_id is None:
+        raise ValueError(f"Snowflake attempt ids on {async_engine.dialect.name} need ATTEMPT_ID_NODE_ID, "
+                         f"a node id between 0 and {(1 << ATTEMPT_ID_NODE_BITS) - 1} distinct per worker process")
+    return SnowflakeAttemptIdGenerator(node_id)
+
+
+# the worker's attempt id generator, built on first use so a configuration error fails app startup
+# (the lifespan asks for it) rather than every import of this module
+_ATTEMPT_IDS: AttemptIdGenerator | None = None
+_ATTEMPT_IDS_LOCK = threading.Lock()
+
+
+def get_attempt_id_generator() -> AttemptIdGenerator:
+    """
+    The worker's attempt id generator, shared by all requests.
+    """
+    global _ATTEMPT_IDS
+    with _ATTEMPT_IDS_LOCK:
+        if _ATTEMPT_IDS is None:
+            _ATTEMPT_IDS = build_attempt_id_generator()
+        return _ATTEMPT_IDS
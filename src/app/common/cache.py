@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU cache whose entries also expire after a time-to-live.
+
+    Entries are evicted least-recently-used first once `max_entries` is reached, or once the
+    estimated size of all values exceeds `max_bytes` when a `sizeof` function is given. The
+    cache is local to the worker process, so it must only hold data that can be rebuilt from
+    the database.
+    """
+    def __init__(self, max_entries: int, ttl_seconds: float, max_bytes: int | None = None, sizeof=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sizeof = sizeof or (lambda value: 0)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for `key`, or `default` when it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl_seconds: float | None = None):
+        """
+        Store `value` under `key`, evicting the least recently used entries if the cache is full.
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        size = self._sizeof(value)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self.size_bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or
+                                     (self.max_bytes is not None and self.size_bytes > self.max_bytes)):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        """
+        Remove `key` from the cache and return its value.
+        """
+        with self._lock:
+            entry = self._remove(key)
+            return entry[0] if entry else default
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self.size_bytes -= entry[2]
+        return entry
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
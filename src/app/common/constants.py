@@ -1,2 +1,7 @@
 REQUEST_LOGS_TABLE_NAME = "fastapi_mcq_request_logs"
-LOCAL = "local"
\ No newline at end of file
+LOCAL = "local"
+QUIZ_QUESTION_COUNT = 25
+UPLOAD_SIMILAR_QUESTIONS_PER_ROW = 5
+ATTEMPT_ID_SEQUENCE = "quiz_attempt_id_seq"
+ATTEMPT_ID_SEQUENCE_BLOCK = 100  # the sequence's increment, ids reserved per nextval
+ATTEMPT_ID_SEQUENCE_START = 1_000_000  # above the 6-digit random ids handed out before
@@ -0,0 +1,213 @@
+import ast
+import itertools
+import re
+
+import numpy as np
+import pandas as pd
+
+from src.app.common.similarity import question_lsh_buckets_many
+from src.app.entities.mcq import build_normalized_fingerprint
+from src.app.schemas.mcq_schema import MCQCreate
+
+# a list in the exact form `repr` writes it for strings without quotes or backslashes, e.g. ['Paris', 'London']
+REPR_LIST_PATTERN = r"\['[^'\\\n]*'(?:, '[^'\\\n]*')*\]"
+# a list literal of plain quoted strings, e.g. [ "Paris",'London', ]; everything else takes the slow path
+SIMPLE_LIST_PATTERN = r"""\s*\[\s*(?:(?:'[^'\\\n]*'|"[^"\\\n]*")\s*(?:,\s*(?:'[^'\\\n]*'|"[^"\\\n]*")\s*)*,?\s*)?\]\s*"""
+SIMPLE_ITEM_RE = re.compile(r"""'([^'\\\n]*)'|"([^"\\\n]*)\"""")
+
+
+def parse_list_literal(text):
+    """
+    Safely parse a Python literal, raising the exceptions `eval` would raise for malformed input.
+
+    Only literals are accepted (`ast.literal_eval`); names, calls and other expressions are rejected
+    with a ValueError instead of being executed.
+    """
+    if not isinstance(text, str):
+        raise TypeError("eval() arg 1 must be a string, bytes or code object")
+    # eval ignores leading spaces and tabs, parse the same way and with the same file name in errors
+    tree = ast.parse(text.lstrip(" \t"), filename="<string>", mode="eval")
+    try:
+        return ast.literal_eval(tree)
+    except ValueError:
+        raise ValueError(f"not a literal: {text.strip()}") from None
+
+
+def parse_list_column(cells: pd.Series) -> tuple[pd.Series, pd.Series, pd.Series]:
+    """
+    Parse a column of list literals. Cells in the common `['a', 'b']` form are split with vectorized
+    string operations, the rest one by one with `parse_list_literal`.
+
+    Returns the parsed values, the error message of the cells that could not be parsed (None where
+    parsing succeeded) and whether a cell took the fast path (and so holds a list of strings), all
+    aligned with `cells`.
+    """
+    values = [None] * len(cells)
+    errors = [None] * len(cells)
+
+    # the common `repr` form splits on its fixed separator, other plain lists go through a regex
+    in_repr_form = cells.str.fullmatch(REPR_LIST_PATTERN, na=False).to_numpy(dtype=bool)
+    if in_repr_form.any():
+        items = cells[in_repr_form].str.slice(2, -2).str.split("', '")
+        for position, cell in zip(np.flatnonzero(in_repr_form), items):
+            values[position] = cell
+
+    simple = in_repr_form.copy()
+    simple[~in_repr_form] = cells[~in_repr_form].str.fullmatch(SIMPLE_LIST_PATTERN, na=False).to_numpy(dtype=bool)
+    in_simple_form = simple & ~in_repr_form
+    if in_simple_form.any():
+        items = cells[in_simple_form].str.findall(SIMPLE_ITEM_RE)
+        for position, cell in zip(np.flatnonzero(in_simple_form), items):
+            values[position] = [single or double for single, double in cell]
+
+    for position in np.flatnonzero(~simple):
+        try:
+            values[position] = parse_list_literal(cells.iat[position])
+        except Exception as e:
+            errors[position] = str(e)
+    return (pd.Series(values, index=cells.index, dtype=object), pd.Series(errors, index=cells.index, dtype=object),
+            pd.Series(simple, index=cells.index))
+
+
+def parse_category_column(cells: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """
+    Convert a column of category ids with `int()` semantics. Returns the ids and the error message
+    of the cells that could not be converted, both aligned with `cells`.
+    """
+    if pd.api.types.is_numeric_dtype(cells):
+        missing = cells.isna()
+        ids = cells.where(~missing, 0).astype(np.int64)
+        errors = pd.Series(np.where(missing, "cannot convert float NaN to integer", None), index=cells.index)
+        return ids, errors
+
+    ids = [0] * len(cells)
+    errors = [None] * len(cells)
+    for position, cell in enumerate(cells):
+        try:
+            ids[position] = int(cell)
+        except Exception as e:
+            errors[position] = str(e)
+    return pd.Series(ids, index=cells.index, dtype=np.int64), pd.Series(errors, index=cells.index, dtype=object)
+
+
+def normalized_lists(lists: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """
+    Strip and lower-case every option of a column of string lists in one vectorized pass. Returns
+    the sorted options of each row and the sorted distinct options of each row (codepoint order, as
+    Python sorts).
+    """
+    flat = pd.Series(list(itertools.chain.from_iterable(lists)), dtype=object)
+    normalized = flat.str.strip().str.lower().tolist()
+    lengths = np.fromiter(map(len, lists), dtype=np.int64, count=len(lists))
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    rows = [normalized[start:end] for start, end in zip(starts, ends)]
+    return (pd.Series([sorted(row) for row in rows], index=lists.index, dtype=object),
+            pd.Series([sorted(set(row)) for row in rows], index=lists.index, dtype=object))
+
+
+def only_strings(lists: pd.Series) -> pd.Series:
+    """
+    True for rows holding a list (or tuple) of strings only.
+    """
+    # checked item by item: exploding would turn None items into the NaN of empty lists
+    return lists.map(
+        lambda value: isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value)
+    ).astype(bool)
+
+
+def subset_violations(correct: pd.Series, options: pd.Series) -> pd.Series:
+    """
+    True for rows whose correct options are not all among the options (the `MCQCreate` check).
+    Both columns must hold lists of strings.
+    """
+    correct_items = correct.explode().dropna()
+    option_items = options.explode().dropna()
+    found = pd.MultiIndex.from_arrays([correct_items.index, correct_items.to_numpy()]).isin(
+        pd.MultiIndex.from_arrays([option_items.index, option_items.to_numpy()])
+    )
+    return pd.Series(correct.index.isin(correct_items.index[~found]), index=correct.index)
+
+
+def as_string_list(value) -> list[str]:
+    """
+    Staged form of a parsed cell: its items as strings. Non-list literals (e.g. a bare string) are
+    iterated as the row-by-row loop did, scalars become a single item.
+    """
+    if isinstance(value, (list, tuple, str)):
+        return [str(item) for item in value]
+    return [str(value)]
+
+
+def validate_mcq_rows(chunk: pd.DataFrame, row_offset: int) -> tuple[pd.DataFrame, list[tuple[int, dict]]]:
+    """
+    Validate a chunk of an uploaded MCQ CSV column by column.
+
+    Returns the parseable rows with their staging columns (`error` holds the validation error of
+    rows that fail `MCQCreate`, None otherwise) and the (row number, error record) of the rows that
+    could not be parsed. Error records and messages match the row-by-row `eval` + `MCQCreate` loop.
+    """
+    chunk = chunk.reset_index(drop=True)
+    row_no = pd.Series(np.arange(row_offset, row_offset + len(chunk)), index=chunk.index)
+    missing_question = chunk["Question"].isna()
+    question = chunk["Question"].where(~missing_question, "").astype(str).str.strip()
+
+    options, options_errors, options_simple = parse_list_column(chunk["Options"])
+    correct, correct_errors, correct_simple = parse_list_column(chunk["Correct_options"])
+    category, category_errors = parse_category_column(chunk["Category"])
+
+    # first failing column wins, in the order the row-by-row loop parsed them
+    question_errors = pd.Series(np.where(missing_question, "Question is missing", None), index=chunk.index)
+    errors = question_errors.combine_first(options_errors).combine_first(correct_errors).combine_first(category_errors)
+    failed = errors.notna()
+    failed_records = [
+        (int(number), {"question": text, "error": f"Bad format:{message}"})
+        for number, text, message in zip(row_no[failed], question[failed], errors[failed])
+    ]
+
+    parsed = ~failed
+    question, options, correct, category, row_no = (
+        question[parsed], options[parsed], correct[parsed], category[parsed], row_no[parsed]
+    )
+    simple = options_simple[parsed] & correct_simple[parsed]
+
+    # rows that can fail MCQCreate are validated by it, for its exact error message; the rest skip it
+    strings = simple.to_numpy(dtype=bool, copy=True)
+    if not strings.all():
+        slow = ~strings
+        strings[slow] = (only_strings(options[slow]) & only_strings(correct[slow])).to_numpy(dtype=bool)
+    strings = pd.Series(strings, index=simple.index)
+    suspect = ~strings | subset_violations(correct[strings], options[strings]).reindex(strings.index, fill_value=False)
+    validation_errors = pd.Series([None] * len(question), index=question.index, dtype=object)
+    for label in suspect.index[suspect]:
+        try:
+            MCQCreate(question=question[label], options=options[label], correct_option=correct[label],
+                      category=int(category[label]))
+        except Exception as e:
+            validation_errors[label] = str(e)
+
+    # staged lists hold strings only; tuples and the odd non-list literal from the slow path are converted here
+    options = options.where(simple, options[~simple].map(as_string_list))
+    correct = correct.where(simple, correct[~simple].map(as_string_list))
+
+    options_cmp, options_set = normalized_lists(options)
+    _, correct_set = normalized_lists(correct)
+    question_cmp = question.str.lower()
+    staged = pd.DataFrame({
+        "row_no": row_no,
+        "question": question,
+        "options": options,
+        "correct_option": correct,
+        "category": category,
+        "question_cmp": question_cmp,
+        # hash of the question and sorted options, as stored in `mcq.fingerprint`, for the database duplicate check
+        "fingerprint": [build_normalized_fingerprint(key, options_key)
+                        for key, options_key in zip(question_cmp, options_cmp)],
+        # distinct options / correct options for the duplicate check within the CSV
+        "options_set": options_set,
+        "correct_set": correct_set,
+        # MinHash/LSH buckets of the question, stored with new MCQs and used for near-duplicate warnings
+        "lsh_buckets": question_lsh_buckets_many(question.tolist()),
+        "error": validation_errors,
+    })
+    return staged, failed_records
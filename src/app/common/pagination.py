@@ -0,0 +1,42 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+# sort option -> (column the keyset starts with, descending); id always breaks ties
+MCQ_SORT_OPTIONS = {
+    "id": ("id", False),
+    "-id": ("id", True),
+    "created_date": ("created_date", False),
+    "-created_date": ("created_date", True),
+}
+
+
+def encode_cursor(sort: str, last_row) -> str:
+    """
+    Opaque cursor pointing after `last_row` of a page sorted by `sort`: its sort key, base64url
+    encoded. Dates are kept as ISO strings.
+    """
+    column, _ = MCQ_SORT_OPTIONS[sort]
+    key = [last_row.id] if column == "id" else [last_row.created_date.isoformat(), last_row.id]
+    payload = json.dumps({"sort": sort, "key": key}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple:
+    """
+    Sort key stored in a cursor made by `encode_cursor`. Raises ValueError for cursors that are
+    malformed or were made for another sort order.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload["sort"] != sort:
+            raise ValueError("cursor belongs to another sort order")
+        column, _ = MCQ_SORT_OPTIONS[sort]
+        if column == "id":
+            (last_id,) = payload["key"]
+            return (int(last_id),)
+        last_date, last_id = payload["key"]
+        return datetime.fromisoformat(last_date), int(last_id)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from None
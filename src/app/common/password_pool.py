@@ -0,0 +1,129 @@
+import asyncio
+import dataclasses
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from src.app.config import settings
+
+
+@dataclasses.dataclass
+class PasswordPoolStats:
+    """
+    Cumulative counters of a password hashing pool.
+    """
+    completed: int = 0
+    rejected: int = 0
+    wait_time_total: float = 0.0
+    wait_time_max: float = 0.0
+    run_time_total: float = 0.0
+    _lock: threading.Lock = dataclasses.field(default_factory=threading.Lock, repr=False)
+
+    def record(self, waited: float, ran: float):
+        with self._lock:
+            self.completed += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+            self.run_time_total += ran
+
+
+class PasswordPool:
+    """
+    Size-limited thread pool running bcrypt hashing and verification off the event loop.
+
+    bcrypt releases the GIL while hashing, so up to `max_workers` passwords are checked in parallel
+    while the event loop keeps serving other requests. At most `max_queue` calls wait for a worker;
+    beyond that calls are rejected with a 503 instead of piling up behind a login storm.
+    """
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.stats = PasswordPoolStats()
+        self._queued = 0
+        self._running = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-pool")
+
+    async def run(self, function, *args):
+        """
+        Run `function(*args)` on a pool worker and return its result.
+        """
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self.stats.rejected += 1
+                raise HTTPException(status_code=503, detail="Too many concurrent logins, please retry",
+                                    headers={"Retry-After": "1"})
+            self._queued += 1
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            try:
+                return function(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                self.stats.record(started - submitted, time.perf_counter() - started)
+
+        future = self._executor.submit(task)
+        # a call cancelled while still queued never starts, so it leaves the queue here
+        future.add_done_callback(lambda done: done.cancelled() and self._dequeue())
+        return await asyncio.wrap_future(future)
+
+    def _dequeue(self):
+        with self._lock:
+            self._queued -= 1
+
+    def describe(self) -> dict:
+        """
+        Current queue depth and cumulative wait statistics of the pool.
+        """
+        stats = self.stats
+        return {
+            "workers": self.max_workers,
+            "running": self._running,
+            "queued": self._queued,
+            "max_queue": self.max_queue,
+            "completed": stats.completed,
+            "rejected": stats.rejected,
+            "avg_wait_ms": round(stats.wait_time_total / stats.completed * 1000, 3) if stats.completed else 0.0,
+            "max_wait_ms": round(stats.wait_time_max * 1000, 3),
+            "avg_run_ms": round(stats.run_time_total / stats.completed * 1000, 3) if stats.completed else 0.0,
+        }
+
+
+PASSWORD_POOL = PasswordPool(max_workers=settings.PASSWORD_POOL_WORKERS, max_queue=settings.PASSWORD_POOL_MAX_QUEUE)
+
+# process pool hashing the passwords of /users/bulk-import, started by the first import of the worker
+_IMPORT_HASH_POOL: ProcessPoolExecutor | None = None
+_IMPORT_HASH_POOL_LOCK = threading.Lock()
+
+
+def get_import_hash_pool() -> ProcessPoolExecutor:
+    """
+    The worker's import hashing pool, shared by all imports so its processes are spawned only once.
+    """
+    global _IMPORT_HASH_POOL
+    with _IMPORT_HASH_POOL_LOCK:
+        if _IMPORT_HASH_POOL is None:
+            # spawned rather than forked workers, forking a threaded server process is unsafe
+            _IMPORT_HASH_POOL = ProcessPoolExecutor(max_workers=settings.USER_IMPORT_HASH_WORKERS,
+                                                    mp_context=multiprocessing.get_context("spawn"))
+        return _IMPORT_HASH_POOL
+
+
+def shutdown_import_hash_pool():
+    """
+    Stop the import hashing pool's processes, if it was started.
+    """
+    global _IMPORT_HASH_POOL
+    with _IMPORT_HASH_POOL_LOCK:
+        pool, _IMPORT_HASH_POOL = _IMPORT_HASH_POOL, None
+    if pool is not None:
+        pool.shutdown()
@@ -0,0 +1,149 @@
+"""
+MinHash signatures and LSH buckets of MCQ question text, for near-duplicate detection.
+
+A question is normalized (lower-cased, punctuation dropped, whitespace collapsed) and cut into
+overlapping character shingles. Its MinHash signature (`SIMILARITY_NUM_BANDS` x
+`SIMILARITY_BAND_ROWS` values) is split into bands and every band is hashed to a bucket; two
+questions share at least one bucket with high probability when the Jaccard similarity of their
+shingles is above roughly (1 / bands) ** (1 / rows), and rarely otherwise. The buckets are stored
+in `mcq.lsh_buckets` under a GIN index, so candidates are found with an index lookup and only
+they are compared exactly.
+
+All hashing is deterministic (crc32 and fixed seeds, not Python's salted `hash`), so buckets
+computed by different processes and at different times match. Changing the band settings
+requires recomputing the stored buckets.
+"""
+import itertools
+import re
+import zlib
+
+import numpy as np
+
+from src.app.config import settings
+
+SHINGLE_SIZE = 4
+MINHASH_SEED = 20240601
+# shingles hashed per matrix product when signing many questions; keeps the hashed matrix
+# (signature length x batch) around the CPU cache size, which is markedly faster than larger batches
+SIGNATURE_BATCH_SHINGLES = 10_000
+
+NON_WORD_RE = re.compile(r"[\W_]+")
+
+_permutation_rng = np.random.RandomState(MINHASH_SEED)
+_NUM_PERMUTATIONS = settings.SIMILARITY_NUM_BANDS * settings.SIMILARITY_BAND_ROWS
+# multiply-shift hash functions ((a * x + b) mod 2 ** 64) >> 32 with odd a, one per signature value
+PERMUTATION_A = _permutation_rng.randint(0, 2 ** 63, size=_NUM_PERMUTATIONS, dtype=np.int64).astype(np.uint64) * 2 + 1
+PERMUTATION_B = _permutation_rng.randint(0, 2 ** 63, size=_NUM_PERMUTATIONS, dtype=np.int64).astype(np.uint64)
+BAND_SEEDS = _permutation_rng.randint(1, 2 ** 62, size=settings.SIMILARITY_NUM_BANDS, dtype=np.int64).astype(np.uint64)
+FNV_PRIME = np.uint64(0x100000001B3)
+
+
+def normalize_question_text(question: str) -> str:
+    """
+    Lower-case a question and reduce every run of punctuation and whitespace to a single space.
+    """
+    return NON_WORD_RE.sub(" ", question.lower()).strip()
+
+
+def shingle_hashes(question: str) -> list[int]:
+    """
+    crc32 hashes of the character shingles of a normalized question, in text order and possibly
+    repeated. Questions shorter than a shingle are a single shingle; an empty question has none.
+    """
+    text = normalize_question_text(question)
+    if len(text) <= SHINGLE_SIZE:
+        return [zlib.crc32(text.encode())] if text else []
+    encoded = text.encode()
+    return [zlib.crc32(encoded[start:start + SHINGLE_SIZE]) for start in range(len(encoded) - SHINGLE_SIZE + 1)]
+
+
+def question_shingles(question: str) -> np.ndarray:
+    """
+    Sorted, distinct shingle hashes of a question, the set compared by `jaccard_similarity`.
+    """
+    return np.array(sorted(set(shingle_hashes(question))), dtype=np.uint64)
+
+
+def jaccard_similarity(shingles: np.ndarray, other_shingles: np.ndarray) -> float:
+    """
+    Exact Jaccard similarity of two `question_shingles` arrays.
+    """
+    if not len(shingles) or not len(other_shingles):
+        return 0.0
+    common = len(np.intersect1d(shingles, other_shingles, assume_unique=True))
+    return common / (len(shingles) + len(other_shingles) - common)
+
+
+def minhash_signatures(shingle_lists: list[list[int]]) -> np.ndarray:
+    """
+    MinHash signatures of many `shingle_hashes` lists, one row per list (all ones for an empty
+    list). Lists are processed in batches of about `SIGNATURE_BATCH_SHINGLES` shingles.
+    """
+    signatures = np.full((len(shingle_lists), _NUM_PERMUTATIONS), np.iinfo(np.uint64).max, dtype=np.uint64)
+    start = 0
+    while start < len(shingle_lists):
+        end, batch_shingles = start, 0
+        while end < len(shingle_lists) and (end == start or batch_shingles < SIGNATURE_BATCH_SHINGLES):
+            batch_shingles += len(shingle_lists[end])
+            end += 1
+        batch = shingle_lists[start:end]
+        lengths = np.fromiter(map(len, batch), dtype=np.int64, count=len(batch))
+        if batch_shingles:
+            flat = np.fromiter(itertools.chain.from_iterable(batch), dtype=np.uint64, count=batch_shingles)
+            # uint64 arithmetic wraps, which is the "mod 2 ** 64" of the hash functions
+            hashed = np.multiply(PERMUTATION_A[:, None], flat[None, :])
+            hashed += PERMUTATION_B[:, None]
+            hashed >>= np.uint64(32)
+            non_empty = np.flatnonzero(lengths)
+            offsets = (np.cumsum(lengths) - lengths)[non_empty]
+            signatures[start + non_empty] = np.minimum.reduceat(hashed, offsets, axis=1).T
+        start = end
+    return signatures
+
+
+def lsh_buckets_from_signatures(signatures: np.ndarray) -> np.ndarray:
+    """
+    Bucket of every band of every signature, as signed 64-bit integers (one row per signature).
+    The band number is part of the hash, so equal values in different bands never collide.
+    """
+    bands = signatures.reshape(len(signatures), settings.SIMILARITY_NUM_BANDS, settings.SIMILARITY_BAND_ROWS)
+    buckets = np.broadcast_to(BAND_SEEDS, bands.shape[:2]).copy()
+    with np.errstate(over="ignore"):
+        for row in range(settings.SIMILARITY_BAND_ROWS):
+            # FNV-style mixing; uint64 arithmetic wraps, which is what the hash relies on
+            buckets = (buckets * FNV_PRIME) ^ bands[:, :, row]
+    return buckets.view(np.int64)
+
+
+def question_lsh_buckets_many(questions: list[str]) -> list[list[int]]:
+    """
+    LSH buckets of many questions, in the form stored in `mcq.lsh_buckets`. Questions without any
+    text get no buckets.
+    """
+    shingle_lists = [shingle_hashes(question) for question in questions]
+    buckets = lsh_buckets_from_signatures(minhash_signatures(shingle_lists)).tolist()
+    return [row if shingles else [] for row, shingles in zip(buckets, shingle_lists)]
+
+
+def question_lsh_buckets(question: str) -> list[int]:
+    """
+    LSH buckets of a single question, in the form stored in `mcq.lsh_buckets`.
+    """
+    return question_lsh_buckets_many([question])[0]
+
+
+def rank_similar(question: str, candidates, threshold: float, limit: int) -> list[dict]:
+    """
+    Compare LSH candidates, (id, question, category) rows, with a question exactly and keep the
+    `limit` most similar at or above `threshold`, most similar first.
+    """
+    shingles = question_shingles(question)
+    similar = []
+    for candidate_id, candidate_question, category in candidates:
+        similarity = jaccard_similarity(shingles, question_shingles(candidate_question))
+        if similarity >= threshold:
+            similar.append({"id": candidate_id, "question": candidate_question, "category": category,
+                            "similarity": round(similarity, 4)})
+    # candidates without an id (rows of the same upload) come after stored MCQs of equal similarity
+    similar.sort(key=lambda item: (-item["similarity"], item["id"] is None, item["id"] or 0))
+    return similar[:limit]
@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+
+from pydantic import ValidationError
+
+from src.app.schemas.user_schema import UserCreate
+
+USER_IMPORT_COLUMNS = ("first_name", "last_name", "email", "password", "role")
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+JSONL_CONTENT_TYPES = ("application/jsonl", "application/x-ndjson", "application/x-jsonlines")
+
+
+def is_jsonl_upload(filename: str | None, content_type: str | None) -> bool:
+    return (filename or "").lower().endswith(JSONL_SUFFIXES) or content_type in JSONL_CONTENT_TYPES
+
+
+def iter_user_rows(binary_file, jsonl: bool):
+    """
+    Yield (row number, fields) for each user of an uploaded CSV (with a header row) or JSON Lines
+    file, one row at a time. Lines that are not a JSON object are yielded with their parse error
+    instead of fields.
+    """
+    text_file = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="" if not jsonl else None)
+    if not jsonl:
+        for row_no, row in enumerate(csv.DictReader(text_file), start=1):
+            yield row_no, row
+        return
+
+    row_no = 0
+    for line in text_file:
+        if not line.strip():
+            continue
+        row_no += 1
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_no, ValueError(f"Invalid JSON: {e.msg}")
+            continue
+        yield row_no, row if isinstance(row, dict) else ValueError("Each line must be a JSON object")
+
+
+def validate_user_row(row) -> tuple[UserCreate | None, str | None]:
+    """
+    Validate the fields of one imported user. Returns the user, or None and the error message.
+    """
+    if isinstance(row, Exception):
+        return None, str(row)
+    try:
+        return UserCreate(**{column: row.get(column) for column in USER_IMPORT_COLUMNS}), None
+    except ValidationError as e:
+        return None, "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
@@ -19,6 +19,88 @@ class MCQAppSettings(BaseSettings):
     DB_HOST: str = os.getenv("DB_HOST", "localhost")
     DB_PORT: int = int(os.getenv("DB_PORT", 5432))
     DB_NAME: str = os.getenv("DB_NAME", "mcq-fastapi-db")
+    # Full SQLAlchemy URL used instead of the DB_* settings above, e.g. "sqlite://" for an in-memory
+    # SQLite database (created on startup, for benchmark and load-test runs). The async engine uses
+    # the same database through the matching async driver.
+    DATABASE_URL: str | None = os.getenv("DATABASE_URL") or None
+
+    # Connection pool configuration (applies to each engine, per worker process)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))  # 0 disables the timeout
+    DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() == "true"
+
+    # Per-category MCQ id arrays used to sample quiz questions without loading the whole category
+    CATEGORY_ID_CACHE_TTL_SECONDS: int = int(os.getenv("CATEGORY_ID_CACHE_TTL_SECONDS", 300))
+    CATEGORY_ID_CACHE_MAX_CATEGORIES: int = int(os.getenv("CATEGORY_ID_CACHE_MAX_CATEGORIES", 1000))
+
+    # Normalized correct options per MCQ id used for grading; the TTL bounds staleness across workers
+    ANSWER_KEY_CACHE_TTL_SECONDS: int = int(os.getenv("ANSWER_KEY_CACHE_TTL_SECONDS", 300))
+    ANSWER_KEY_CACHE_MAX_BYTES: int = int(os.getenv("ANSWER_KEY_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+    # Questions served per started quiz, kept in memory for submit with the database as fallback. A quiz
+    # not submitted within the TTL has expired; expired quiz_sessions rows are deleted every interval
+    ATTEMPT_STATE_TTL_SECONDS: int = int(os.getenv("ATTEMPT_STATE_TTL_SECONDS", 7200))
+    QUIZ_SESSION_CLEANUP_INTERVAL_SECONDS: int = int(os.getenv("QUIZ_SESSION_CLEANUP_INTERVAL_SECONDS", 600))
+    ATTEMPT_STATE_CACHE_MAX_ENTRIES: int = int(os.getenv("ATTEMPT_STATE_CACHE_MAX_ENTRIES", 100000))
+
+    # CSV rows parsed and staged at a time by /mcq/bulk-upload, bounds the worker memory per upload
+    BULK_UPLOAD_CHUNK_ROWS: int = int(os.getenv("BULK_UPLOAD_CHUNK_ROWS", 10000))
+
+    # Near-duplicate question detection (MinHash/LSH). Bands x rows is the signature length; changing
+    # either requires recomputing mcq.lsh_buckets. Questions at or above the threshold are reported.
+    SIMILARITY_NUM_BANDS: int = int(os.getenv("SIMILARITY_NUM_BANDS", 16))
+    SIMILARITY_BAND_ROWS: int = int(os.getenv("SIMILARITY_BAND_ROWS", 4))
+    SIMILARITY_THRESHOLD: float = float(os.getenv("SIMILARITY_THRESHOLD", 0.7))
+    SIMILARITY_MAX_CANDIDATES: int = int(os.getenv("SIMILARITY_MAX_CANDIDATES", 200))
+
+    # MCQs per page of GET /mcq when no limit is given, and the largest limit accepted
+    MCQ_PAGE_DEFAULT_SIZE: int = int(os.getenv("MCQ_PAGE_DEFAULT_SIZE", 100))
+    MCQ_PAGE_MAX_SIZE: int = int(os.getenv("MCQ_PAGE_MAX_SIZE", 1000))
+
+    # MCQs fetched per round trip of the server-side cursor behind GET /mcq/export
+    MCQ_EXPORT_BATCH_SIZE: int = int(os.getenv("MCQ_EXPORT_BATCH_SIZE", 1000))
+
+    # Results returned by /mcq/search when no limit is given, and the largest limit accepted
+    SEARCH_DEFAULT_RESULTS: int = int(os.getenv("SEARCH_DEFAULT_RESULTS", 20))
+    SEARCH_MAX_RESULTS: int = int(os.getenv("SEARCH_MAX_RESULTS", 100))
+
+    # Authenticated users per access token, so most requests skip the JWT decode and the user lookup.
+    # Entries never outlive their token. With AUTH_TRUST_TOKEN_CLAIMS the user's id, email and role are
+    # taken from the token claims instead of the database. Role changes and deletions are applied
+    # through `invalidate_user_principals`, which is per worker process.
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_PRINCIPAL_CACHE_TTL_SECONDS", 60))
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_PRINCIPAL_CACHE_MAX_ENTRIES", 100000))
+    AUTH_TRUST_TOKEN_CLAIMS: bool = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "false").lower() == "true"
+
+    # bcrypt hashing and verification for /login and /register run on this many threads (bcrypt
+    # releases the GIL, so one per core); calls beyond the queue limit are rejected with a 503
+    PASSWORD_POOL_WORKERS: int = int(os.getenv("PASSWORD_POOL_WORKERS", os.cpu_count() or 1))
+    PASSWORD_POOL_MAX_QUEUE: int = int(os.getenv("PASSWORD_POOL_MAX_QUEUE", 100))
+
+    # /users/bulk-import: users validated, checked and inserted per batch, and the processes hashing
+    # their passwords (a separate pool, so imports do not hold up interactive logins)
+    USER_IMPORT_BATCH_SIZE: int = int(os.getenv("USER_IMPORT_BATCH_SIZE", 1000))
+    USER_IMPORT_HASH_WORKERS: int = int(os.getenv("USER_IMPORT_HASH_WORKERS", os.cpu_count() or 1))
+
+    # Lifetime of the refresh tokens handed out by /login; each /token/refresh replaces the token
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 14))
+
+    # How /quiz/start allocates attempt ids: "sequence" (blocks reserved from a database sequence) or
+    # "snowflake" (time, node and counter, no database access; needs a distinct node id 0-63 per process)
+    ATTEMPT_ID_GENERATOR: str = os.getenv("ATTEMPT_ID_GENERATOR", "sequence")
+    ATTEMPT_ID_NODE_ID: int | None = int(os.environ["ATTEMPT_ID_NODE_ID"]) if os.getenv("ATTEMPT_ID_NODE_ID") else None
+
+    # Request logging: every request is queued in memory as it completes and written to the request log
+    # table in batches by a background task every flush interval. Records arriving while the queue is
+    # full are dropped (and counted) rather than slowing requests down.
+    REQUEST_LOGS_ENABLED: bool = os.getenv("REQUEST_LOGS_ENABLED", "true").lower() == "true"
+    REQUEST_LOG_QUEUE_SIZE: int = int(os.getenv("REQUEST_LOG_QUEUE_SIZE", 10000))
+    REQUEST_LOG_BATCH_SIZE: int = int(os.getenv("REQUEST_LOG_BATCH_SIZE", 1000))
+    REQUEST_LOG_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("REQUEST_LOG_FLUSH_INTERVAL_SECONDS", 1.0))
 
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")
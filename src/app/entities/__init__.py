@@ -3,4 +3,5 @@ from .role import Role, build_role_from_object
 from .mcq import MCQ, build_mcq_from_object
 from .category import Category, build_category_from_object
 from .quiz_attempt import QuizAttempt, build_quiz_attempt_from_object
-from .quiz_attempt_questions import AttemptQuestion, build_attempt_question_from_object
\ No newline at end of file
+from .quiz_attempt_questions import AttemptQuestion, build_attempt_question_from_object
+from .quiz_session import QuizSession, build_quiz_session_from_object
\ No newline at end of file
@@ -1,2 +1,19 @@
+import dataclasses
+from datetime import datetime
+from typing import Optional
+
+
+@dataclasses.dataclass
 class Log:
-    pass
\ No newline at end of file
+    """
+    A request served by the app, as recorded by the request log middleware. `db_time_ms` is the
+    time spent executing SQL statements for the request.
+    """
+    method: str
+    path: str
+    status_code: int
+    latency_ms: float
+    db_time_ms: float
+    created_date: datetime
+    user_id: Optional[int] = None
+    id: int = None
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import dataclasses
 from datetime import datetime
@@ -14,6 +15,8 @@ class MCQ:
     created_date: datetime
     updated_by: Optional[int] = None
     updated_date: Optional[datetime] = None
+    fingerprint: Optional[str] = None
+    lsh_buckets: Optional[List[int]] = None
     id: int = None
 
     def to_dict(self):
@@ -57,4 +60,31 @@ def build_mcq_from_object(series: dict) -> MCQ:
         created_date=series["created_date"],
         updated_by=series["updated_by"],
         updated_date=series["updated_date"]
-    )
\ No newline at end of file
+    )
+
+
+def build_normalized_fingerprint(question_key: str, option_keys: list[str]) -> str:
+    """
+    Fingerprint of an already normalized question and its sorted, normalized options.
+    """
+    text = question_key + "\x1f" + "\x1e".join(option_keys)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def build_mcq_fingerprint(question: str, options: List[str]) -> str:
+    """
+    Fingerprint identifying an MCQ by its question and options, ignoring case, surrounding whitespace
+    and option order. Two MCQs with the same fingerprint are duplicates.
+
+    Parameters
+    ----------
+    question: str
+    options: List[str]
+
+    Returns
+    -------
+    str
+        Hex digest stored in `mcq.fingerprint`.
+    """
+    return build_normalized_fingerprint(question.strip().lower(),
+                                        sorted(str(option).strip().lower() for option in options))
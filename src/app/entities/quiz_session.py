@@ -0,0 +1,48 @@
+import json
+import dataclasses
+from datetime import datetime
+from typing import List
+
+
+@dataclasses.dataclass
+class QuizSession:
+    attempt_id: int
+    user_id: int
+    category_id: int
+    question_ids: List[int]
+    created_date: datetime
+
+    def to_dict(self):
+        dict_form = {
+            "attempt_id": self.attempt_id,
+            "user_id": self.user_id,
+            "category_id": self.category_id,
+            "question_ids": self.question_ids,
+            "created_date": self.created_date
+        }
+        return dict_form
+
+    def to_json(self):
+        dict_form = self.to_dict()
+        return json.dumps(dict_form)
+
+
+def build_quiz_session_from_object(series: dict) -> QuizSession:
+    """
+    Converts the series representation of a started quiz into the QuizSession entity class.
+
+    Parameters
+    ----------
+    series: dict
+
+    Returns
+    -------
+    QuizSession
+    """
+    return QuizSession(
+        attempt_id=series["attempt_id"],
+        user_id=series["user_id"],
+        category_id=series["category_id"],
+        question_ids=series["question_ids"],
+        created_date=series["created_date"]
+    )
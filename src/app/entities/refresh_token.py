@@ -0,0 +1,20 @@
+import dataclasses
+import uuid
+from datetime import datetime
+from typing import Optional
+
+
+@dataclasses.dataclass
+class RefreshToken:
+    """
+    A refresh token handed out by /login or /token/refresh. Only a keyed hash of the token is
+    stored. Each refresh revokes the token and issues the next one of the same family, so a revoked
+    token presented again marks the family as leaked.
+    """
+    user_id: int
+    token_hash: bytes
+    family_id: uuid.UUID
+    expires_at: datetime
+    created_date: datetime
+    revoked_at: Optional[datetime] = None
+    id: int = None
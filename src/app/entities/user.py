@@ -30,6 +30,17 @@ class User:
         return json.dumps(dict_form)
 
 
+@dataclasses.dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated user of a request, as returned by `get_current_user`. Unlike `User` it is not
+    bound to a database session, so it can be cached across requests.
+    """
+    id: int
+    email: str
+    role: int
+
+
 def build_user_from_object(series: dict) -> User:
     """
     Converts the series representation of a user from the database into the User entity class.
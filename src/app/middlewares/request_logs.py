@@ -0,0 +1,179 @@
+import asyncio
+import contextvars
+import dataclasses
+import time
+from datetime import datetime
+
+from sqlalchemy import event
+
+from src.app.build_db import DEFAULT_ASYNC_SESSION_FACTORY, async_engine, engine
+from src.app.config import settings
+from src.app.repositories.log_repo import AsyncLogRepository
+
+# log record of the request being served; set by the middleware, completed by `note_request_user`
+# and the statement timing listeners below
+CURRENT_REQUEST_LOG: contextvars.ContextVar[dict | None] = contextvars.ContextVar("current_request_log", default=None)
+
+
+@dataclasses.dataclass
+class RequestLogStats:
+    """
+    Cumulative counters of a request log writer.
+    """
+    queued: int = 0
+    dropped: int = 0
+    written: int = 0
+    failed: int = 0
+    flushes: int = 0
+    flush_time_total: float = 0.0
+
+
+class RequestLogWriter:
+    """
+    Bounded in-memory queue of request log records, written to the request log table by a
+    background task every `flush_interval` seconds, in batched inserts of up to `batch_size` rows.
+
+    Queueing a record is a single `put_nowait`, so a request never waits on the log table. When the
+    queue is full (the table cannot keep up) new records are dropped and counted instead.
+    """
+    def __init__(self, max_queue: int, batch_size: int, flush_interval: float):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stats = RequestLogStats()
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping: asyncio.Event | None = None
+
+    def start(self):
+        """
+        Start the background flush task on the running event loop.
+        """
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the flush task once it has written the records still queued.
+        """
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+
+    def submit(self, record: dict):
+        if self._task is None:
+            return
+        try:
+            self._queue.put_nowait(record)
+            self.stats.queued += 1
+        except asyncio.QueueFull:
+            self.stats.dropped += 1
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def flush(self):
+        """
+        Write the queued records, a batch per transaction. A batch that fails is counted and
+        discarded, so a missing or locked table cannot back the queue up.
+        """
+        while not self._queue.empty():
+            batch = [self._queue.get_nowait() for _ in range(min(self.batch_size, self._queue.qsize()))]
+            started = time.perf_counter()
+            try:
+                async with DEFAULT_ASYNC_SESSION_FACTORY() as session:
+                    await AsyncLogRepository(session).add_many(batch)
+                    await session.commit()
+                self.stats.written += len(batch)
+            except Exception as e:
+                self.stats.failed += len(batch)
+                print(f"Failed to write {len(batch)} request logs: {e}")
+            self.stats.flushes += 1
+            self.stats.flush_time_total += time.perf_counter() - started
+
+    def describe(self) -> dict:
+        """
+        Queue depth and cumulative counters of the writer.
+        """
+        stats = self.stats
+        return {
+            "running": self._task is not None,
+            "queue_size": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "queued": stats.queued,
+            "dropped": stats.dropped,
+            "written": stats.written,
+            "failed": stats.failed,
+            "avg_flush_ms": round(stats.flush_time_total / stats.flushes * 1000, 3) if stats.flushes else 0.0,
+        }
+
+
+REQUEST_LOGS = RequestLogWriter(max_queue=settings.REQUEST_LOG_QUEUE_SIZE, batch_size=settings.REQUEST_LOG_BATCH_SIZE,
+                                flush_interval=settings.REQUEST_LOG_FLUSH_INTERVAL_SECONDS)
+
+
+class RequestLogMiddleware:
+    """
+    ASGI middleware recording the method, path, status, latency, user id and database time of every
+    HTTP request into `REQUEST_LOGS`. The latency runs until the last body chunk is sent, so it covers
+    streamed responses too.
+    """
+    def __init__(self, app, writer: RequestLogWriter = REQUEST_LOGS):
+        self.app = app
+        self.writer = writer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        record = {"method": scope["method"], "path": scope["path"], "status_code": 500, "user_id": None,
+                  "db_time_ms": 0.0, "created_date": datetime.now()}
+        token = CURRENT_REQUEST_LOG.set(record)
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start":
+                record["status_code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            CURRENT_REQUEST_LOG.reset(token)
+            record["latency_ms"] = (time.perf_counter() - started) * 1000
+            self.writer.submit(record)
+
+
+def note_request_user(user_id: int):
+    """
+    Record the authenticated user of the current request in its log record.
+    """
+    record = CURRENT_REQUEST_LOG.get()
+    if record is not None:
+        record["user_id"] = user_id
+
+
+def _statement_started(conn, cursor, statement, parameters, context, executemany):
+    if CURRENT_REQUEST_LOG.get() is not None:
+        conn.info["request_log_started"] = time.perf_counter()
+
+
+def _statement_finished(conn, cursor, statement, parameters, context, executemany):
+    record = CURRENT_REQUEST_LOG.get()
+    started = conn.info.pop("request_log_started", None)
+    if record is not None and started is not None:
+        record["db_time_ms"] += (time.perf_counter() - started) * 1000
+
+
+for _engine in (engine, async_engine.sync_engine):
+    event.listen(_engine, "before_cursor_execute", _statement_started)
+    event.listen(_engine, "after_cursor_execute", _statement_finished)
@@ -0,0 +1,42 @@
+"""
+Column types and DDL rules that let the schema run on SQLite as well as on PostgreSQL, for
+in-process benchmark and load-test runs (see DATABASE_URL). PostgreSQL keeps its native types;
+the features SQLite lacks are left out of its schema and served by the repositories' fallbacks.
+"""
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.types import TypeDecorator
+
+
+class PortableList(TypeDecorator):
+    """
+    A list column: a native ARRAY of `item_type` on PostgreSQL and a JSON array elsewhere.
+    """
+    impl = JSON
+    cache_ok = True
+
+    def __init__(self, item_type):
+        super().__init__()
+        self.item_type = item_type
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(ARRAY(self.item_type))
+        return dialect.type_descriptor(JSON())
+
+
+@compiles(CreateColumn, "sqlite")
+def skip_full_text_columns(element, compiler, **kw):
+    # full-text search vectors are generated by PostgreSQL; on SQLite the question is searched directly
+    if isinstance(element.element.type, TSVECTOR):
+        return None
+    return compiler.visit_create_column(element, **kw)
+
+
+def is_postgresql(session) -> bool:
+    """
+    Whether the (sync or async) session is bound to a PostgreSQL database.
+    """
+    return session.get_bind().dialect.name == "postgresql"
@@ -1,14 +1,24 @@
 from datetime import datetime
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, MetaData, String, Table, Text
-from sqlalchemy.orm import registry
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy import (
+    BigInteger, Boolean, Column, Computed, DateTime, Float, ForeignKey, Index, Integer, LargeBinary, MetaData, Sequence,
+    SmallInteger, String, Table, Text, Uuid, func
+)
+from sqlalchemy.orm import deferred, registry
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
+from src.app.common.constants import (
+    ATTEMPT_ID_SEQUENCE, ATTEMPT_ID_SEQUENCE_BLOCK, ATTEMPT_ID_SEQUENCE_START, REQUEST_LOGS_TABLE_NAME
+)
 from src.app.entities.quiz_attempt_questions import AttemptQuestion
 from src.app.entities.category import Category
+from src.app.entities.log import Log
 from src.app.entities.mcq import MCQ
 from src.app.entities.user import User
 from src.app.entities.role import Role
 from src.app.entities.quiz_attempt import QuizAttempt
+from src.app.entities.quiz_session import QuizSession
+from src.app.entities.refresh_token import RefreshToken
+from src.app.orm.dialects import PortableList
 
 mapper_registry = registry()
 
@@ -19,15 +29,29 @@ mcq = Table(
     metadata,
     Column("id", Integer, primary_key=True, autoincrement=True),
     Column("question", Text, nullable=False),
-    Column("options", ARRAY(String), nullable=False),
+    Column("options", PortableList(String), nullable=False),
     Column("category", Integer, ForeignKey('categories.id'), nullable=False),
-    Column("correct_option", ARRAY(String), nullable=False),
+    Column("correct_option", PortableList(String), nullable=False),
     Column("created_by", Integer, ForeignKey('users.id'), nullable=False),
     Column("created_date", DateTime, default=datetime.now()),
     Column("updated_by", Integer, ForeignKey('roles.id'), nullable=True),
     Column("updated_date", DateTime, onupdate=datetime.now()),
+    Column("fingerprint", String(64), nullable=True, unique=True, index=True),
+    Column("lsh_buckets", PortableList(BigInteger), nullable=True),
+    Index("ix_mcq_lsh_buckets", "lsh_buckets", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    # full-text search vector of the question, maintained by Postgres on every insert and update
+    Column("search_vector", TSVECTOR, Computed("to_tsvector('english', question)", persisted=True)),
+    Index("ix_mcq_search_vector", "search_vector", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    # keyset pagination of GET /mcq: every filter and sort order reads its page from an index
+    Index("ix_mcq_category_id", "category", "id"),
+    Index("ix_mcq_created_by_id", "created_by", "id"),
+    Index("ix_mcq_created_date_id", "created_date", "id"),
 )
 
+# created by migrations only where the pg_trgm extension is available, so left out of `metadata`
+# and of autogenerate comparisons (see alembic/env.py)
+OPTIONAL_INDEXES = ("ix_mcq_question_trgm",)
+
 user = Table(
     "users",
     metadata,
@@ -39,6 +63,8 @@ user = Table(
     Column("role", Integer, ForeignKey('roles.id'), nullable=False),
     Column("created_date", DateTime, default=datetime.now(), nullable=False),
 )
+# logins and imports look users up by case-insensitive email
+Index("ix_users_email_lower", func.lower(user.c.email))
 
 role = Table(
     "roles",
@@ -48,12 +74,16 @@ role = Table(
     Column("created_date", DateTime, default=datetime.now(), nullable=False),
 )
 
+# attempt ids of /quiz/start, see SequenceAttemptIdGenerator
+attempt_id_sequence = Sequence(ATTEMPT_ID_SEQUENCE, start=ATTEMPT_ID_SEQUENCE_START,
+                               increment=ATTEMPT_ID_SEQUENCE_BLOCK, metadata=metadata)
+
 quiz_attempts = Table(
     "quiz_attempts",
     metadata,
     Column("id", Integer, primary_key=True, autoincrement=True),
-    Column("user_id", Integer, ForeignKey('users.id'), nullable=False),
-    Column("attempt_id", Integer, unique=True, nullable=False),
+    Column("user_id", Integer, ForeignKey('users.id'), nullable=False, index=True),
+    Column("attempt_id", BigInteger, unique=True, nullable=False),
     Column("category_id", Integer, ForeignKey('categories.id'), nullable=False),
     Column("total_questions", Integer, nullable=False),
     Column("questions_attempted", Integer, nullable=False),
@@ -67,12 +97,23 @@ attempt_questions = Table(
     "attempt_questions",
     metadata,
     Column("id", Integer, primary_key=True, autoincrement=True),
-    Column("attempt_id", Integer, ForeignKey('quiz_attempts.attempt_id'), nullable=False),
-    Column("question_id", Integer, ForeignKey('mcq.id'), nullable=False),
+    Column("attempt_id", BigInteger, ForeignKey('quiz_attempts.attempt_id'), nullable=False, index=True),
+    Column("question_id", Integer, ForeignKey('mcq.id'), nullable=False, index=True),
     Column("attempted_answer", String, nullable=False),
     Column("is_correct", Boolean, nullable=False),
 )
 
+quiz_sessions = Table(
+    "quiz_sessions",
+    metadata,
+    Column("attempt_id", BigInteger, primary_key=True, autoincrement=False),
+    Column("user_id", Integer, ForeignKey('users.id'), nullable=False),
+    Column("category_id", Integer, ForeignKey('categories.id'), nullable=False),
+    Column("question_ids", PortableList(Integer), nullable=False),
+    Column("created_date", DateTime, default=datetime.now(), nullable=False),
+    Index("ix_quiz_sessions_created_date", "created_date"),
+)
+
 
 categories = Table(
     "categories",
@@ -85,11 +126,45 @@ categories = Table(
     Column("updated_date", DateTime, onupdate=datetime.now())
 )
 
+refresh_tokens = Table(
+    "refresh_tokens",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", Integer, ForeignKey('users.id'), nullable=False, index=True),
+    # HMAC-SHA256 of the token, never the token itself
+    Column("token_hash", LargeBinary(32), nullable=False, unique=True),
+    Column("family_id", Uuid, nullable=False, index=True),
+    Column("expires_at", DateTime, nullable=False),
+    Column("created_date", DateTime, nullable=False),
+    Column("revoked_at", DateTime, nullable=True),
+)
+
+# written in batches by the request log middleware; no foreign keys or secondary indexes, so
+# inserting a batch stays cheap and logs outlive the users they mention
+request_logs = Table(
+    REQUEST_LOGS_TABLE_NAME,
+    metadata,
+    Column("id", BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True),
+    Column("method", String(10), nullable=False),
+    Column("path", String, nullable=False),
+    Column("status_code", SmallInteger, nullable=False),
+    Column("latency_ms", Float, nullable=False),
+    Column("db_time_ms", Float, nullable=False),
+    Column("user_id", Integer, nullable=True),
+    Column("created_date", DateTime, nullable=False),
+)
+
 
 def start_mappers():
-    mapper_registry.map_imperatively(MCQ, mcq)
+    # the LSH buckets are only written by the ORM and searched in SQL, never loaded with an MCQ;
+    # the search vector is computed by Postgres and only used in SQL
+    mapper_registry.map_imperatively(MCQ, mcq, properties={"lsh_buckets": deferred(mcq.c.lsh_buckets)},
+                                     exclude_properties=["search_vector"])
     mapper_registry.map_imperatively(User, user)
     mapper_registry.map_imperatively(Role, role)
     mapper_registry.map_imperatively(QuizAttempt, quiz_attempts)
     mapper_registry.map_imperatively(AttemptQuestion, attempt_questions)
     mapper_registry.map_imperatively(Category, categories)
+    mapper_registry.map_imperatively(QuizSession, quiz_sessions)
+    mapper_registry.map_imperatively(RefreshToken, refresh_tokens)
+    mapper_registry.map_imperatively(Log, request_logs)
@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src.app.entities.category import Category
@@ -53,3 +55,51 @@ class CategoryRepository(BaseRepository):
             self.session.commit()
             return True
         return False
+
+
+class AsyncCategoryRepository(BaseRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_one(self, item_id: int) -> Category | None:
+        """
+        Retrieve a single category by ID
+        """
+        result = await self.session.execute(select(Category).filter_by(id=item_id))
+        return result.scalars().first()
+
+    async def get_all(self) -> list[Category]:
+        """
+        Retrieve all categories
+        """
+        result = await self.session.execute(select(Category))
+        return list(result.scalars().all())
+
+    async def add(self, category: Category) -> Category:
+        """
+        Add a new category to the database
+        """
+        self.session.add(category)
+        await self.session.commit()
+        return category
+
+    async def update(self, category: Category) -> Category | None:
+        """
+        Update an existing category
+        """
+        existing_category = await self.get_one(category.id)
+        if existing_category:
+            existing_category.name = category.name
+            await self.session.commit()
+        return existing_category
+
+    async def delete(self, category_id: int) -> bool:
+        """
+        Delete a category from the database
+        """
+        category = await self.get_one(category_id)
+        if category:
+            await self.session.delete(category)
+            await self.session.commit()
+            return True
+        return False
@@ -1,7 +1,13 @@
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from src.app.entities.log import Log
+from src.app.orm.mcq_orm import request_logs
 from src.app.repositories.base_repository import BaseRepository
 
+# rows per batched INSERT, keeps the bind parameter count far below the driver limit
+BULK_INSERT_CHUNK_SIZE = 1000
+
 
 class LogRepository(BaseRepository):
     def __init__(self, session: Session):
@@ -21,10 +27,9 @@ class LogRepository(BaseRepository):
 
     def add(self, log: Log) -> Log:
         """
-        Add a new log entry
+        Add a new log entry to the session, committed by the caller
         """
         self.session.add(log)
-        self.session.commit()
         return log
 
     def update(self, log: Log) -> Log:
@@ -33,8 +38,9 @@ class LogRepository(BaseRepository):
         """
         existing_log = self.session.query(Log).filter_by(id=log.id).first()
         if existing_log:
-            existing_log.message = log.message
-            existing_log.timestamp = log.timestamp
+            existing_log.status_code = log.status_code
+            existing_log.latency_ms = log.latency_ms
+            existing_log.db_time_ms = log.db_time_ms
             self.session.commit()
         return existing_log
 
@@ -48,3 +54,17 @@ class LogRepository(BaseRepository):
             self.session.commit()
             return True
         return False
+
+
+class AsyncLogRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add_many(self, rows: list[dict]) -> int:
+        """
+        Insert request log rows as one batched core INSERT (per chunk), committed by the caller.
+        Returns the number of rows inserted.
+        """
+        for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+            await self.session.execute(insert(request_logs), rows[start:start + BULK_INSERT_CHUNK_SIZE])
+        return len(rows)
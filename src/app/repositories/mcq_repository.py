@@ -1,8 +1,63 @@
-from sqlalchemy import func
+import json
+import random
+import re
+import sys
+from array import array
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Integer, Row, bindparam, func, literal, select, text, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.app.common.cache import TTLCache
+from src.app.common.pagination import MCQ_SORT_OPTIONS
+from src.app.config import settings
+from src.app.orm.dialects import is_postgresql
 from src.app.repositories.base_repository import BaseRepository
-from src.app.entities.mcq import MCQ
+from src.app.entities.mcq import MCQ, build_mcq_fingerprint
+
+# category id -> compact array of the MCQ ids in that category, used for quiz sampling
+CATEGORY_ID_CACHE = TTLCache(max_entries=settings.CATEGORY_ID_CACHE_MAX_CATEGORIES,
+                             ttl_seconds=settings.CATEGORY_ID_CACHE_TTL_SECONDS)
+
+
+# whether pg_trgm is installed, looked up on the first fuzzy search of the process
+TRIGRAM_SEARCH_AVAILABLE = None
+
+
+def answer_key_size(answer_key: frozenset) -> int:
+    """
+    Approximate memory held by a cached answer key, used to enforce the cache's byte cap.
+    """
+    return sys.getsizeof(answer_key) + sum(sys.getsizeof(option) for option in answer_key)
+
+
+# mcq id -> frozenset of stripped, lower-cased correct options, used for grading
+ANSWER_KEY_CACHE = TTLCache(max_entries=sys.maxsize,
+                            ttl_seconds=settings.ANSWER_KEY_CACHE_TTL_SECONDS,
+                            max_bytes=settings.ANSWER_KEY_CACHE_MAX_BYTES,
+                            sizeof=answer_key_size)
+
+
+def invalidate_category_ids(*category_ids: int):
+    """
+    Drop the cached MCQ id arrays of the given categories after MCQs were added, moved or removed.
+    """
+    for category_id in category_ids:
+        CATEGORY_ID_CACHE.pop(category_id)
+
+
+def invalidate_answer_keys(*mcq_ids: int):
+    """
+    Drop the cached answer keys of the given MCQs after they were written or removed.
+    """
+    for mcq_id in mcq_ids:
+        ANSWER_KEY_CACHE.pop(mcq_id)
+
+
+def normalize_answer_key(correct_options: list[str]) -> frozenset:
+    return frozenset(option.strip().lower() for option in correct_options)
 
 
 class MCQRepository(BaseRepository):
@@ -80,16 +135,335 @@ class MCQRepository(BaseRepository):
             self.session.rollback()
             return False
 
+    def get_by_fingerprint(self, fingerprint: str) -> MCQ | None:
+        """
+        Retrieve the MCQ with the given fingerprint (a unique index lookup)
+        """
+        return self.session.query(MCQ).filter(MCQ.fingerprint == fingerprint).first()
+
     def get_by_question_and_options(self, question: str, options: list[str]) -> MCQ | None:
         """
         Retrieves a MCQ from the database that matches both the question text and the provided options.
         """
-        mcqs = self.session.query(MCQ).filter(func.lower(func.trim(MCQ.question)) == question).all()
-        print("mcqs check:", mcqs)
+        return self.get_by_fingerprint(build_mcq_fingerprint(question, options))
+
+    def iter_lsh_bucket_groups(self, batch_size: int = 1000):
+        """
+        Stream the groups of MCQs sharing an LSH bucket, as (ids, questions) tuples, for the
+        near-duplicate cluster report. Buckets holding a single MCQ are skipped.
+        """
+        if not is_postgresql(self.session):
+            # SQLite stores the buckets as JSON arrays, expanded with json_each
+            result = self.session.execute(text("""
+                SELECT json_group_array(id) AS ids, json_group_array(question) AS questions
+                FROM (SELECT m.id, m.question, b.value AS bucket
+                      FROM mcq AS m, json_each(m.lsh_buckets) AS b ORDER BY m.id)
+                GROUP BY bucket
+                HAVING count(*) > 1
+            """))
+            for row in result:
+                yield json.loads(row.ids), json.loads(row.questions)
+            return
+
+        result = self.session.execute(
+            text("""
+                SELECT array_agg(id ORDER BY id) AS ids, array_agg(question ORDER BY id) AS questions
+                FROM (SELECT id, question, unnest(lsh_buckets) AS bucket FROM mcq) AS b
+                GROUP BY bucket
+                HAVING count(*) > 1
+            """).execution_options(yield_per=batch_size)
+        )
+        for row in result:
+            yield row.ids, row.questions
+
+    def get_summaries(self, mcq_ids: list[int]) -> list[Row]:
+        """
+        Retrieve the id, question and category of the given MCQs
+        """
+        return self.session.execute(
+            select(MCQ.id, MCQ.question, MCQ.category).where(MCQ.id.in_(mcq_ids))
+        ).all()
+
+
+class AsyncMCQRepository(BaseRepository):
+    def __init__(self, session: AsyncSession):
+        super().__init__()
+        self.session = session
+
+    async def get_one(self, item_id: int) -> MCQ | None:
+        """
+        Retrieve a single MCQ by its ID
+        """
+        try:
+            result = await self.session.execute(select(MCQ).where(MCQ.id == item_id))
+            return result.scalars().first()
+        except SQLAlchemyError as e:
+            print(f"Error getting MCQ by id {item_id}: {e}")
+            return None
+
+    async def get_all(self) -> list[MCQ]:
+        """
+        Retrieve all MCQs
+        """
+        try:
+            result = await self.session.execute(select(MCQ))
+            return list(result.scalars().all())
+        except SQLAlchemyError as e:
+            print(f"Error retrieving all MCQs: {e}")
+            return []
+
+    async def get_page(self, limit: int, sort: str, after: tuple | None = None, category_id: int | None = None,
+                       created_by: int | None = None, created_from: datetime | None = None,
+                       created_to: datetime | None = None) -> list[Row]:
+        """
+        Retrieve one page of MCQs in `sort` order (see `MCQ_SORT_OPTIONS`), starting after the
+        sort key `after` (keyset pagination, so every page costs the same however deep it is),
+        projected to the listed fields. Filters are combined; the date range is inclusive.
+        """
+        column, descending = MCQ_SORT_OPTIONS[sort]
+        keyset = (MCQ.id,) if column == "id" else (MCQ.created_date, MCQ.id)
+
+        query = select(MCQ.id, MCQ.question, MCQ.options, MCQ.correct_option, MCQ.category, MCQ.created_date)
+        if category_id is not None:
+            query = query.where(MCQ.category == category_id)
+        if created_by is not None:
+            query = query.where(MCQ.created_by == created_by)
+        if created_from is not None:
+            query = query.where(MCQ.created_date >= created_from)
+        if created_to is not None:
+            query = query.where(MCQ.created_date <= created_to)
+        if after is not None:
+            position, last = tuple_(*keyset), tuple_(*after)
+            query = query.where(position < last if descending else position > last)
+
+        query = query.order_by(*(key.desc() if descending else key.asc() for key in keyset)).limit(limit)
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def iter_export_batches(self, batch_size: int):
+        """
+        Stream every MCQ in id order through a server-side cursor, as lists of up to `batch_size`
+        rows, so only one batch is held in memory at a time.
+        """
+        result = await self.session.stream(
+            select(MCQ.id, MCQ.question, MCQ.options, MCQ.correct_option, MCQ.category,
+                   MCQ.created_by, MCQ.created_date)
+            .order_by(MCQ.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            yield rows
+
+    async def get_by_category(self, category_id: int) -> list[MCQ]:
+        """
+        Retrieve all MCQs by category ID
+        """
+        result = await self.session.execute(select(MCQ).where(MCQ.category == category_id))
+        return list(result.scalars().all())
+
+    async def get_ids_by_category(self, category_id: int) -> array:
+        """
+        Retrieve the ids of all MCQs in a category, served from the per-category id cache when possible
+        """
+        mcq_ids = CATEGORY_ID_CACHE.get(category_id)
+        if mcq_ids is None:
+            result = await self.session.execute(select(MCQ.id).where(MCQ.category == category_id))
+            mcq_ids = array("q", result.scalars().all())
+            CATEGORY_ID_CACHE.set(category_id, mcq_ids)
+        return mcq_ids
 
-        for mcq in mcqs:
-            stored_options = sorted(opt.strip().lower() for opt in mcq.options)
-            print("stored_options check:", stored_options)
-            if stored_options == options:
-                return mcq
-        return None
\ No newline at end of file
+    async def sample_by_category(self, category_id: int, sample_size: int) -> list[Row]:
+        """
+        Retrieve up to `sample_size` random MCQs of a category, projected to id, question and options.
+        Only the sampled rows are fetched; the candidate ids come from the per-category id cache.
+        """
+        for _ in range(2):
+            mcq_ids = await self.get_ids_by_category(category_id)
+            chosen_ids = random.sample(mcq_ids, min(len(mcq_ids), sample_size))
+            if not chosen_ids:
+                return []
+
+            result = await self.session.execute(
+                select(MCQ.id, MCQ.question, MCQ.options).where(MCQ.id.in_(chosen_ids))
+            )
+            rows = result.all()
+            if len(rows) == len(chosen_ids):
+                break
+            # some cached ids were deleted or moved by another worker, rebuild the id array once
+            invalidate_category_ids(category_id)
+
+        position = {mcq_id: index for index, mcq_id in enumerate(chosen_ids)}
+        return sorted(rows, key=lambda row: position[row.id])
+
+    async def get_answer_keys(self, mcq_ids: list[int]) -> dict[int, frozenset]:
+        """
+        Retrieve the normalized (stripped, lower-cased) correct options of the given MCQs, keyed by
+        MCQ id. Cached answer keys are served from memory, only the misses are queried.
+        """
+        answer_keys = {}
+        missing_ids = []
+        for mcq_id in mcq_ids:
+            answer_key = ANSWER_KEY_CACHE.get(mcq_id)
+            if answer_key is None:
+                missing_ids.append(mcq_id)
+            else:
+                answer_keys[mcq_id] = answer_key
+
+        if missing_ids:
+            result = await self.session.execute(
+                select(MCQ.id, MCQ.correct_option).where(MCQ.id.in_(missing_ids))
+            )
+            for row in result:
+                answer_key = normalize_answer_key(row.correct_option)
+                ANSWER_KEY_CACHE.set(row.id, answer_key)
+                answer_keys[row.id] = answer_key
+        return answer_keys
+
+    async def get_by_fingerprint(self, fingerprint: str) -> MCQ | None:
+        """
+        Retrieve the MCQ with the given fingerprint (a unique index lookup)
+        """
+        result = await self.session.execute(select(MCQ).where(MCQ.fingerprint == fingerprint))
+        return result.scalars().first()
+
+    async def get_similarity_candidates(self, lsh_buckets: list[int], limit: int) -> list[Row]:
+        """
+        Retrieve the MCQs sharing at least one LSH bucket with `lsh_buckets` (a GIN index lookup),
+        projected to id, question and category. At most `limit` are returned, those sharing the most
+        buckets first.
+        """
+        if not is_postgresql(self.session):
+            # SQLite has no array index: the stored JSON buckets are scanned
+            result = await self.session.execute(
+                text("""
+                    SELECT m.id, m.question, m.category FROM mcq AS m, json_each(m.lsh_buckets) AS b
+                    WHERE b.value IN (SELECT value FROM json_each(:lsh_buckets))
+                    GROUP BY m.id
+                    ORDER BY count(*) DESC, m.id
+                    LIMIT :limit
+                """),
+                {"lsh_buckets": json.dumps(lsh_buckets), "limit": limit}
+            )
+            return result.all()
+
+        result = await self.session.execute(
+            text("""
+                SELECT id, question, category FROM mcq
+                WHERE lsh_buckets && :lsh_buckets
+                ORDER BY (SELECT count(*) FROM unnest(lsh_buckets) AS b WHERE b = ANY(:lsh_buckets)) DESC, id
+                LIMIT :limit
+            """).bindparams(bindparam("lsh_buckets", type_=ARRAY(BigInteger))),
+            {"lsh_buckets": lsh_buckets, "limit": limit}
+        )
+        return result.all()
+
+    async def search_full_text(self, query: str, category_id: int | None, limit: int) -> list[Row]:
+        """
+        Retrieve up to `limit` MCQs whose question matches the web-search style `query` (a GIN index
+        lookup on the search vector), best ranked first, optionally within one category
+        """
+        if not is_postgresql(self.session):
+            return await self.search_words(query, category_id, limit)
+
+        result = await self.session.execute(
+            text(f"""
+                SELECT m.id, m.question, m.options, m.correct_option, m.category,
+                       ts_rank_cd(m.search_vector, q) AS score
+                FROM mcq AS m, websearch_to_tsquery('english', :query) AS q
+                WHERE m.search_vector @@ q {"AND m.category = :category_id" if category_id is not None else ""}
+                ORDER BY score DESC, m.id
+                LIMIT :limit
+            """),
+            {"query": query, "category_id": category_id, "limit": limit}
+        )
+        return result.all()
+
+    async def has_trigram_search(self) -> bool:
+        """
+        Whether the pg_trgm extension (and so fuzzy search) is installed, checked once per process
+        """
+        global TRIGRAM_SEARCH_AVAILABLE
+        if TRIGRAM_SEARCH_AVAILABLE is None and not is_postgresql(self.session):
+            TRIGRAM_SEARCH_AVAILABLE = False
+        elif TRIGRAM_SEARCH_AVAILABLE is None:
+            result = await self.session.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+            TRIGRAM_SEARCH_AVAILABLE = result.first() is not None
+        return TRIGRAM_SEARCH_AVAILABLE
+
+    async def search_words(self, query: str, category_id: int | None, limit: int) -> list[Row]:
+        """
+        Retrieve up to `limit` MCQs whose question contains every word of `query` (case-insensitive
+        substring matches, no stemming or ranking), in id order, optionally within one category. The
+        full-text search of databases without one (SQLite).
+        """
+        words = re.findall(r"\w+", query.lower())
+        if not words:
+            return []
+        statement = select(MCQ.id, MCQ.question, MCQ.options, MCQ.correct_option, MCQ.category,
+                           literal(1.0).label("score"))
+        statement = statement.where(*(func.lower(MCQ.question).contains(word, autoescape=True) for word in words))
+        if category_id is not None:
+            statement = statement.where(MCQ.category == category_id)
+        result = await self.session.execute(statement.order_by(MCQ.id).limit(limit))
+        return result.all()
+
+    async def search_fuzzy(self, query: str, category_id: int | None, limit: int,
+                           exclude_ids: list[int]) -> list[Row]:
+        """
+        Retrieve up to `limit` MCQs whose question contains words similar to `query` (pg_trgm word
+        similarity through the trigram index), most similar first, skipping `exclude_ids`
+        """
+        result = await self.session.execute(
+            text(f"""
+                SELECT m.id, m.question, m.options, m.correct_option, m.category,
+                       word_similarity(:query, m.question) AS score
+                FROM mcq AS m
+                WHERE :query <% m.question AND m.id <> ALL(:exclude_ids)
+                      {"AND m.category = :category_id" if category_id is not None else ""}
+                ORDER BY score DESC, m.id
+                LIMIT :limit
+            """).bindparams(bindparam("exclude_ids", type_=ARRAY(Integer))),
+            {"query": query, "category_id": category_id, "limit": limit, "exclude_ids": exclude_ids}
+        )
+        return result.all()
+
+    async def add(self, item: MCQ) -> bool:
+        """
+        Add a new MCQ to the session
+        """
+        try:
+            self.session.add(item)
+            return True
+        except SQLAlchemyError as e:
+            print(f"Error adding MCQ: {e}")
+            await self.session.rollback()
+            return False
+
+    async def update(self, item: MCQ) -> bool:
+        """
+        Update an existing MCQ
+        """
+        try:
+            await self.session.commit()
+            await self.session.refresh(item)
+            return True
+        except SQLAlchemyError as e:
+            print(f"Error adding MCQ: {e}")
+            await self.session.rollback()
+            return False
+
+    async def delete(self, item_id: int) -> bool:
+        """
+        Delete an MCQ from the database
+        """
+        try:
+            mcq = await self.get_one(item_id)
+            if mcq:
+                await self.session.delete(mcq)
+                await self.session.commit()
+                return True
+            return False
+        except SQLAlchemyError as e:
+            print(f"Error deleting MCQ with id {item_id}: {e}")
+            await self.session.rollback()
+            return False
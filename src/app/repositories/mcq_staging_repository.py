@@ -0,0 +1,356 @@
+import io
+import json
+
+from sqlalchemy import DateTime, bindparam, text
+from sqlalchemy.orm import Session
+
+from src.app.repositories.base_repository import BaseRepository
+
+STAGING_TABLE = "mcq_staging"
+
+STAGING_COLUMNS = (
+    "row_no", "question", "options", "correct_option", "category",
+    "question_cmp", "fingerprint", "options_set", "correct_set", "lsh_buckets", "error",
+)
+
+# outcome of a staged row, set by `classify`
+STATUS_NEW = "new"
+STATUS_DUPLICATE_IN_CSV = "duplicate_in_csv"
+STATUS_DUPLICATE_IN_DB = "duplicate_in_db"
+STATUS_NO_CATEGORY = "no_category"
+STATUS_INVALID = "invalid"
+
+
+def to_array_literal(values: list) -> str:
+    """
+    Render a list of strings (or of integers) as a PostgreSQL array literal for COPY.
+    """
+    if values and isinstance(values[0], int):
+        return "{" + ",".join(map(str, values)) + "}"
+    quoted = ('"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"' for value in values)
+    return "{" + ",".join(quoted) + "}"
+
+
+def to_csv_field(value) -> str:
+    """
+    Render a value as a field of COPY CSV input. Strings (and lists, as array literals) are always
+    quoted, so an empty string stays an empty string; None is the unquoted empty field COPY reads
+    as NULL.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        value = to_array_literal(value)
+    elif not isinstance(value, str):
+        return str(value)
+    return '"' + value.replace('"', '""') + '"'
+
+
+class CopyReader(io.RawIOBase):
+    """
+    File-like view of rows as COPY CSV input, rendered a row at a time while COPY reads it, so the
+    rows are never held as one large buffer. `rows` may be any iterable of dicts holding `columns`
+    (the staging columns by default).
+    """
+    def __init__(self, rows, columns: tuple = STAGING_COLUMNS):
+        super().__init__()
+        self._rows = iter(rows)
+        self._columns = columns
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._pending) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._pending += (",".join(to_csv_field(row[column]) for column in self._columns) + "\n").encode()
+        if size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+
+class MCQStagingRepository(BaseRepository):
+    """
+    Bulk ingestion of uploaded MCQs through a transaction-scoped staging table.
+
+    Rows are loaded with psycopg2's COPY, checked against `mcq` and `categories` with set-based
+    SQL and merged into `mcq` with a single INSERT ... SELECT. The staging table is a temporary
+    table dropped on commit, so every upload works on its own copy.
+    """
+    def __init__(self, session: Session):
+        super().__init__()
+        self.session = session
+
+    def create(self):
+        """
+        Create the staging table for the current transaction.
+        """
+        self.session.execute(text(f"""
+            CREATE TEMPORARY TABLE {STAGING_TABLE} (
+                row_no integer PRIMARY KEY,
+                question text NOT NULL,
+                options text[] NOT NULL,
+                correct_option text[] NOT NULL,
+                category integer NOT NULL,
+                question_cmp text NOT NULL,
+                fingerprint text NOT NULL,
+                options_set text[] NOT NULL,
+                correct_set text[] NOT NULL,
+                lsh_buckets bigint[] NOT NULL,
+                error text,
+                status text
+            ) ON COMMIT DROP
+        """))
+
+    def copy_rows(self, rows: list[dict]) -> int:
+        """
+        Load rows into the staging table with COPY. Each row holds the `STAGING_COLUMNS` keys, with
+        the list columns as lists of strings. Returns the number of rows loaded.
+        """
+        if not rows:
+            return 0
+        cursor = self.session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                CopyReader(rows)
+            )
+        finally:
+            cursor.close()
+        return len(rows)
+
+    def classify(self):
+        """
+        Mark every staged row with its outcome, in the order the row-by-row upload checked them:
+        repeated in the file, already in the database, unknown category, failed validation, new.
+
+        A row also counts as a database duplicate when an earlier row of the same upload with the
+        same question and options is inserted, as it would have been flushed before it was checked.
+        """
+        self.session.execute(text(f"""
+            UPDATE {STAGING_TABLE} AS s
+            SET status = CASE
+                WHEN k.csv_rank > 1 THEN '{STATUS_DUPLICATE_IN_CSV}'
+                WHEN k.row_no > k.first_new_row OR k.in_db THEN '{STATUS_DUPLICATE_IN_DB}'
+                WHEN NOT k.has_category THEN '{STATUS_NO_CATEGORY}'
+                WHEN s.error IS NOT NULL THEN '{STATUS_INVALID}'
+                ELSE '{STATUS_NEW}'
+            END
+            FROM (
+                SELECT r.row_no, r.csv_rank, r.has_category, r.in_db,
+                       min(r.row_no) FILTER (WHERE r.csv_rank = 1 AND r.has_category AND r.error IS NULL)
+                           OVER (PARTITION BY r.fingerprint) AS first_new_row
+                FROM (
+                    SELECT t.row_no, t.fingerprint, t.error,
+                           row_number() OVER (
+                               PARTITION BY t.question_cmp, t.options_set, t.correct_set ORDER BY t.row_no
+                           ) AS csv_rank,
+                           EXISTS (SELECT 1 FROM categories AS c WHERE c.id = t.category) AS has_category,
+                           -- one probe of the unique fingerprint index per staged row
+                           EXISTS (SELECT 1 FROM mcq AS m WHERE m.fingerprint = t.fingerprint) AS in_db
+                    FROM {STAGING_TABLE} AS t
+                ) AS r
+            ) AS k
+            WHERE k.row_no = s.row_no
+        """))
+
+    def count_by_status(self) -> dict[str, int]:
+        """
+        Number of staged rows per outcome.
+        """
+        result = self.session.execute(text(f"SELECT status, count(*) FROM {STAGING_TABLE} GROUP BY status"))
+        return {status: count for status, count in result}
+
+    def get_rejected(self) -> list[dict]:
+        """
+        Staged rows that failed the category check or validation, in file order.
+        """
+        result = self.session.execute(text(f"""
+            SELECT row_no, question, status, error FROM {STAGING_TABLE}
+            WHERE status IN ('{STATUS_NO_CATEGORY}', '{STATUS_INVALID}')
+            ORDER BY row_no
+        """))
+        return [dict(row) for row in result.mappings()]
+
+    def iter_similarity_candidates(self, limit: int, batch_size: int = 1000):
+        """
+        Stream the near-duplicate candidates of the new staged rows, in file order: stored MCQs and
+        earlier new rows of the upload sharing an LSH bucket with the row, at most `limit` of each per
+        row. Yields (row_no, question, candidate id, candidate question, candidate category) rows; the
+        id and category are None for candidates from the upload itself.
+
+        Must run before `merge`, while the new rows are not yet in `mcq`.
+        """
+        self.session.execute(text(f"CREATE INDEX ON {STAGING_TABLE} USING gin (lsh_buckets)"))
+        self.session.execute(text(f"ANALYZE {STAGING_TABLE}"))
+        result = self.session.execute(text(f"""
+            SELECT s.row_no, s.question, c.id, c.question AS candidate_question, c.category
+            FROM {STAGING_TABLE} AS s
+            CROSS JOIN LATERAL (
+                (SELECT m.id, m.question, m.category FROM mcq AS m
+                 WHERE m.lsh_buckets && s.lsh_buckets LIMIT :limit)
+                UNION ALL
+                (SELECT NULL, e.question, NULL FROM {STAGING_TABLE} AS e
+                 WHERE e.lsh_buckets && s.lsh_buckets AND e.status = '{STATUS_NEW}' AND e.row_no < s.row_no
+                 LIMIT :limit)
+            ) AS c
+            WHERE s.status = '{STATUS_NEW}'
+            ORDER BY s.row_no
+        """).execution_options(yield_per=batch_size), {"limit": limit})
+        yield from result
+
+    def merge(self, created_by: int, created_date) -> tuple[int, list[int]]:
+        """
+        Insert all new staged rows into `mcq` with one statement. Returns the number of inserted
+        MCQs and the categories they were added to.
+
+        Rows whose fingerprint was stored by a concurrent upload after `classify` are skipped by the
+        unique index rather than failing the upload; they are the difference between the rows marked
+        new and the inserted count.
+        """
+        result = self.session.execute(text(f"""
+            WITH inserted AS (
+                INSERT INTO mcq (question, options, correct_option, category, created_by, created_date, fingerprint,
+                                 lsh_buckets)
+                SELECT question, options, correct_option, category, :created_by, :created_date, fingerprint,
+                       lsh_buckets
+                FROM {STAGING_TABLE}
+                WHERE status = '{STATUS_NEW}'
+                ORDER BY row_no
+                ON CONFLICT (fingerprint) DO NOTHING
+                RETURNING category
+            )
+            SELECT count(*), coalesce(array_agg(DISTINCT category), '{{}}') FROM inserted
+        """), {"created_by": created_by, "created_date": created_date})
+        inserted_count, categories = result.one()
+        return inserted_count, list(categories)
+
+    def get_one(self, item_id: int) -> dict | None:
+        """
+        Retrieve a staged row by its row number in the upload.
+        """
+        result = self.session.execute(text(f"SELECT * FROM {STAGING_TABLE} WHERE row_no = :row_no"),
+                                      {"row_no": item_id})
+        row = result.mappings().first()
+        return dict(row) if row else None
+
+    def get_all(self) -> list[dict]:
+        """
+        Retrieve all staged rows in file order.
+        """
+        result = self.session.execute(text(f"SELECT * FROM {STAGING_TABLE} ORDER BY row_no"))
+        return [dict(row) for row in result.mappings()]
+
+    def add(self, item: dict) -> dict:
+        """
+        Stage a single row.
+        """
+        self.copy_rows([item])
+        return item
+
+
+class SQLiteMCQStagingRepository(MCQStagingRepository):
+    """
+    `MCQStagingRepository` for SQLite (see DATABASE_URL): rows are inserted in batches instead of
+    COPY, list columns are JSON arrays, and LSH candidates are found by joining the buckets
+    expanded with json_each instead of through a GIN index. The checks and the merge are the same.
+    """
+    def create(self):
+        """
+        Create the staging table, replacing one left on this connection by an earlier upload
+        (SQLite has no ON COMMIT DROP).
+        """
+        self.session.execute(text(f"DROP TABLE IF EXISTS temp.{STAGING_TABLE}"))
+        self.session.execute(text(f"""
+            CREATE TEMPORARY TABLE {STAGING_TABLE} (
+                row_no integer PRIMARY KEY,
+                question text NOT NULL,
+                options text NOT NULL,
+                correct_option text NOT NULL,
+                category integer NOT NULL,
+                question_cmp text NOT NULL,
+                fingerprint text NOT NULL,
+                options_set text NOT NULL,
+                correct_set text NOT NULL,
+                lsh_buckets text NOT NULL,
+                error text,
+                status text
+            )
+        """))
+
+    def copy_rows(self, rows: list[dict]) -> int:
+        """
+        Insert rows into the staging table as one batched INSERT, with the list columns as JSON.
+        Returns the number of rows loaded.
+        """
+        if not rows:
+            return 0
+        self.session.execute(
+            text(f"INSERT INTO {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) "
+                 f"VALUES ({', '.join(':' + column for column in STAGING_COLUMNS)})"),
+            [{column: json.dumps(value) if isinstance(value, list) else value for column, value in row.items()}
+             for row in rows]
+        )
+        return len(rows)
+
+    def iter_similarity_candidates(self, limit: int, batch_size: int = 1000):
+        """
+        Stream the near-duplicate candidates of the new staged rows, in file order, like
+        `MCQStagingRepository.iter_similarity_candidates`. Must run before `merge`.
+        """
+        result = self.session.execute(text(f"""
+            WITH new_buckets AS (
+                SELECT s.row_no, b.value AS bucket
+                FROM {STAGING_TABLE} AS s, json_each(s.lsh_buckets) AS b
+                WHERE s.status = '{STATUS_NEW}'
+            ),
+            stored AS (
+                SELECT DISTINCT n.row_no, m.id
+                FROM new_buckets AS n
+                JOIN (SELECT m.id, b.value AS bucket FROM mcq AS m, json_each(m.lsh_buckets) AS b) AS m
+                    ON m.bucket = n.bucket
+            ),
+            earlier AS (
+                SELECT DISTINCT n.row_no, e.row_no AS earlier_row_no
+                FROM new_buckets AS n
+                JOIN new_buckets AS e ON e.bucket = n.bucket AND e.row_no < n.row_no
+            ),
+            candidates AS (
+                SELECT c.row_no, m.id, m.question, m.category,
+                       row_number() OVER (PARTITION BY c.row_no ORDER BY m.id) AS n
+                FROM stored AS c JOIN mcq AS m ON m.id = c.id
+                UNION ALL
+                SELECT c.row_no, NULL, e.question, NULL,
+                       row_number() OVER (PARTITION BY c.row_no ORDER BY c.earlier_row_no) AS n
+                FROM earlier AS c JOIN {STAGING_TABLE} AS e ON e.row_no = c.earlier_row_no
+            )
+            SELECT s.row_no, s.question, c.id, c.question AS candidate_question, c.category
+            FROM candidates AS c JOIN {STAGING_TABLE} AS s ON s.row_no = c.row_no
+            WHERE c.n <= :limit
+            ORDER BY s.row_no
+        """), {"limit": limit})
+        yield from result
+
+    def merge(self, created_by: int, created_date) -> tuple[int, list[int]]:
+        """
+        Insert all new staged rows into `mcq` with one statement, like `MCQStagingRepository.merge`.
+        Returns the number of inserted MCQs and the categories they were added to.
+        """
+        result = self.session.execute(text(f"""
+            INSERT INTO mcq (question, options, correct_option, category, created_by, created_date, fingerprint,
+                             lsh_buckets)
+            SELECT question, options, correct_option, category, :created_by, :created_date, fingerprint,
+                   lsh_buckets
+            FROM {STAGING_TABLE}
+            WHERE status = '{STATUS_NEW}'
+            ORDER BY row_no
+            ON CONFLICT (fingerprint) DO NOTHING
+            RETURNING category
+        """).bindparams(bindparam("created_date", type_=DateTime)),
+            {"created_by": created_by, "created_date": created_date})
+        categories = result.scalars().all()
+        return len(categories), sorted(set(categories))
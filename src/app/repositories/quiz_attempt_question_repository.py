@@ -1,9 +1,15 @@
+from sqlalchemy import insert, select
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src.app.entities.quiz_attempt_questions import AttemptQuestion
+from src.app.orm.mcq_orm import attempt_questions
 from src.app.repositories.base_repository import BaseRepository
 
+# rows per batched INSERT, keeps the bind parameter count far below the driver limit
+BULK_INSERT_CHUNK_SIZE = 1000
+
 
 class AttemptQuestionRepository(BaseRepository):
     def __init__(self, session: Session):
@@ -76,3 +82,67 @@ class AttemptQuestionRepository(BaseRepository):
         except SQLAlchemyError:
             self.session.rollback()
             raise
+
+
+class AsyncAttemptQuestionRepository(BaseRepository):
+    def __init__(self, session: AsyncSession):
+        super().__init__()
+        self.session = session
+
+    async def get_one(self, item_id: int) -> AttemptQuestion | None:
+        """
+        Retrieve a single Quiz Attempt Question by its ID.
+        """
+        try:
+            result = await self.session.execute(select(AttemptQuestion).filter_by(id=item_id))
+            return result.scalars().first()
+        except SQLAlchemyError:
+            await self.session.rollback()
+            return None
+
+    async def get_all(self) -> list[AttemptQuestion]:
+        """
+        Retrieve all Quiz Attempt Question records.
+        """
+        try:
+            result = await self.session.execute(select(AttemptQuestion))
+            return list(result.scalars().all())
+        except SQLAlchemyError:
+            await self.session.rollback()
+            return []
+
+    async def add(self, item: AttemptQuestion) -> AttemptQuestion:
+        """
+        Add a new Quiz Attempt Question to the session.
+        """
+        try:
+            self.session.add(item)
+            await self.session.flush()
+            return item
+        except SQLAlchemyError:
+            await self.session.rollback()
+            raise
+
+    async def add_many(self, rows: list[dict]) -> int:
+        """
+        Insert Quiz Attempt Question rows as one batched core INSERT (per chunk), bypassing the ORM
+        unit of work and identity map. Returns the number of rows inserted.
+        """
+        try:
+            for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+                await self.session.execute(insert(attempt_questions), rows[start:start + BULK_INSERT_CHUNK_SIZE])
+            return len(rows)
+        except SQLAlchemyError:
+            await self.session.rollback()
+            raise
+
+    async def get_by_attempt(self, attempt_id: int) -> list[AttemptQuestion]:
+        """
+        Retrieve all Quiz Attempt Question rows for a given attempt_id.
+        """
+        try:
+            result = await self.session.execute(select(AttemptQuestion).filter_by(attempt_id=attempt_id))
+            return list(result.scalars().all())
+        except SQLAlchemyError:
+            await self.session.rollback()
+            return []
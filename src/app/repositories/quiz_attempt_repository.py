@@ -1,4 +1,6 @@
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src.app.entities.quiz_attempt import QuizAttempt
@@ -73,4 +75,44 @@ class QuizAttemptRepository(BaseRepository):
         except SQLAlchemyError as e:
             print(f"Error updating QuizAttempt: {e}")
             self.session.rollback()
-            return False
\ No newline at end of file
+            return False
+
+class AsyncQuizAttemptRepository(BaseRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_one(self, item_id: int) -> QuizAttempt | None:
+        """
+        Retrieve a single quiz attempt by its ID
+        """
+        result = await self.session.execute(select(QuizAttempt).filter_by(id=item_id))
+        return result.scalars().first()
+
+    async def get_all(self) -> list[QuizAttempt]:
+        """
+        Retrieve all quiz attempts
+        """
+        result = await self.session.execute(select(QuizAttempt))
+        return list(result.scalars().all())
+
+    async def get_by_user(self, user_id: int) -> list[QuizAttempt]:
+        """
+        Retrieve all quiz attempts for a specific user
+        """
+        result = await self.session.execute(select(QuizAttempt).where(QuizAttempt.user_id == user_id))
+        return list(result.scalars().all())
+
+    async def get_by_attempt_id(self, attempt_id: int) -> QuizAttempt | None:
+        """
+        Retrieve a quiz attempt by its attempt ID
+        """
+        result = await self.session.execute(select(QuizAttempt).filter_by(attempt_id=attempt_id))
+        return result.scalars().first()
+
+    async def add(self, quiz_attempt: QuizAttempt) -> QuizAttempt:
+        """
+        Add a new quiz attempts to the database
+        """
+        self.session.add(quiz_attempt)
+        await self.session.commit()
+        return quiz_attempt
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app.common.cache import TTLCache
+from src.app.config import settings
+from src.app.entities.quiz_session import QuizSession, build_quiz_session_from_object
+from src.app.repositories.base_repository import BaseRepository
+
+# attempt_id -> questions served by /quiz/start, so /quiz/submit can skip the database on a hit
+ATTEMPT_STATE_CACHE = TTLCache(max_entries=settings.ATTEMPT_STATE_CACHE_MAX_ENTRIES,
+                               ttl_seconds=settings.ATTEMPT_STATE_TTL_SECONDS)
+
+
+class AsyncQuizSessionRepository(BaseRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_one(self, item_id: int) -> QuizSession | None:
+        """
+        Retrieve the served questions of a started quiz by attempt ID, from the in-process store
+        when possible and from the database otherwise (other worker, restart or eviction).
+        """
+        cached = ATTEMPT_STATE_CACHE.get(item_id)
+        if cached is not None:
+            return build_quiz_session_from_object(cached)
+
+        result = await self.session.execute(select(QuizSession).filter_by(attempt_id=item_id))
+        quiz_session = result.scalars().first()
+        if quiz_session:
+            self.remember(quiz_session)
+        return quiz_session
+
+    async def get_all(self) -> list[QuizSession]:
+        """
+        Retrieve all started, not yet submitted quizzes
+        """
+        result = await self.session.execute(select(QuizSession))
+        return list(result.scalars().all())
+
+    async def add(self, quiz_session: QuizSession) -> QuizSession:
+        """
+        Add a started quiz to the session. Call `remember` once it is committed.
+        """
+        self.session.add(quiz_session)
+        await self.session.flush()
+        return quiz_session
+
+    @staticmethod
+    def remember(quiz_session: QuizSession):
+        """
+        Keep a committed quiz in the in-process store.
+        """
+        ATTEMPT_STATE_CACHE.set(quiz_session.attempt_id, quiz_session.to_dict())
+
+    async def delete(self, attempt_id: int) -> int:
+        """
+        Remove a started quiz once it has been submitted. Returns the number of rows deleted.
+        """
+        ATTEMPT_STATE_CACHE.pop(attempt_id)
+        result = await self.session.execute(delete(QuizSession).where(QuizSession.attempt_id == attempt_id))
+        return result.rowcount
+
+    async def delete_expired(self, before: datetime) -> int:
+        """
+        Remove the quizzes started before `before` and never submitted. Returns the number of rows deleted.
+        """
+        result = await self.session.execute(delete(QuizSession).where(QuizSession.created_date < before))
+        return result.rowcount
@@ -0,0 +1,67 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Row, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app.entities.refresh_token import RefreshToken
+
+
+class AsyncRefreshTokenRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add(self, refresh_token: RefreshToken) -> RefreshToken:
+        """
+        Add a refresh token to the session, committed by the caller.
+        """
+        self.session.add(refresh_token)
+        await self.session.flush()
+        return refresh_token
+
+    async def get_by_hash(self, token_hash: bytes) -> RefreshToken | None:
+        """
+        Retrieve a refresh token by the hash of its value (a unique index lookup)
+        """
+        result = await self.session.execute(select(RefreshToken).where(RefreshToken.token_hash == token_hash))
+        return result.scalars().first()
+
+    async def revoke_active(self, token_hash: bytes, now: datetime) -> Row | None:
+        """
+        Revoke the token with the given hash if it is neither revoked nor expired, returning its
+        user_id and family_id. The check and the update are one statement, so a token can be
+        redeemed only once even by concurrent requests.
+        """
+        result = await self.session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.token_hash == token_hash, RefreshToken.revoked_at.is_(None),
+                   RefreshToken.expires_at > now)
+            .values(revoked_at=now)
+            .returning(RefreshToken.user_id, RefreshToken.family_id)
+            .execution_options(synchronize_session=False)
+        )
+        return result.first()
+
+    async def revoke_family(self, family_id: uuid.UUID, now: datetime) -> int:
+        """
+        Revoke every live token of a family. Returns the number of tokens revoked.
+        """
+        result = await self.session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    async def revoke_user(self, user_id: int, now: datetime) -> int:
+        """
+        Revoke every live token of a user. Returns the number of tokens revoked.
+        """
+        result = await self.session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
@@ -1,8 +1,12 @@
-from sqlalchemy import func, literal
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
+from src.app.entities.role import Role
 from src.app.entities.user import User
+from src.app.orm.dialects import is_postgresql
 
 
 class UserRepository:
@@ -64,3 +68,90 @@ class UserRepository:
         except SQLAlchemyError as e:
             print(f"Error fetching user by ID {user_id}: {e}")
             return None
+
+    def get_existing_emails(self, emails: list[str]) -> set[str]:
+        """
+        Retrieves which of the given lowercase emails already belong to a user, in one query.
+        """
+        result = self.session.execute(select(func.lower(User.email)).where(func.lower(User.email).in_(emails)))
+        return set(result.scalars())
+
+    def get_role_ids(self) -> set[int]:
+        """
+        Retrieves the ids of all roles.
+        """
+        return set(self.session.execute(select(Role.id)).scalars())
+
+    def add_many(self, users: list[dict]) -> dict[str, int]:
+        """
+        Inserts users in one batched statement, skipping emails a concurrent request took meanwhile.
+        Committed by the caller.
+
+        Returns
+        -------
+        dict
+            The id of each inserted user by email.
+        """
+        insert = postgresql.insert if is_postgresql(self.session) else sqlite.insert
+        result = self.session.execute(
+            insert(User).on_conflict_do_nothing(index_elements=["email"]).returning(User.id, User.email),
+            users,
+        )
+        return {row.email: row.id for row in result}
+
+
+class AsyncUserRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add(self, user: User) -> bool:
+        """
+        Adds a new user to the database.
+
+        Returns
+        -------
+        bool
+            True if user added successfully, if not False.
+        """
+        try:
+            self.session.add(user)
+            await self.session.commit()
+            return True
+        except SQLAlchemyError as e:
+            print(f"Error adding user: {e}")
+            await self.session.rollback()
+            return False
+
+    async def get_by_email(self, email: str) -> User | None:
+        """
+        Retrieves a user by email.
+
+        Returns
+        -------
+        User
+            The user if found, None if not.
+        """
+        try:
+            search_email = email.strip().strip('\"')
+            result = await self.session.execute(
+                select(User).where(func.lower(User.email) == func.lower(literal(search_email))))
+            return result.scalars().first()
+        except SQLAlchemyError as e:
+            print(f"Error fetching user by email {email}: {e}")
+            return None
+
+    async def get_by_id(self, user_id: int) -> User | None:
+        """
+        Retrieves a user by user_id.
+
+        Returns
+        -------
+        User
+            The user if found, None if not.
+        """
+        try:
+            result = await self.session.execute(select(User).where(User.id == user_id))
+            return result.scalars().first()
+        except SQLAlchemyError as e:
+            print(f"Error fetching user by ID {user_id}: {e}")
+            return None
@@ -1,35 +1,153 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
-from fastapi.responses import JSONResponse
-from typing import List
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from datetime import datetime
+from typing import List, Literal
 
+from src.app.common.pagination import MCQ_SORT_OPTIONS
 from src.app.common.utils import get_current_user
+from src.app.config import settings
 from src.app.schemas import mcq_schema
 from src.app.services.mcq_services import MCQService
-from src.app.services.unit_of_work import MCQUnitOfWork
+from src.app.services.unit_of_work import AsyncMCQUnitOfWork, MCQUnitOfWork, get_unit_of_work
 
 mcq_blueprint = APIRouter()
 
-uow = MCQUnitOfWork()
-mcq_service = MCQService(session=uow.session)
-
 
 @mcq_blueprint.get("/mcq", response_model=List[mcq_schema.MCQ])
-async def get_all_mcqs() -> List[mcq_schema.MCQ]:
+async def get_all_mcqs(limit: int = Query(settings.MCQ_PAGE_DEFAULT_SIZE, ge=1, le=settings.MCQ_PAGE_MAX_SIZE),
+                       cursor: str | None = None,
+                       sort: Literal[tuple(MCQ_SORT_OPTIONS)] = "id",
+                       category: int | None = None,
+                       created_by: int | None = None,
+                       created_from: datetime | None = None,
+                       created_to: datetime | None = None,
+                       uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)) -> List[mcq_schema.MCQ]:
     """
-    Endpoint to list all MCQs.
+    Endpoint to list MCQs one page at a time. The cursor of the next page is returned in the
+    `X-Next-Cursor` header (absent on the last page) and passed back as `cursor`, with the same
+    sort and filters.
+
+    Parameters
+    ----------
+    limit: int (page size)
+    cursor: str (cursor of the page to fetch, omitted for the first page)
+    sort: str (id, -id, created_date or -created_date; descending with a leading "-")
+    category: int (optional category ID)
+    created_by: int (optional ID of the creating user)
+    created_from: datetime (optional, inclusive)
+    created_to: datetime (optional, inclusive)
 
     Returns
     -------
     list[MCQ]
     """
-    with uow:
-        mcqs = await mcq_service.get_all_mcqs()
-        print("MCQs retrieved successfully..!")
-        return mcqs
+    mcqs, next_cursor = await MCQService(session=uow.session).list_mcqs(
+        limit, sort, cursor, category_id=category, created_by=created_by,
+        created_from=created_from, created_to=created_to
+    )
+    print("MCQs retrieved successfully..!")
+    # the rows are already in the MCQ shape, skip re-validating each of them through the response model
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return JSONResponse(content=mcqs, headers=headers)
+
+
+@mcq_blueprint.get("/mcq/export")
+async def export_mcqs(compress: bool = False, admin_user: dict = Depends(get_current_user),
+                      uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)):
+    """
+    Endpoint to export the whole question bank as newline-delimited JSON, streamed while it is read
+    from the database, so worker memory does not grow with the size of the bank.
+
+    Parameters
+    ----------
+    compress: bool (gzip the stream, sent with `Content-Encoding: gzip`)
+
+    Returns
+    -------
+    application/x-ndjson stream, one MCQ per line
+    """
+    if admin_user.role != 1:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    # the export reads through its own session, hand the request's connection back to the pool
+    await uow.session.close()
+
+    headers = {"Content-Encoding": "gzip"} if compress else None
+    return StreamingResponse(MCQService.export_ndjson(settings.MCQ_EXPORT_BATCH_SIZE, compress),
+                             media_type="application/x-ndjson", headers=headers)
+
+
+@mcq_blueprint.get("/mcq/search", response_model=List[mcq_schema.MCQSearchResult])
+async def search_mcqs(q: str = Query(..., min_length=1, max_length=200),
+                      category: int | None = None,
+                      fuzzy: bool = True,
+                      limit: int = Query(settings.SEARCH_DEFAULT_RESULTS, ge=1, le=settings.SEARCH_MAX_RESULTS),
+                      uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)) -> List[mcq_schema.MCQSearchResult]:
+    """
+    Endpoint to search MCQ questions, ranked by relevance.
+
+    Parameters
+    ----------
+    q: str (search text, web-search syntax: quoted phrases, OR, -excluded words)
+    category: int (optional category ID to search in)
+    fuzzy: bool (fill up with trigram matches for misspelled or partial words)
+    limit: int (maximum number of results)
+
+    Returns
+    -------
+    list[MCQSearchResult]
+    """
+    return await MCQService(session=uow.session).search_mcqs(q, category, limit, fuzzy)
+
+
+@mcq_blueprint.get("/mcq/similar", response_model=List[mcq_schema.SimilarMCQ])
+async def get_similar_questions(question: str = Query(..., min_length=1),
+                                threshold: float = Query(settings.SIMILARITY_THRESHOLD, ge=0, le=1),
+                                limit: int = Query(10, ge=1, le=100),
+                                uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)) -> List[mcq_schema.SimilarMCQ]:
+    """
+    Endpoint to find MCQs whose question is near-identical to the given text, e.g. before adding it.
+
+    Parameters
+    ----------
+    question: str (question text to compare)
+    threshold: float (minimum similarity, 0 to 1)
+    limit: int (maximum number of MCQs returned)
+
+    Returns
+    -------
+    list[SimilarMCQ]
+    """
+    return await MCQService(session=uow.session).get_similar_questions(question, threshold, limit)
+
+
+@mcq_blueprint.get("/mcq/{id}/similar", response_model=List[mcq_schema.SimilarMCQ])
+async def get_similar_mcqs(id: int,
+                           threshold: float = Query(settings.SIMILARITY_THRESHOLD, ge=0, le=1),
+                           limit: int = Query(10, ge=1, le=100),
+                           uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)) -> List[mcq_schema.SimilarMCQ]:
+    """
+    Endpoint to find the near-duplicates of an existing MCQ.
+
+    Parameters
+    ----------
+    id: int (MCQ ID)
+    threshold: float (minimum similarity, 0 to 1)
+    limit: int (maximum number of MCQs returned)
+
+    Returns
+    -------
+    list[SimilarMCQ]
+    """
+    similar = await MCQService(session=uow.session).get_similar_mcqs(id, threshold, limit)
+    if similar is None:
+        raise HTTPException(status_code=404, detail="MCQ not found")
+    return similar
 
 
 @mcq_blueprint.get("/mcq/{id}", response_model=mcq_schema.MCQ)
-async def get_one_mcq(id: int) -> mcq_schema.MCQ | None:
+async def get_one_mcq(id: int, uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)) -> mcq_schema.MCQ | None:
     """
     Endpoint to retrieve a single MCQ by ID.
 
@@ -41,7 +159,7 @@ async def get_one_mcq(id: int) -> mcq_schema.MCQ | None:
     -------
     list[MCQ]
     """
-    mcq = await mcq_service.get_single_mcq(mcq_id=id)
+    mcq = await MCQService(session=uow.session).get_single_mcq(mcq_id=id)
     if mcq is None:
         raise HTTPException(status_code=404, detail="MCQ not found")
     return mcq
@@ -49,7 +167,8 @@ async def get_one_mcq(id: int) -> mcq_schema.MCQ | None:
 
 @mcq_blueprint.post("/mcq", response_model=mcq_schema.MCQ)
 async def add_mcq(mcq: mcq_schema.MCQCreate,
-                  admin_user: dict = Depends(get_current_user)) -> mcq_schema.MCQ:
+                  admin_user: dict = Depends(get_current_user),
+                  uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)) -> mcq_schema.MCQ:
     """
     Endpoint to add a new MCQ only by admin users.
 
@@ -65,13 +184,14 @@ async def add_mcq(mcq: mcq_schema.MCQCreate,
         print("Admin access required")
         raise HTTPException(status_code=403, detail="Admin access required")
 
-    created_mcq = await mcq_service.add_mcq(mcq_data=mcq, unit_of_work=uow, admin_user=admin_user)
+    created_mcq = await MCQService(session=uow.session).add_mcq(mcq_data=mcq, unit_of_work=uow, admin_user=admin_user)
     return created_mcq
 
 
 @mcq_blueprint.put("/mcq/{id}", response_model=mcq_schema.MCQ)
 async def update_mcq(id: int, mcq: mcq_schema.MCQUpdate,
-                     admin_user: dict = Depends(get_current_user)) -> mcq_schema.MCQ:
+                     admin_user: dict = Depends(get_current_user),
+                     uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)) -> mcq_schema.MCQ:
     """
     Endpoint to update an existing MCQ by ID.
 
@@ -87,16 +207,17 @@ async def update_mcq(id: int, mcq: mcq_schema.MCQUpdate,
     if admin_user.role != 1:
         raise HTTPException(status_code=403, detail="Admin access required")
 
-    updated_mcq = await mcq_service.update_mcq(mcq_id=id, mcq_data=mcq,
-                                               unit_of_work=uow,
-                                               admin_user=admin_user)
+    updated_mcq = await MCQService(session=uow.session).update_mcq(mcq_id=id, mcq_data=mcq,
+                                                                  unit_of_work=uow,
+                                                                  admin_user=admin_user)
     if updated_mcq is None:
         raise HTTPException(status_code=404, detail="MCQ not found")
     return updated_mcq
 
 
 @mcq_blueprint.delete("/mcq/{id}", status_code=204)
-async def delete_mcq(id: int, admin_user: dict = Depends(get_current_user)):
+async def delete_mcq(id: int, admin_user: dict = Depends(get_current_user),
+                     uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)):
     """
     Endpoint to delete an MCQ by ID.
 
@@ -111,7 +232,7 @@ async def delete_mcq(id: int, admin_user: dict = Depends(get_current_user)):
     if admin_user.role != 1:
         raise HTTPException(status_code=403, detail="Admin access required")
 
-    result = await mcq_service.delete_mcq(mcq_id=id)
+    result = await MCQService(session=uow.session).delete_mcq(mcq_id=id)
 
     if not result:
         raise HTTPException(status_code=404, detail="MCQ not found")
@@ -119,15 +240,23 @@ async def delete_mcq(id: int, admin_user: dict = Depends(get_current_user)):
 
 
 @mcq_blueprint.post("/mcq/bulk-upload")
-async def bulk_upload_mcqs(file: UploadFile = File(...), admin_user: dict = Depends(get_current_user)):
+async def bulk_upload_mcqs(file: UploadFile = File(...), warn_similar: bool = False,
+                           admin_user: dict = Depends(get_current_user),
+                           uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)):
     """
-    Bulk upload MCQs via CSV file with error skipping.
+    Bulk upload MCQs via CSV file with error skipping. With `warn_similar=true` the response also
+    lists the inserted questions that are near-duplicates of existing ones.
     """
     if admin_user.role != 1:
         raise HTTPException(status_code=403, detail="Admin access required")
 
+    # hand the request's connection back to the pool before the long-running CSV import starts
+    await uow.session.close()
+
     try:
-        result = MCQService.bulk_upload_csv(file, admin_user, uow)
+        # The CSV pipeline is synchronous (pandas + sync session), keep it off the event loop
+        result = await run_in_threadpool(MCQService.bulk_upload_csv, file, admin_user, MCQUnitOfWork(),
+                                          warn_similar)
         print("result:", result)
         return result
     except Exception as e:
@@ -8,14 +8,15 @@ from src.app.schemas.quiz_schema import (
     QuizSubmitResponse,
     QuizAttemptResponse
 )
-from src.app.services.unit_of_work import MCQUnitOfWork
+from src.app.services.unit_of_work import AsyncMCQUnitOfWork, get_unit_of_work
 from src.app.services.quiz_services import QuizService
 
 quiz_blueprint = APIRouter()
 
 
 @quiz_blueprint.post("/quiz/start", response_model=QuizStartResponse)
-def start_quiz(category_id: int, current_user=Depends(get_current_user)):
+async def start_quiz(category_id: int, current_user=Depends(get_current_user),
+                     uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)):
     """
     Start a new quiz attempt.
 
@@ -34,13 +35,13 @@ def start_quiz(category_id: int, current_user=Depends(get_current_user)):
     QuizStartResponse
         Contains the generated `attempt_id` and a list of `QuizQuestion` objects.
     """
-    with MCQUnitOfWork() as uow:
-        quiz_service = QuizService(session=uow.session)
-        return quiz_service.start_quiz(current_user.id, category_id)
+    quiz_service = QuizService(session=uow.session)
+    return await quiz_service.start_quiz(current_user.id, category_id)
 
 
 @quiz_blueprint.post("/quiz/submit", response_model=QuizSubmitResponse)
-def submit_quiz(payload: QuizSubmitRequest, current_user=Depends(get_current_user)):
+async def submit_quiz(payload: QuizSubmitRequest, current_user=Depends(get_current_user),
+                      uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)):
     """
     Submit answers for a quiz attempt and calculate the score.
 
@@ -59,13 +60,13 @@ def submit_quiz(payload: QuizSubmitRequest, current_user=Depends(get_current_use
         Summarizes the attempt: total questions, attempted, unattempted, correct,
         wrong, and the total score.
     """
-    with MCQUnitOfWork() as uow:
-        quiz_service = QuizService(session=uow.session)
-        return quiz_service.submit_quiz(current_user.id, payload)
+    quiz_service = QuizService(session=uow.session)
+    return await quiz_service.submit_quiz(current_user.id, payload)
 
 
 @quiz_blueprint.get("/quiz/attempts", response_model=List[QuizAttemptResponse])
-def list_attempts(current_user=Depends(get_current_user)):
+async def list_attempts(current_user=Depends(get_current_user),
+                        uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)):
     """
     List all quiz attempts made by the current user.
 
@@ -79,6 +80,5 @@ def list_attempts(current_user=Depends(get_current_user)):
     List[QuizAttemptResponse]
         A list of all quiz attempts made by the current user.
     """
-    with MCQUnitOfWork() as uow:
-        quiz_service = QuizService(session=uow.session)
-        return quiz_service.get_user_attempts(current_user)
+    quiz_service = QuizService(session=uow.session)
+    return await quiz_service.get_user_attempts(current_user)
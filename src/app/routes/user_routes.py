@@ -1,8 +1,10 @@
 import logging
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, File, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 
-from src.app.services.unit_of_work import MCQUnitOfWork
+from src.app.common.utils import get_current_user
+from src.app.services.unit_of_work import AsyncMCQUnitOfWork, MCQUnitOfWork, get_unit_of_work
 from src.app.schemas import user_schema
 from src.app.services.user_services import UserService
 
@@ -11,7 +13,7 @@ logger = logging.getLogger(__name__)
 user_blueprint = APIRouter()
 
 @user_blueprint.post("/register", response_model=user_schema.UserResponse)
-async def register_user(user_data: user_schema.UserCreate):
+async def register_user(user_data: user_schema.UserCreate, uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)):
     """
     Endpoint to register a new user.
 
@@ -21,7 +23,7 @@ async def register_user(user_data: user_schema.UserCreate):
     """
     try:
         # Call the service to create a new user
-        response = await UserService.create_user(user_data=user_data, unit_of_work=MCQUnitOfWork())
+        response = await UserService.create_user(user_data=user_data, unit_of_work=uow)
 
         return response
 
@@ -32,28 +34,80 @@ async def register_user(user_data: user_schema.UserCreate):
         logger.error(f"Unexpected Error: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
-@user_blueprint.post("/login", response_model=user_schema.UserLogin)
-async def login_user(form_data: OAuth2PasswordRequestForm = Depends()):
+@user_blueprint.post("/login", response_model=user_schema.Token)
+async def login_user(form_data: OAuth2PasswordRequestForm = Depends(),
+                     uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)):
     """
-    Endpoint to log in and generate a JWT token.
+    Endpoint to log in and generate a JWT token, with a refresh token to renew it via /token/refresh.
 
     Returns
     -------
     dict
-        Access Token (JWT)
+        Access Token (JWT) and refresh token
     """
     email = form_data.username
 
-    with MCQUnitOfWork() as uow:
-        user_service = UserService(session=uow.session)
+    user_service = UserService(session=uow.session)
 
-        # Authenticate the user by checking the email and password
-        authenticated_user = await user_service.authenticate_user(
-            email=email, password=form_data.password, unit_of_work=uow
-        )
+    # Authenticate the user by checking the email and password
+    authenticated_user = await user_service.authenticate_user(
+        email=email, password=form_data.password, unit_of_work=uow
+    )
 
-        if not authenticated_user:
-            raise HTTPException(status_code=401, detail="Invalid credentials")
+    if not authenticated_user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
 
-        access_token = UserService.generate_jwt_token(authenticated_user)
-        return {"access_token": access_token, "token_type": "bearer"}
+    return await UserService.issue_tokens(authenticated_user, uow)
+
+
+@user_blueprint.post("/token/refresh", response_model=user_schema.Token)
+async def refresh_token(payload: user_schema.RefreshRequest, uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)):
+    """
+    Endpoint to renew an access token without the password. The refresh token is single use: the
+    response carries the one to use next time.
+
+    Returns
+    -------
+    dict
+        Access Token (JWT) and the next refresh token
+    """
+    return await UserService.refresh_tokens(payload.refresh_token, uow)
+
+
+@user_blueprint.post("/logout")
+async def logout_user(payload: user_schema.RefreshRequest, all_sessions: bool = False,
+                      uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)):
+    """
+    Endpoint to revoke a refresh token, or with `all_sessions=true` every refresh token of its user.
+    Access tokens already issued stay valid until they expire.
+
+    Returns
+    -------
+    dict
+        Number of refresh tokens revoked
+    """
+    revoked = await UserService.revoke_refresh_token(payload.refresh_token, uow, all_sessions)
+    return {"message": "Logged out", "revoked_tokens": revoked}
+
+
+@user_blueprint.post("/users/bulk-import")
+async def bulk_import_users(file: UploadFile = File(...), admin_user: dict = Depends(get_current_user),
+                            uow: AsyncMCQUnitOfWork = Depends(get_unit_of_work)):
+    """
+    Endpoint to register many users from a CSV or JSON Lines (.jsonl) file, with the columns
+    first_name, last_name, email, password and role. Rows that are invalid or whose email is taken
+    are skipped; the response lists the outcome of every row.
+
+    Returns
+    -------
+    dict
+        Counts by outcome, throughput and per-row results
+    """
+    if admin_user.role != 1:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    # hand the request's connection back to the pool before the long-running import starts
+    await uow.session.close()
+
+    # parsing, hashing and inserting are synchronous, keep them off the event loop
+    return await run_in_threadpool(UserService.bulk_import_users, file, MCQUnitOfWork())
@@ -45,3 +45,15 @@ class MCQ(MCQCreate):
     class Config:
         orm_mode = True
 
+
+
+class SimilarMCQ(BaseModel):
+    id: int
+    question: str
+    category: int
+    similarity: float
+
+
+class MCQSearchResult(MCQ):
+    score: float
+    match: str
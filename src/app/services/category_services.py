@@ -3,32 +3,32 @@ from fastapi import HTTPException
 from sqlalchemy.exc import SQLAlchemyError
 
 from src.app.schemas.category_schema import CategoryCreate, CategoryUpdate
-from src.app.services.unit_of_work import MCQUnitOfWork
+from src.app.services.unit_of_work import AsyncMCQUnitOfWork
 from src.app.entities.category import Category
 
 
-def get_all_categories(unit_of_work: MCQUnitOfWork) -> list[Category]:
+async def get_all_categories(unit_of_work: AsyncMCQUnitOfWork) -> list[Category]:
     """
     Fetches all categories from the database.
     """
-    with unit_of_work as uow:
-        categories = uow.category_repo.get_all()
+    async with unit_of_work as uow:
+        categories = await uow.category_repo.get_all()
         print("categories:", categories)
         result = [category.to_dict() for category in categories]
     return result
 
 
-async def get_category_by_id(category_id: int, unit_of_work: MCQUnitOfWork) -> Category | None:
+async def get_category_by_id(category_id: int, unit_of_work: AsyncMCQUnitOfWork) -> Category | None:
     """
     Fetches a category by its ID from the database.
     """
-    with unit_of_work as uow:
-        category = uow.category_repo.get_one(category_id)
+    async with unit_of_work as uow:
+        category = await uow.category_repo.get_one(category_id)
         print("category by ID:", category)
         return category.to_dict() if category else None
 
 
-async def create_category(category_data: CategoryCreate, admin_user, unit_of_work: MCQUnitOfWork) -> Category:
+async def create_category(category_data: CategoryCreate, admin_user, unit_of_work: AsyncMCQUnitOfWork) -> Category:
     """
     Creates a new category in the database.
     """
@@ -39,23 +39,23 @@ async def create_category(category_data: CategoryCreate, admin_user, unit_of_wor
     )
     print("new_category:", new_category)
 
-    with unit_of_work as uow:
+    async with unit_of_work as uow:
         try:
-            created_category = uow.category_repo.add(new_category)
-            uow.commit()
+            created_category = await uow.category_repo.add(new_category)
+            await uow.commit()
             return created_category.to_dict()
         except SQLAlchemyError:
-            uow.rollback()
+            await uow.rollback()
             raise HTTPException(status_code=500, detail="Failed to create category")
 
 
 async def update_category(category_id: int, category_data: CategoryUpdate, admin_user,
-                          unit_of_work: MCQUnitOfWork) -> Category | None:
+                          unit_of_work: AsyncMCQUnitOfWork) -> Category | None:
     """
     Updates an existing category in the database.
     """
-    with unit_of_work as uow:
-        category = uow.category_repo.get_one(category_id)
+    async with unit_of_work as uow:
+        category = await uow.category_repo.get_one(category_id)
         if not category:
             raise HTTPException(status_code=404, detail="Category not found")
 
@@ -64,29 +64,29 @@ async def update_category(category_id: int, category_data: CategoryUpdate, admin
         category.updated_date = datetime.now()
 
         try:
-            updated_category = uow.category_repo.update(category)
+            updated_category = await uow.category_repo.update(category)
             print("updated_category:", updated_category)
-            uow.commit()
+            await uow.commit()
             return updated_category.to_dict() if updated_category else None
         except SQLAlchemyError:
-            uow.rollback()
+            await uow.rollback()
             raise HTTPException(status_code=500, detail="Failed to update category")
 
 
-async def delete_category(category_id: int, admin_user, unit_of_work: MCQUnitOfWork) -> bool:
+async def delete_category(category_id: int, admin_user, unit_of_work: AsyncMCQUnitOfWork) -> bool:
     """
     Deletes a category from the database.
     """
 
-    with unit_of_work as uow:
-        category = uow.category_repo.get_one(category_id)
+    async with unit_of_work as uow:
+        category = await uow.category_repo.get_one(category_id)
         if not category:
             raise HTTPException(status_code=404, detail="Category not found")
 
         try:
-            result = uow.category_repo.delete(category_id)
-            uow.commit()
+            result = await uow.category_repo.delete(category_id)
+            await uow.commit()
             return result
         except SQLAlchemyError:
-            uow.rollback()
+            await uow.rollback()
             raise HTTPException(status_code=500, detail="Failed to delete category")
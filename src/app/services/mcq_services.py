@@ -1,202 +1,317 @@
+import itertools
+import json
+import time
+import zlib
 import pandas as pd
 from datetime import datetime
 from fastapi import HTTPException
-from sqlalchemy import func
-from sqlalchemy.orm import Session
-from typing import List
-
-from src.app.entities.mcq import MCQ
-from src.app.repositories.category_repository import CategoryRepository
-from src.app.repositories.mcq_repository import MCQRepository
-from src.app.schemas.mcq_schema import MCQCreate, MCQUpdate
-from src.app.services.unit_of_work import MCQUnitOfWork
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app.common.constants import UPLOAD_SIMILAR_QUESTIONS_PER_ROW
+from src.app.common.csv_validation import validate_mcq_rows
+from src.app.common.pagination import decode_cursor, encode_cursor
+from src.app.common.similarity import jaccard_similarity, question_lsh_buckets, question_shingles, rank_similar
+from src.app.config import settings
+from src.app.entities.mcq import MCQ, build_mcq_fingerprint
+from src.app.repositories.mcq_repository import AsyncMCQRepository, invalidate_answer_keys, invalidate_category_ids
+from src.app.repositories.mcq_staging_repository import (
+    STATUS_DUPLICATE_IN_CSV, STATUS_DUPLICATE_IN_DB, STATUS_NEW, STATUS_NO_CATEGORY
+)
+from src.app.schemas.mcq_schema import MCQUpdate
+from src.app.services.unit_of_work import AsyncMCQUnitOfWork, MCQUnitOfWork
+
+
+def iter_csv_chunks(reader):
+    """
+    Yield the chunks of a chunked `pd.read_csv` reader, reporting malformed input as a 400.
+    """
+    while True:
+        try:
+            chunk = next(reader)
+        except StopIteration:
+            return
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error reading CSV: {str(e)}")
+        yield chunk
 
 
 class MCQService:
-    def __init__(self, session: Session):
-        self.repository = MCQRepository(session)
+    def __init__(self, session: AsyncSession):
+        self.repository = AsyncMCQRepository(session)
+
+    async def list_mcqs(self, limit: int, sort: str, cursor: str | None = None, **filters) -> tuple[list[dict], str | None]:
+        """
+        Get one page of MCQs and the cursor of the next page (None on the last page). `filters` are
+        passed to `AsyncMCQRepository.get_page`. Raises a 400 for an invalid cursor.
+        """
+        try:
+            after = decode_cursor(cursor, sort) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        # one row more than the page tells whether another page follows
+        rows = await self.repository.get_page(limit + 1, sort, after, **filters)
+        next_cursor = encode_cursor(sort, rows[limit - 1]) if len(rows) > limit else None
+        page = [
+            {"id": row.id, "question": row.question, "options": row.options,
+             "correct_option": row.correct_option, "category": row.category}
+            for row in rows[:limit]
+        ]
+        return page, next_cursor
 
-    async def get_all_mcqs(self) -> List[MCQ]:
+    @staticmethod
+    async def export_ndjson(batch_size: int, compress: bool = False):
         """
-        Get all MCQs from the database.
+        Yield the whole question bank as newline-delimited JSON (one MCQ per line, in id order), one
+        chunk per batch read from the database, gzip-compressed when `compress` is set. It opens its
+        own unit of work, as the response is streamed after the route handler has returned.
         """
-        result = self.repository.get_all()
-        mcq_dict = [mcq.to_dict() for mcq in result]
-        return mcq_dict
+        # wbits=31 writes a gzip container; each batch is sync-flushed so clients receive it right away
+        compressor = zlib.compressobj(wbits=31) if compress else None
+        started = time.perf_counter()
+        first_batch_ms, exported = None, 0
+        async with AsyncMCQUnitOfWork() as unit_of_work:
+            async for rows in unit_of_work.mcq_repo.iter_export_batches(batch_size):
+                chunk = "".join(
+                    json.dumps({
+                        "id": row.id, "question": row.question, "options": row.options,
+                        "correct_option": row.correct_option, "category": row.category,
+                        "created_by": row.created_by,
+                        "created_date": row.created_date.isoformat() if row.created_date else None,
+                    }, separators=(",", ":")) + "\n"
+                    for row in rows
+                ).encode()
+                if compressor:
+                    chunk = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                yield chunk
+                exported += len(rows)
+                if first_batch_ms is None:
+                    first_batch_ms = (time.perf_counter() - started) * 1000
+        if compressor:
+            yield compressor.flush()
+        print(f"MCQ export: {exported} rows, first batch after {first_batch_ms or 0:.1f} ms, "
+              f"finished in {time.perf_counter() - started:.2f} s")
 
     async def get_single_mcq(self, mcq_id: int) -> MCQ | None:
         """
         Get a single MCQ by its ID.
         """
-        mcq_by_id = self.repository.get_one(mcq_id)
+        mcq_by_id = await self.repository.get_one(mcq_id)
         if mcq_by_id:
             return mcq_by_id.to_dict()
         return None
 
-    async def add_mcq(self, mcq_data, unit_of_work: MCQUnitOfWork, admin_user) -> MCQ:
+    async def search_mcqs(self, query: str, category_id: int | None, limit: int, fuzzy: bool = True) -> list[dict]:
+        """
+        Search MCQ questions. Full-text matches (stemmed words, ranked) come first; when they are
+        fewer than `limit` and `fuzzy` is set, the rest is filled with trigram matches, which also
+        catch misspellings and partial words. Fuzzy matching needs the pg_trgm extension and is
+        skipped without it.
+        """
+        rows = await self.repository.search_full_text(query, category_id, limit)
+        results = [dict(row._mapping, match="text") for row in rows]
+        if fuzzy and len(results) < limit and await self.repository.has_trigram_search():
+            rows = await self.repository.search_fuzzy(query, category_id, limit - len(results),
+                                                      exclude_ids=[result["id"] for result in results])
+            results += [dict(row._mapping, match="fuzzy") for row in rows]
+        return results
+
+    async def get_similar_questions(self, question: str, threshold: float, limit: int,
+                                    exclude_id: int | None = None) -> list[dict]:
+        """
+        Find the MCQs whose question text is near-identical to `question` (Jaccard similarity of
+        their character shingles at or above `threshold`). Candidates come from the LSH index, so
+        the cost does not grow with the size of the question bank.
+        """
+        lsh_buckets = question_lsh_buckets(question)
+        if not lsh_buckets:
+            return []
+        candidates = await self.repository.get_similarity_candidates(lsh_buckets, settings.SIMILARITY_MAX_CANDIDATES)
+        candidates = [candidate for candidate in candidates if candidate.id != exclude_id]
+        return rank_similar(question, candidates, threshold, limit)
+
+    async def get_similar_mcqs(self, mcq_id: int, threshold: float, limit: int) -> list[dict] | None:
+        """
+        Find the MCQs near-identical to an existing MCQ. Returns None if the MCQ does not exist.
+        """
+        mcq = await self.repository.get_one(mcq_id)
+        if not mcq:
+            return None
+        return await self.get_similar_questions(mcq.question, threshold, limit, exclude_id=mcq_id)
+
+    async def add_mcq(self, mcq_data, unit_of_work: AsyncMCQUnitOfWork, admin_user) -> MCQ:
         """
         Add a new MCQ to the database. This function checks for duplicates in the database before adding a new MCQ.
         """
         mcq = mcq_data.model_dump()
 
-        # Fetching category from DB!
-        category_repo = CategoryRepository(unit_of_work.session)
-        category = category_repo.get_one(mcq_data.category)
-        if not category:
-            raise HTTPException(status_code=404, detail="Category not found")
-
-        mcq["created_by"] = admin_user.id
-        mcq["created_date"] = datetime.now()
-        mcq["category"] = category.id
-
-        mcq = MCQ(**mcq)
-        print("mcq after creation:", mcq)
-
-        mcq_question = mcq.question.strip().lower()
-
-        mcq_options = sorted([option.strip().lower() for option in mcq.options])
-
         # Add the new MCQ to the database and commit it
-        with unit_of_work:
-            existing_mcqs = unit_of_work.session.query(MCQ).filter(func.lower(MCQ.question) == mcq_question).all()
-
-            for existing_mcq in existing_mcqs:
-                existing_options = sorted([option.strip().lower() for option in existing_mcq.options])
-
-                # Check if the question and options match
-                if mcq_question.lower() == existing_mcq.question.lower():
-                    if mcq_options == existing_options:
-                        raise HTTPException(
-                            status_code=400,
-                            detail="Duplicate MCQ exists with the same question and options"
-                        )
-
-            unit_of_work.mcq_repo.add(mcq)
-            unit_of_work.session.flush()
-            unit_of_work.session.refresh(mcq)
+        async with unit_of_work:
+            # Fetching category from DB!
+            category = await unit_of_work.category_repo.get_one(mcq_data.category)
+            if not category:
+                raise HTTPException(status_code=404, detail="Category not found")
+
+            mcq["created_by"] = admin_user.id
+            mcq["created_date"] = datetime.now()
+            mcq["category"] = category.id
+
+            mcq = MCQ(**mcq)
+            print("mcq after creation:", mcq)
+
+            mcq.fingerprint = build_mcq_fingerprint(mcq.question, mcq.options)
+            mcq.lsh_buckets = question_lsh_buckets(mcq.question)
+
+            # a single probe of the unique fingerprint index; the index itself rejects concurrent duplicates
+            if await unit_of_work.mcq_repo.get_by_fingerprint(mcq.fingerprint):
+                raise HTTPException(
+                    status_code=400,
+                    detail="Duplicate MCQ exists with the same question and options"
+                )
+
+            await unit_of_work.mcq_repo.add(mcq)
+            try:
+                await unit_of_work.session.flush()
+            except IntegrityError:
+                await unit_of_work.rollback()
+                raise HTTPException(
+                    status_code=400,
+                    detail="Duplicate MCQ exists with the same question and options"
+                )
+            await unit_of_work.session.refresh(mcq)
 
             result = mcq.to_dict()
-            unit_of_work.commit()
+            await unit_of_work.commit()
 
+        invalidate_category_ids(result["category"])
         return result
 
-    async def update_mcq(self, mcq_id: int, mcq_data: MCQUpdate, unit_of_work: MCQUnitOfWork, admin_user):
+    async def update_mcq(self, mcq_id: int, mcq_data: MCQUpdate, unit_of_work: AsyncMCQUnitOfWork, admin_user):
         """
         Update an existing MCQ in the database.
         """
-        with unit_of_work:
-            existing_mcq = self.repository.get_one(mcq_id)
+        async with unit_of_work:
+            existing_mcq = await unit_of_work.mcq_repo.get_one(mcq_id)
             if not existing_mcq:
                 return None
+            previous_category = existing_mcq.category
             existing_mcq.question = mcq_data.question
             existing_mcq.options = mcq_data.options
             existing_mcq.correct_option = mcq_data.correct_option
             existing_mcq.category = mcq_data.category
             existing_mcq.updated_by = admin_user.id
             existing_mcq.updated_date = datetime.now()
+            existing_mcq.fingerprint = build_mcq_fingerprint(mcq_data.question, mcq_data.options)
+            existing_mcq.lsh_buckets = question_lsh_buckets(mcq_data.question)
+
+            duplicate = await unit_of_work.mcq_repo.get_by_fingerprint(existing_mcq.fingerprint)
+            if duplicate and duplicate.id != mcq_id:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Duplicate MCQ exists with the same question and options"
+                )
 
-            unit_of_work.mcq_repo.update(existing_mcq)
+            if not await unit_of_work.mcq_repo.update(existing_mcq):
+                raise HTTPException(status_code=400, detail="Failed to update MCQ")
 
             result = existing_mcq.to_dict()
-            unit_of_work.session.commit()
+            await unit_of_work.commit()
 
-            return result
+        invalidate_category_ids(previous_category, result["category"])
+        invalidate_answer_keys(mcq_id)
+        return result
 
     async def delete_mcq(self, mcq_id: int) -> bool:
         """
         Delete an MCQ from the database by its ID.
         """
-        return self.repository.delete(mcq_id)
+        mcq = await self.repository.get_one(mcq_id)
+        if not mcq:
+            return False
+        category_id = mcq.category
+        deleted = await self.repository.delete(mcq_id)
+        if deleted:
+            invalidate_category_ids(category_id)
+            invalidate_answer_keys(mcq_id)
+        return deleted
 
     @staticmethod
-    def bulk_upload_csv(file, admin_user, unit_of_work: MCQUnitOfWork) -> dict:
+    def bulk_upload_csv(file, admin_user, unit_of_work: MCQUnitOfWork, warn_similar: bool = False) -> dict:
         """
         Bulk upload MCQs from a CSV file. This function handles duplicate checking of MCQs both in CSV
         and in database, and also handles errors during the upload process.
+
+        The file is read in chunks of `BULK_UPLOAD_CHUNK_ROWS` rows. Each chunk is validated column-wise
+        (`validate_mcq_rows`, without `eval`) and loaded into a staging table with COPY before the next
+        one is read; duplicate and category checks then run as set-based SQL over the whole upload and
+        new MCQs are merged into `mcq` with a single statement.
+
+        With `warn_similar`, new rows whose question is near-identical to a stored MCQ or to an
+        earlier row of the file are still inserted but listed under `near_duplicates`.
         """
         try:
-            df = pd.read_csv(file.file)
+            # the file is parsed and staged chunk by chunk, so memory use does not grow with its size
+            reader = pd.read_csv(file.file, chunksize=settings.BULK_UPLOAD_CHUNK_ROWS,
+                                 dtype={"Question": str, "Options": str, "Correct_options": str})
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Error reading CSV: {str(e)}")
+        chunks = iter_csv_chunks(reader)
+        first_chunk = next(chunks)
 
         # Validate required columns
         required_columns = {"sno", "Question", "Options", "Correct_options", "Category"}
-        missing_columns = required_columns - set(df.columns)
+        missing_columns = required_columns - set(first_chunk.columns)
         if missing_columns:
             raise HTTPException(status_code=400, detail=f"Missing required columns: {missing_columns}")
 
-        total_questions = len(df)
-        existing_mcqs = set()
-        duplicate_mcqs_in_csv = 0
-        duplicate_mcqs_in_db = 0
-        successful_inserts = 0
+        total_questions = 0
         failed_records = []
 
         with unit_of_work as uow:
-            session = uow.session
-            mcq_repo = MCQRepository(session)
-            category_repo = CategoryRepository(session)
-
-            for _, row in df.iterrows():
-                question = row["Question"].strip()
-                try:
-                    options = eval(row["Options"])  # Convert string to list
-                    correct_options = eval(row["Correct_options"])  # Convert string to list
-                    category_id = int(row["Category"])
-                except Exception as e:
-                    failed_records.append({"question": question, "error": f"Bad format:{str(e)}"})
-                    continue
-
-                question_cmp = question.lower()
-                options_cmp = sorted([option.strip().lower() for option in options])
-                correct_options_cmp = frozenset([option.strip().lower() for option in correct_options])
-
-                # Build a duplicate key from the current row
-                key = (question_cmp, frozenset(options_cmp), correct_options_cmp)
-                if key in existing_mcqs:
-                    duplicate_mcqs_in_csv += 1
-                    continue  # Skip duplicate within CSV
-                existing_mcqs.add(key)
-
-                # Check if an MCQ with same question and options already exists
-                existing_mcq = mcq_repo.get_by_question_and_options(question_cmp, options_cmp)
-                print("existing_mcq:", existing_mcq)
-                if existing_mcq:
-                    duplicate_mcqs_in_db += 1
-                    continue  # Skip duplicate found in DB
-
-                # Fetch the category from DB
-                category_obj = category_repo.get_one(category_id)
-                if not category_obj:
-                    failed_records.append({"question": question, "error": "Category not found"})
-                    continue
-
-                try:
-                    mcq_data = MCQCreate(
-                        question=question,
-                        options=options,
-                        correct_option=correct_options,
-                        category=category_id
-                    )
-
-                    # Prepare data for insertion
-                    mcq_data = mcq_data.model_dump()
-                    mcq_data["created_by"] = admin_user.id
-                    mcq_data["created_date"] = datetime.now()
-                    mcq_data["category"] = category_obj.id
-
-                    new_mcq = MCQ(**mcq_data)
-                    print("new_mcq:", new_mcq)
-                    session.add(new_mcq)
-                    session.flush()
-                    session.refresh(new_mcq)
-                    successful_inserts += 1
-
-                except Exception as e:
-                    failed_records.append({"question": question, "error": str(e)})
-
+            staging_repo = uow.mcq_staging_repo
+            staging_repo.create()
+
+            chunks = itertools.chain([first_chunk], chunks)
+            del first_chunk
+            for chunk in chunks:
+                staged_rows, chunk_failures = validate_mcq_rows(chunk, row_offset=total_questions)
+                staging_repo.copy_rows(staged_rows.to_dict("records"))
+                failed_records.extend(chunk_failures)
+                total_questions += len(chunk)
+                del chunk, staged_rows
+
+            staging_repo.classify()
+
+            counts = staging_repo.count_by_status()
+            for rejected in staging_repo.get_rejected():
+                error = "Category not found" if rejected["status"] == STATUS_NO_CATEGORY else rejected["error"]
+                failed_records.append((rejected["row_no"], {"question": rejected["question"], "error": error}))
+
+            near_duplicates = []
+            if warn_similar:
+                candidates = staging_repo.iter_similarity_candidates(limit=settings.SIMILARITY_MAX_CANDIDATES)
+                for _, rows in itertools.groupby(candidates, key=lambda row: row.row_no):
+                    rows = list(rows)
+                    similar = rank_similar(rows[0].question,
+                                           [(row.id, row.candidate_question, row.category) for row in rows],
+                                           settings.SIMILARITY_THRESHOLD, UPLOAD_SIMILAR_QUESTIONS_PER_ROW)
+                    if similar:
+                        near_duplicates.append({"question": rows[0].question, "similar_questions": similar})
+
+            successful_inserts, inserted_categories = staging_repo.merge(
+                created_by=admin_user.id, created_date=datetime.now()
+            )
             uow.commit()
 
+        # answer keys are only cached for existing MCQs, so only the category id arrays are stale
+        invalidate_category_ids(*inserted_categories)
+
+        duplicate_mcqs_in_csv = counts.get(STATUS_DUPLICATE_IN_CSV, 0)
+        # new rows a concurrent upload inserted first were skipped by the merge
+        duplicate_mcqs_in_db = counts.get(STATUS_DUPLICATE_IN_DB, 0) + counts.get(STATUS_NEW, 0) - successful_inserts
+        failed_records = [record for _, record in sorted(failed_records, key=lambda item: item[0])]
+
         if successful_inserts == 0 and (duplicate_mcqs_in_csv + duplicate_mcqs_in_db) == total_questions:
             message = "All records are duplicates"
         elif duplicate_mcqs_in_csv + duplicate_mcqs_in_db == 0:
@@ -210,7 +325,7 @@ class MCQService:
         else:
             message = "Bulk upload successful"
 
-        return {
+        response = {
             "message": message,
             "total_questions": total_questions,
             "uploaded_count": successful_inserts,
@@ -219,3 +334,57 @@ class MCQService:
             "failed_count": len(failed_records),
             "errors": failed_records
         }
+        if warn_similar:
+            response["near_duplicate_count"] = len(near_duplicates)
+            response["near_duplicates"] = near_duplicates
+        return response
+
+    @staticmethod
+    def near_duplicate_clusters(unit_of_work: MCQUnitOfWork, threshold: float) -> list[dict]:
+        """
+        Group the whole question bank into clusters of near-duplicate MCQs (questions linked by a
+        chain of pairs with similarity at or above `threshold`), largest first.
+
+        Only MCQs sharing an LSH bucket are compared, bucket by bucket as the groups are streamed
+        from the database. Within a bucket every MCQ is compared with one representative of each
+        cluster found there so far rather than with every other member, so a bucket of many copies
+        of one question costs linear rather than quadratic time.
+        """
+        parent = {}
+
+        def find(mcq_id: int) -> int:
+            parent.setdefault(mcq_id, mcq_id)
+            while parent[mcq_id] != mcq_id:
+                parent[mcq_id] = parent[parent[mcq_id]]
+                mcq_id = parent[mcq_id]
+            return mcq_id
+
+        with unit_of_work as uow:
+            for ids, questions in uow.mcq_repo.iter_lsh_bucket_groups():
+                representatives = []
+                for mcq_id, question in zip(ids, questions):
+                    shingles = question_shingles(question)
+                    matched = False
+                    for representative_id, representative_shingles in representatives:
+                        if find(representative_id) == find(mcq_id):
+                            matched = True
+                        elif jaccard_similarity(shingles, representative_shingles) >= threshold:
+                            parent[find(mcq_id)] = find(representative_id)
+                            matched = True
+                    if not matched:
+                        representatives.append((mcq_id, shingles))
+
+            members = {}
+            for mcq_id in parent:
+                members.setdefault(find(mcq_id), []).append(mcq_id)
+            clusters = [sorted(cluster) for cluster in members.values() if len(cluster) > 1]
+
+            summaries = {}
+            clustered_ids = [mcq_id for cluster in clusters for mcq_id in cluster]
+            for start in range(0, len(clustered_ids), 10000):
+                for row in uow.mcq_repo.get_summaries(clustered_ids[start:start + 10000]):
+                    summaries[row.id] = {"id": row.id, "question": row.question, "category": row.category}
+
+        clusters.sort(key=lambda cluster: (-len(cluster), cluster[0]))
+        return [{"size": len(cluster), "mcqs": [summaries[mcq_id] for mcq_id in cluster if mcq_id in summaries]}
+                for cluster in clusters]
@@ -1,41 +1,91 @@
-import random
-from datetime import datetime
+import asyncio
+from datetime import datetime, timedelta
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.app.build_db import DEFAULT_ASYNC_SESSION_FACTORY
+from src.app.config import settings
 from src.app.entities.quiz_attempt import QuizAttempt
-from src.app.entities.quiz_attempt_questions import AttemptQuestion
-from src.app.repositories.mcq_repository import MCQRepository
-from src.app.repositories.quiz_attempt_repository import QuizAttemptRepository
-from src.app.repositories.quiz_attempt_question_repository import AttemptQuestionRepository
-from src.app.repositories.category_repository import CategoryRepository
+from src.app.entities.quiz_session import QuizSession
+from src.app.repositories.mcq_repository import AsyncMCQRepository
+from src.app.repositories.quiz_attempt_repository import AsyncQuizAttemptRepository
+from src.app.repositories.quiz_attempt_question_repository import AsyncAttemptQuestionRepository
+from src.app.repositories.category_repository import AsyncCategoryRepository
+from src.app.repositories.quiz_session_repository import AsyncQuizSessionRepository
 from src.app.schemas.quiz_schema import QuizSubmitRequest
-from src.app.common.utils import generate_unique_attempt_id
-from src.app.services.unit_of_work import MCQUnitOfWork
+from src.app.common.constants import QUIZ_QUESTION_COUNT
+from src.app.common.attempt_ids import get_attempt_id_generator
+
+
+def quiz_session_cutoff() -> datetime:
+    """
+    Quizzes started before this moment and not submitted have expired.
+    """
+    return datetime.now() - timedelta(seconds=settings.ATTEMPT_STATE_TTL_SECONDS)
+
+
+async def delete_expired_quiz_sessions() -> int:
+    """
+    Delete the expired quizzes, in a session of its own. Returns the number of quizzes deleted.
+    """
+    async with DEFAULT_ASYNC_SESSION_FACTORY() as session:
+        deleted = await AsyncQuizSessionRepository(session).delete_expired(quiz_session_cutoff())
+        await session.commit()
+    return deleted
+
+
+async def expire_quiz_sessions(interval: float):
+    """
+    Delete the expired quizzes every `interval` seconds, the first time one interval after starting.
+    Runs until cancelled.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            deleted = await delete_expired_quiz_sessions()
+            if deleted:
+                print(f"Deleted {deleted} expired quiz sessions")
+        except Exception as e:
+            print(f"Failed to delete expired quiz sessions: {e}")
 
 
 class QuizService:
-    def __init__(self, session):
-        self.mcq_repo = MCQRepository(session)
-        self.attempt_repo = QuizAttemptRepository(session)
-        self.attempt_q_repo = AttemptQuestionRepository(session)
-        self.category_repo = CategoryRepository(session)
+    def __init__(self, session: AsyncSession):
+        self.mcq_repo = AsyncMCQRepository(session)
+        self.attempt_repo = AsyncQuizAttemptRepository(session)
+        self.attempt_q_repo = AsyncAttemptQuestionRepository(session)
+        self.category_repo = AsyncCategoryRepository(session)
+        self.quiz_session_repo = AsyncQuizSessionRepository(session)
         self.session = session
 
-    def start_quiz(self, user_id: int, category_id: int) -> dict:
+    async def start_quiz(self, user_id: int, category_id: int) -> dict:
         """
         Starts a quiz for the user by fetching random MCQs from the specified category.
         """
-        mcqs = self.mcq_repo.get_by_category(category_id)
-        if not mcqs:
+        # fetch 25 MCQs randomly, sampled on the id list so only the chosen rows are loaded
+        selected_mcqs = await self.mcq_repo.sample_by_category(category_id, QUIZ_QUESTION_COUNT)
+        if not selected_mcqs:
             raise HTTPException(status_code=404, detail="No questions found for this category")
 
-        # generate unique 6-digit attempt ID
-        attempt_id = generate_unique_attempt_id(self.attempt_repo)
+        # unique across workers by construction, no lookup of existing attempts needed
+        attempt_id = await get_attempt_id_generator().next_id(self.session)
         print("Attempt ID:", attempt_id)
 
-        # fetch 25 MCQs randomly
-        selected_mcqs = random.sample(mcqs, min(len(mcqs), 25))
+        # remember which questions were served, submit grades only these
+        quiz_session = QuizSession(
+            attempt_id=attempt_id,
+            user_id=user_id,
+            category_id=category_id,
+            question_ids=[q.id for q in selected_mcqs],
+            created_date=datetime.now()
+        )
+        try:
+            await self.quiz_session_repo.add(quiz_session)
+            await self.session.commit()
+        except IntegrityError:
+            raise HTTPException(status_code=409, detail="Could not allocate an attempt_id. Please retry.")
+        self.quiz_session_repo.remember(quiz_session)
 
         questions = [
             {"id": q.id, "question": q.question, "options": q.options}
@@ -43,85 +93,105 @@ class QuizService:
         ]
         return {"attempt_id": attempt_id, "questions": questions}
 
-    def submit_quiz(self, user_id: int, payload: QuizSubmitRequest) -> dict:
+    async def submit_quiz(self, user_id: int, payload: QuizSubmitRequest) -> dict:
         """
         Submits the quiz attempt and calculates the score.
         """
         print("payload:", payload)
-        # Ensure category exists
-        if not self.category_repo.get_one(payload.category_id):
-            raise HTTPException(status_code=404, detail="Category not found")
-
-        # total = 25 (or fewer if less MCQs exist)
-        all_mcqs = self.mcq_repo.get_by_category(payload.category_id)
-        total_questions = min(len(all_mcqs), 25)
-
-        with MCQUnitOfWork() as uow:
-            session = uow.session
-
-            qa = QuizAttempt(
-                user_id=user_id,
-                attempt_id=payload.attempt_id,
-                category_id=payload.category_id,
-                total_questions=total_questions,
-                questions_attempted=0,
-                questions_unattempted=total_questions,
-                correct_answers=0,
-                score=0,
-                created_date=datetime.now()
-            )
-            print("quiz attempt:", qa)
-            session.add(qa)
-            try:
-                session.flush()
-            except IntegrityError as e:
-                if 'quiz_attempts_attempt_id_key' in str(e.orig):
-                    raise HTTPException(
-                        status_code=409,
-                        detail="A quiz with this attempt_id already exists. Please retry to start a new quiz."
-                    )
+        quiz_session = await self.quiz_session_repo.get_one(payload.attempt_id)
+        if not quiz_session:
+            if await self.attempt_repo.get_by_attempt_id(payload.attempt_id):
                 raise HTTPException(
-                    status_code=500,
-                    detail="Failed to record quiz attempt. Please try again later."
+                    status_code=409,
+                    detail="A quiz with this attempt_id already exists. Please retry to start a new quiz."
                 )
-
-            # map of question_id with correct_option list
-            mcq_map = {q.id: q.correct_option for q in all_mcqs}
-
-            attempted = 0
-            correct = 0
-
-            for ans in payload.answers:
-                if not ans.answer:
-                    continue
-                attempted += 1
-                correct_options = mcq_map.get(ans.question_id, [])
-
-                # submitted answer and correct options to lower case for comparison
-                is_corr = ans.answer.strip().lower() in [option.strip().lower for option in correct_options]
-                if is_corr:
-                    print("is_corr:", is_corr)
-                    correct += 1
-
-                aq = AttemptQuestion(
-                    attempt_id=payload.attempt_id,
-                    question_id=ans.question_id,
-                    attempted_answer=ans.answer,
-                    is_correct=is_corr
+            raise HTTPException(status_code=404, detail="Quiz attempt not found")
+        if quiz_session.user_id != user_id:
+            raise HTTPException(status_code=404, detail="Quiz attempt not found")
+        if quiz_session.created_date < quiz_session_cutoff():
+            await self.quiz_session_repo.delete(payload.attempt_id)
+            await self.session.commit()
+            raise HTTPException(status_code=410, detail="Quiz attempt has expired. Please start a new quiz.")
+        if quiz_session.category_id != payload.category_id:
+            raise HTTPException(status_code=400, detail="category_id does not match the quiz attempt")
+
+        # total = the questions served by /quiz/start
+        served_ids = set(quiz_session.question_ids)
+        total_questions = len(served_ids)
+
+        qa = QuizAttempt(
+            user_id=user_id,
+            attempt_id=payload.attempt_id,
+            category_id=payload.category_id,
+            total_questions=total_questions,
+            questions_attempted=0,
+            questions_unattempted=total_questions,
+            correct_answers=0,
+            score=0,
+            created_date=datetime.now()
+        )
+        print("quiz attempt:", qa)
+        self.session.add(qa)
+        try:
+            await self.session.flush()
+        except IntegrityError:
+            # a concurrent submit of the same attempt recorded it first; checked by looking the attempt
+            # up again, as each database words the unique violation differently
+            await self.session.rollback()
+            if await self.attempt_repo.get_by_attempt_id(payload.attempt_id):
+                raise HTTPException(
+                    status_code=409,
+                    detail="A quiz with this attempt_id already exists. Please retry to start a new quiz."
                 )
-                session.add(aq)
-
-            wrong = attempted - correct
-            unattempted = total_questions - attempted
-            score = correct * 4  # 4 marks per correct answer
-
-            # Update the QuizAttempt row
-            qa.questions_attempted = attempted
-            qa.questions_unattempted = unattempted
-            qa.correct_answers = correct
-            qa.score = score
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to record quiz attempt. Please try again later."
+            )
 
-            session.commit()
+        # map of question_id with normalized correct options, for the served questions only
+        mcq_map = await self.mcq_repo.get_answer_keys(quiz_session.question_ids)
+
+        attempted = 0
+        correct = 0
+        answered_ids = set()
+        attempt_rows = []
+
+        for ans in payload.answers:
+            # ignore questions that were not served and repeated answers to the same question
+            if not ans.answer or ans.question_id not in served_ids or ans.question_id in answered_ids:
+                continue
+            answered_ids.add(ans.question_id)
+            attempted += 1
+            correct_options = mcq_map.get(ans.question_id, frozenset())
+
+            # submitted answer to lower case for comparison, the answer keys are already normalized
+            is_corr = ans.answer.strip().lower() in correct_options
+            if is_corr:
+                print("is_corr:", is_corr)
+                correct += 1
+
+            attempt_rows.append({
+                "attempt_id": payload.attempt_id,
+                "question_id": ans.question_id,
+                "attempted_answer": ans.answer,
+                "is_correct": is_corr
+            })
+
+        # all answers of the attempt go in with a single batched insert
+        await self.attempt_q_repo.add_many(attempt_rows)
+
+        wrong = attempted - correct
+        unattempted = total_questions - attempted
+        score = correct * 4  # 4 marks per correct answer
+
+        # Update the QuizAttempt row
+        qa.questions_attempted = attempted
+        qa.questions_unattempted = unattempted
+        qa.correct_answers = correct
+        qa.score = score
+
+        await self.quiz_session_repo.delete(payload.attempt_id)
+        await self.session.commit()
 
         return {
             "attempt_id": payload.attempt_id,
@@ -133,14 +203,14 @@ class QuizService:
             "score": score
         }
 
-    def get_user_attempts(self, current_user) -> list[dict]:
+    async def get_user_attempts(self, current_user) -> list[dict]:
         """
         If admin user_id is passed, fetches all quiz attempts made by all users.
         Otherwise: return only the attempts belonging to the current user.
         """
         if current_user.role == 1:
-            attempts = self.attempt_repo.get_all()
+            attempts = await self.attempt_repo.get_all()
         else:
-            attempts = self.attempt_repo.get_by_user(current_user.id)
+            attempts = await self.attempt_repo.get_by_user(current_user.id)
         print("attempts:", attempts)
         return [a.to_dict() for a in attempts]
@@ -1,11 +1,15 @@
 import abc
 
-from src.app.build_db import DEFAULT_SESSION_FACTORY
-from src.app.repositories.category_repository import CategoryRepository
+from src.app.build_db import DEFAULT_ASYNC_SESSION_FACTORY, DEFAULT_SESSION_FACTORY
+from src.app.repositories.category_repository import AsyncCategoryRepository, CategoryRepository
 from src.app.repositories.log_repo import LogRepository
-from src.app.repositories.mcq_repository import MCQRepository
-from src.app.repositories.quiz_attempt_repository import QuizAttemptRepository
-from src.app.repositories.user_repository import UserRepository
+from src.app.repositories.mcq_repository import AsyncMCQRepository, MCQRepository
+from src.app.orm.dialects import is_postgresql
+from src.app.repositories.mcq_staging_repository import MCQStagingRepository, SQLiteMCQStagingRepository
+from src.app.repositories.quiz_attempt_question_repository import AsyncAttemptQuestionRepository
+from src.app.repositories.quiz_attempt_repository import AsyncQuizAttemptRepository, QuizAttemptRepository
+from src.app.repositories.refresh_token_repository import AsyncRefreshTokenRepository
+from src.app.repositories.user_repository import AsyncUserRepository, UserRepository
 
 
 class BaseUnitOfWork(abc.ABC):
@@ -38,6 +42,8 @@ class MCQUnitOfWork(BaseUnitOfWork):
     def __enter__(self):
         self.user_repo = UserRepository(session=self.session)
         self.mcq_repo = MCQRepository(session=self.session)
+        self.mcq_staging_repo = (MCQStagingRepository if is_postgresql(self.session)
+                                 else SQLiteMCQStagingRepository)(session=self.session)
         self.category_repo = CategoryRepository(session=self.session)
         self.quiz_attempt_repo = QuizAttemptRepository(session=self.session)
         self.log_repo = LogRepository(session=self.session)
@@ -52,3 +58,48 @@ class MCQUnitOfWork(BaseUnitOfWork):
 
     def rollback(self):
         self.session.rollback()
+
+
+class AsyncMCQUnitOfWork(BaseUnitOfWork):
+    """
+    Unit of work backed by an AsyncSession, so route handlers await their database I/O
+    instead of blocking the event loop.
+    """
+    user_repo: AsyncUserRepository
+    mcq_repo: AsyncMCQRepository
+    category_repo: AsyncCategoryRepository
+    quiz_attempt_repo: AsyncQuizAttemptRepository
+    attempt_question_repo: AsyncAttemptQuestionRepository
+    refresh_token_repo: AsyncRefreshTokenRepository
+
+    def __init__(self, session_factory=DEFAULT_ASYNC_SESSION_FACTORY):
+        self.session_factory = session_factory
+        self.session = self.session_factory()
+
+    async def __aenter__(self):
+        self.user_repo = AsyncUserRepository(session=self.session)
+        self.mcq_repo = AsyncMCQRepository(session=self.session)
+        self.category_repo = AsyncCategoryRepository(session=self.session)
+        self.quiz_attempt_repo = AsyncQuizAttemptRepository(session=self.session)
+        self.attempt_question_repo = AsyncAttemptQuestionRepository(session=self.session)
+        self.refresh_token_repo = AsyncRefreshTokenRepository(session=self.session)
+        return self
+
+    async def __aexit__(self, *args):
+        await self.rollback()
+        await self.session.close()
+
+    async def commit(self):
+        await self.session.commit()
+
+    async def rollback(self):
+        await self.session.rollback()
+
+
+async def get_unit_of_work():
+    """
+    Request-scoped unit of work dependency. FastAPI caches dependencies per request, so the
+    route and `get_current_user` share this one session, which is closed once the request ends.
+    """
+    async with AsyncMCQUnitOfWork() as uow:
+        yield uow
@@ -1,13 +1,22 @@
+import csv
+import itertools
 import logging
+import secrets
+import time
+import uuid
 from datetime import datetime, timedelta
 from fastapi import HTTPException
 from jose import jwt
-from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from src.app.repositories.user_repository import UserRepository
+from src.app.entities.refresh_token import RefreshToken
 from src.app.entities.user import User
-from src.app.common.utils import verify_password, hash_password
+from src.app.common.password_pool import get_import_hash_pool
+from src.app.common.user_import import is_jsonl_upload, iter_user_rows, validate_user_row
+from src.app.common.utils import (
+    hash_password, hash_password_async, hash_refresh_token, invalidate_user_principals, verify_password_async
+)
 from src.app.schemas.user_schema import UserCreate, UserResponse
 from src.app.config import settings
 
@@ -27,49 +36,135 @@ class UserService:
         """
         Creates a new user and stores it in the database.
         """
+        # Check if user already exists
+        existing_user = await unit_of_work.user_repo.get_by_email(user_data.email)
+        if existing_user:
+            logger.error(f"User with email {user_data.email} already exists.")
+            raise HTTPException(status_code=400, detail="User with this email already exists.")
+
+        # end the read transaction, so no connection is held while the password is hashed
+        await unit_of_work.rollback()
+
+        # Hash the password before saving the user
+        hashed_password = await hash_password_async(user_data.password)
+
+        user = User(
+            first_name=user_data.first_name,
+            last_name=user_data.last_name,
+            email=str(user_data.email),
+            password=hashed_password,
+            role=user_data.role,
+            created_date=datetime.now(),
+        )
+        print("user:", user)
+        # committed by the repository; fails on a concurrent registration of the same email
+        if not await unit_of_work.user_repo.add(user):
+            raise HTTPException(status_code=400, detail="User creation failed. Please try again.")
+        print(f"User {user.email} registered successfully with ID {user.id}")
+        return UserResponse(message="User registered successfully!", user_id=user.id)
+
+
+    @staticmethod
+    def bulk_import_users(file, unit_of_work) -> dict:
+        """
+        Imports users from a CSV (header row with first_name, last_name, email, password, role) or
+        JSON Lines file, returning the outcome of every row.
+
+        Rows are handled in batches of `USER_IMPORT_BATCH_SIZE`: validated, checked against existing
+        emails with one query, hashed in parallel on a process pool and inserted with one statement.
+        Emails are compared case-insensitively, as on /register.
+        """
+        rows = iter_user_rows(file.file, is_jsonl_upload(file.filename, file.content_type))
+        results = []
+        seen_emails = set()
+        started = time.perf_counter()
+
+        hash_pool = get_import_hash_pool()
         with unit_of_work as uow:
-            # Check if user already exists
-            existing_user = uow.user_repo.get_by_email(user_data.email)
-            if existing_user:
-                logger.error(f"User with email {user_data.email} already exists.")
-                raise HTTPException(status_code=400, detail="User with this email already exists.")
-
-            # Hash the password before saving the user
-            hashed_password = hash_password(user_data.password)
-
-            user = User(
-                first_name=user_data.first_name,
-                last_name=user_data.last_name,
-                email=str(user_data.email),
-                password=hashed_password,
-                role=user_data.role,
-                created_date=datetime.now(),
-            )
-            print("user:", user)
-            try:
-                uow.user_repo.add(user)
+            role_ids = uow.user_repo.get_role_ids()
+            while True:
+                try:
+                    batch = list(itertools.islice(rows, settings.USER_IMPORT_BATCH_SIZE))
+                except (UnicodeDecodeError, csv.Error) as e:
+                    raise HTTPException(status_code=400, detail=f"Error reading file: {str(e)}")
+                if not batch:
+                    break
+
+                candidates = []
+                for row_no, row in batch:
+                    user, error = validate_user_row(row)
+                    if user is None:
+                        email = row.get("email") if isinstance(row, dict) else None
+                        results.append({"row": row_no, "email": email, "status": "invalid", "error": error})
+                    elif user.email.lower() in seen_emails:
+                        results.append({"row": row_no, "email": user.email, "status": "duplicate_in_file"})
+                    elif user.role not in role_ids:
+                        results.append({"row": row_no, "email": user.email, "status": "invalid",
+                                        "error": "role: Role not found"})
+                    else:
+                        seen_emails.add(user.email.lower())
+                        candidates.append((row_no, user))
+
+                existing_emails = uow.user_repo.get_existing_emails([user.email.lower() for _, user in candidates])
+                new_users = []
+                for row_no, user in candidates:
+                    if user.email.lower() in existing_emails:
+                        results.append({"row": row_no, "email": user.email, "status": "duplicate_in_db"})
+                    else:
+                        new_users.append((row_no, user))
+                if not new_users:
+                    continue
+
+                chunksize = max(1, len(new_users) // (settings.USER_IMPORT_HASH_WORKERS * 4))
+                hashed_passwords = hash_pool.map(hash_password, [user.password for _, user in new_users],
+                                                 chunksize=chunksize)
+                created_date = datetime.now()
+                inserted = uow.user_repo.add_many([
+                    {"first_name": user.first_name, "last_name": user.last_name, "email": str(user.email),
+                     "password": hashed_password, "role": user.role, "created_date": created_date}
+                    for (_, user), hashed_password in zip(new_users, hashed_passwords)
+                ])
                 uow.commit()
-                uow.session.refresh(user)
-                print(f"User {user.email} registered successfully with ID {user.id}")
-                return UserResponse(message="User registered successfully!", user_id=user.id)
 
-            except IntegrityError as e:
-                uow.rollback()
-                logger.error(f"Database IntegrityError: {e}")
-                raise HTTPException(status_code=400, detail="User creation failed. Please try again.")
+                for row_no, user in new_users:
+                    user_id = inserted.get(str(user.email))
+                    if user_id is None:
+                        # registered by a concurrent request after the existing emails were checked
+                        results.append({"row": row_no, "email": user.email, "status": "duplicate_in_db"})
+                    else:
+                        results.append({"row": row_no, "email": user.email, "status": "created", "user_id": user_id})
 
-            except Exception as e:
-                logger.error(f"Unexpected error during user creation: {e}")
-                raise HTTPException(status_code=500, detail="Internal Server Error")
+        elapsed = time.perf_counter() - started
+        results.sort(key=lambda result: result["row"])
+        counts = {status: 0 for status in ("created", "duplicate_in_file", "duplicate_in_db", "invalid")}
+        for result in results:
+            counts[result["status"]] += 1
+        print(f"User import: {counts} in {elapsed:.2f} s")
 
+        return {
+            "message": f"Imported {counts['created']} of {len(results)} users",
+            "total_rows": len(results),
+            "created_count": counts["created"],
+            "duplicate_in_file": counts["duplicate_in_file"],
+            "duplicate_in_db": counts["duplicate_in_db"],
+            "failed_count": counts["invalid"],
+            "users_per_second": round(counts["created"] / elapsed, 2) if elapsed else 0.0,
+            "results": results,
+        }
 
     async def authenticate_user(self, email: str, password: str, unit_of_work) -> User | None:
         """
         Authenticate a user by verifying email and password.
         """
-        user = unit_of_work.user_repo.get_by_email(email)
+        user = await unit_of_work.user_repo.get_by_email(email)
+        if not user:
+            return None
+
+        # detach the user and end the read transaction, so no connection is held while bcrypt runs
+        unit_of_work.session.expunge(user)
+        await unit_of_work.rollback()
 
-        if user and verify_password(password, user.password):
+        if await verify_password_async(password, user.password):
             print("User authenticated successfully.")
             return user
 
@@ -84,9 +179,89 @@ class UserService:
         payload = {
             "sub": str(user.id),
             "exp": expiration,
+            "iat": int(time.time()),
             "email": user.email,
             "role": user.role,
         }
         token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
         print("Generated JWT token:", token)
         return token
+
+    @staticmethod
+    def new_refresh_token(user_id: int, family_id: uuid.UUID | None = None) -> tuple[str, RefreshToken]:
+        """
+        Creates a random refresh token for the user, continuing `family_id` when given. Returns the
+        token to hand out and the entity to store (which only holds its hash).
+        """
+        refresh_token = secrets.token_urlsafe(32)
+        now = datetime.now()
+        return refresh_token, RefreshToken(
+            user_id=user_id,
+            token_hash=hash_refresh_token(refresh_token),
+            family_id=family_id or uuid.uuid4(),
+            expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+            created_date=now,
+        )
+
+    @staticmethod
+    async def issue_tokens(user: User, unit_of_work) -> dict:
+        """
+        Issues an access token and a refresh token starting a new family, after a password login.
+        """
+        refresh_token, stored_token = UserService.new_refresh_token(user.id)
+        await unit_of_work.refresh_token_repo.add(stored_token)
+        await unit_of_work.commit()
+        return {"access_token": UserService.generate_jwt_token(user), "refresh_token": refresh_token,
+                "token_type": "bearer"}
+
+    @staticmethod
+    async def refresh_tokens(refresh_token: str, unit_of_work) -> dict:
+        """
+        Exchanges a refresh token for a new access token and the next refresh token of its family;
+        the presented token is revoked. A token that was already revoked revokes its whole family,
+        as it was either replayed or stolen, and drops the cached principals of its user.
+        """
+        invalid_token = HTTPException(status_code=401, detail="Invalid refresh token")
+        token_hash = hash_refresh_token(refresh_token)
+        now = datetime.now()
+
+        redeemed = await unit_of_work.refresh_token_repo.revoke_active(token_hash, now)
+        if redeemed is None:
+            stored_token = await unit_of_work.refresh_token_repo.get_by_hash(token_hash)
+            if stored_token and stored_token.revoked_at is not None:
+                revoked = await unit_of_work.refresh_token_repo.revoke_family(stored_token.family_id, now)
+                await unit_of_work.commit()
+                invalidate_user_principals(stored_token.user_id)
+                logger.warning(f"Reuse of a revoked refresh token of user {stored_token.user_id}, "
+                               f"revoked {revoked} tokens of its family")
+            raise invalid_token
+
+        user = await unit_of_work.user_repo.get_by_id(redeemed.user_id)
+        if not user:
+            await unit_of_work.commit()
+            raise invalid_token
+
+        next_refresh_token, stored_token = UserService.new_refresh_token(user.id, redeemed.family_id)
+        await unit_of_work.refresh_token_repo.add(stored_token)
+        await unit_of_work.commit()
+        return {"access_token": UserService.generate_jwt_token(user), "refresh_token": next_refresh_token,
+                "token_type": "bearer"}
+
+    @staticmethod
+    async def revoke_refresh_token(refresh_token: str, unit_of_work, all_sessions: bool = False) -> int:
+        """
+        Revokes the family of a refresh token (one signed-in client), or every refresh token of its
+        user with `all_sessions`, and drops the cached principals of the user. Returns the number of
+        tokens revoked.
+        """
+        stored_token = await unit_of_work.refresh_token_repo.get_by_hash(hash_refresh_token(refresh_token))
+        if not stored_token:
+            return 0
+        now = datetime.now()
+        if all_sessions:
+            revoked = await unit_of_work.refresh_token_repo.revoke_user(stored_token.user_id, now)
+        else:
+            revoked = await unit_of_work.refresh_token_repo.revoke_family(stored_token.family_id, now)
+        await unit_of_work.commit()
+        invalidate_user_principals(stored_token.user_id)
+        return revoked
@@ -0,0 +1,259 @@
+"""
+Benchmark suite for the API hot paths, driven in-process through the integration tests' `TestClient`
+(`src/tests/integration/utils.py`), so no server is needed.
+
+For every `--sizes` entry a scratch admin user and category holding that many MCQs are created
+(and removed afterwards), then `/login`, `GET /category`, `GET /mcq`, `/quiz/start`, `/quiz/submit`
+and `/mcq/bulk-upload` are each requested `--iterations` times (`--logins` for the bcrypt-bound
+login). Per route it records latency percentiles, SQL statements per request and the peak of
+traced Python memory during a request, and writes them to a JSON results file.
+
+With `--baseline` the results are compared with an earlier results file: a p95 latency or peak
+memory more than `--tolerance` above the baseline, or more SQL statements per request, is
+reported as a regression and the run exits with status 1.
+
+Usage
+-----
+    python -m src.benchmarks.api_suite --sizes 1000 10000 --output results.json
+    python -m src.benchmarks.api_suite --sizes 1000 10000 --output new.json --baseline results.json
+
+With `DATABASE_URL=sqlite://` the whole suite runs against an in-memory SQLite database.
+"""
+import argparse
+import json
+import platform
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+from sqlalchemy import event, update
+
+from src.app.build_db import async_engine, engine
+from src.app.common.utils import hash_password
+from src.app.config import settings
+from src.app.orm.mcq_orm import user
+from src.benchmarks.concurrency_benchmark import percentile
+from src.benchmarks.scratch import create_scratch_category, drop_scratch_category, grow_category
+from src.tests.integration.utils import client
+
+PASSWORD = "benchmark-password"
+ADMIN_ROLE_ID = 1
+
+# a regression must also exceed these absolute margins, so timer and allocator noise on fast routes
+# is not reported, nor the odd cache miss of randomly sampled questions; an extra statement on every
+# request always is
+REGRESSION_METRICS = {"p95_ms": 1.0, "queries_per_request": 0.5, "peak_memory_kb": 64.0}
+
+
+class QueryCounter:
+    """
+    Counts the SQL statements sent by both engines.
+    """
+    def __init__(self):
+        self.count = 0
+
+    def before_cursor_execute(self, *args):
+        self.count += 1
+
+    def attach(self):
+        for target in (engine, async_engine.sync_engine):
+            event.listen(target, "before_cursor_execute", self.before_cursor_execute)
+
+    def detach(self):
+        for target in (engine, async_engine.sync_engine):
+            event.remove(target, "before_cursor_execute", self.before_cursor_execute)
+
+
+def bulk_upload_csv(category_id: int, rows: int) -> str:
+    """
+    An upload of `rows` questions that are not in the database yet.
+    """
+    tag = uuid.uuid4().hex
+    lines = ["sno,Question,Options,Correct_options,Category"]
+    lines += [f"{n},Uploaded question {tag} {n}?,\"['yes','no','maybe']\",\"['yes']\",{category_id}"
+              for n in range(1, rows + 1)]
+    return "\n".join(lines) + "\n"
+
+
+def route_requests(category_id: int, email: str, headers: dict, args) -> dict:
+    """
+    Route name -> (number of requests, function sending one request). Work a request depends on
+    (starting the quiz a submit answers) is done before the returned function is timed.
+    """
+    def login():
+        return lambda: client.post("/login", data={"username": email, "password": PASSWORD})
+
+    def list_categories():
+        return lambda: client.get("/category", headers=headers)
+
+    def list_mcqs():
+        return lambda: client.get(f"/mcq?limit=100&category={category_id}", headers=headers)
+
+    def start_quiz():
+        return lambda: client.post(f"/quiz/start?category_id={category_id}", headers=headers)
+
+    def submit_quiz():
+        started = client.post(f"/quiz/start?category_id={category_id}", headers=headers).json()
+        payload = {
+            "attempt_id": started["attempt_id"], "category_id": category_id,
+            "answers": [{"question_id": question["id"], "answer": question["options"][0]}
+                        for question in started["questions"]],
+        }
+        return lambda: client.post("/quiz/submit", json=payload, headers=headers)
+
+    def bulk_upload():
+        body = bulk_upload_csv(category_id, args.upload_rows)
+        return lambda: client.post("/mcq/bulk-upload", files={"file": ("questions.csv", body, "text/csv")},
+                                   headers=headers)
+
+    return {
+        "POST /login": (args.logins, login),
+        "GET /category": (args.iterations, list_categories),
+        "GET /mcq": (args.iterations, list_mcqs),
+        "POST /quiz/start": (args.iterations, start_quiz),
+        "POST /quiz/submit": (args.iterations, submit_quiz),
+        "POST /mcq/bulk-upload": (args.iterations, bulk_upload),
+    }
+
+
+def measure_route(prepare, requests: int, args, counter: QueryCounter) -> dict:
+    """
+    Time `requests` requests (after `--warmup` untimed ones), then trace the memory of
+    `--memory-samples` more.
+    """
+    for _ in range(args.warmup):
+        prepare()().raise_for_status()
+
+    latencies, queries = [], []
+    for _ in range(requests):
+        send = prepare()
+        counter.count = 0
+        started = time.perf_counter()
+        response = send()
+        latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count)
+        response.raise_for_status()
+
+    peak_memory = 0
+    for _ in range(args.memory_samples):
+        send = prepare()
+        tracemalloc.start()
+        send().raise_for_status()
+        peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {
+        "requests": requests,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "queries_per_request": round(statistics.fmean(queries), 2),
+        "peak_memory_kb": round(peak_memory / 1024, 1),
+    }
+
+
+def run_size(size: int, args, counter: QueryCounter) -> dict:
+    user_id, category_id = create_scratch_category(ADMIN_ROLE_ID)
+    try:
+        grow_category(category_id, user_id, 0, size)
+        with engine.begin() as conn:
+            email = conn.execute(
+                update(user).where(user.c.id == user_id).values(password=hash_password(PASSWORD))
+                .returning(user.c.email)
+            ).scalar_one()
+        response = client.post("/login", data={"username": email, "password": PASSWORD})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        results = {}
+        for route, (requests, prepare) in route_requests(category_id, email, headers, args).items():
+            results[route] = measure_route(prepare, requests, args, counter)
+            print(f"{size:>9} {route:<22} p50={results[route]['p50_ms']:>8.2f} ms  "
+                  f"p95={results[route]['p95_ms']:>8.2f} ms  p99={results[route]['p99_ms']:>8.2f} ms  "
+                  f"queries={results[route]['queries_per_request']:>6.2f}  "
+                  f"peak={results[route]['peak_memory_kb']:>9.1f} KB")
+        return results
+    finally:
+        drop_scratch_category(category_id, user_id)
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Metrics of `results` that are worse than in `baseline` by more than the tolerance (and the
+    absolute margin of `REGRESSION_METRICS`), for the sizes and routes present in both.
+    """
+    regressions = []
+    for size, routes in results["sizes"].items():
+        for route, metrics in routes.items():
+            baseline_metrics = baseline.get("sizes", {}).get(size, {}).get(route)
+            if baseline_metrics is None:
+                continue
+            for metric, margin in REGRESSION_METRICS.items():
+                allowed = baseline_metrics[metric] * (1 + tolerance) + margin
+                if metric == "queries_per_request":
+                    allowed = baseline_metrics[metric] + margin
+                if metrics[metric] > allowed:
+                    regressions.append(f"{size} rows, {route}: {metric} {baseline_metrics[metric]} -> {metrics[metric]}")
+    return regressions
+
+
+def main(args) -> int:
+    counter = QueryCounter()
+    results = {
+        "meta": {
+            "database": engine.dialect.name,
+            "python": platform.python_version(),
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "iterations": args.iterations,
+            "logins": args.logins,
+            "upload_rows": args.upload_rows,
+        },
+        "sizes": {},
+    }
+    # the request log writer's batched flushes would land on random measured requests
+    settings.REQUEST_LOGS_ENABLED = False
+    # entering the client runs the app's startup (and shutdown) as a server would
+    with client:
+        counter.attach()
+        try:
+            for size in args.sizes:
+                results["sizes"][str(size)] = run_size(size, args, counter)
+        finally:
+            counter.detach()
+    results["meta"]["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+    print(f"results written to {args.output}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as baseline_file:
+        regressions = find_regressions(results, json.load(baseline_file), args.tolerance)
+    for regression in regressions:
+        print("REGRESSION", regression)
+    print(f"{len(regressions)} regressions against {args.baseline}")
+    return 1 if regressions else 0
+
+
+def parse_args(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Benchmark the API hot paths in-process.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--logins", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--memory-samples", type=int, default=3)
+    parser.add_argument("--upload-rows", type=int, default=100)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
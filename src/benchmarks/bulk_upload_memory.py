@@ -0,0 +1,94 @@
+"""
+Peak memory check for `/mcq/bulk-upload` on large files.
+
+Writes a synthetic CSV of the requested size to a temporary file (questions padded to
+`--row-bytes`), runs `MCQService.bulk_upload_csv` on it the way the route does and reports the
+growth of the process' peak RSS, the row throughput and the upload summary. The rows go into a
+scratch category that is removed afterwards.
+
+Usage
+-----
+    python -m src.benchmarks.bulk_upload_memory --size-gb 2 --max-rss-mb 512
+
+Exits with a non-zero status when peak RSS grows by more than `--max-rss-mb`.
+"""
+import argparse
+import contextlib
+import csv
+import os
+import resource
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from src.app.config import settings
+from src.app.orm.mcq_orm import start_mappers
+from src.app.services.mcq_services import MCQService
+from src.app.services.unit_of_work import MCQUnitOfWork
+from src.benchmarks.scratch import create_scratch_category, drop_scratch_category
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_synthetic_csv(path: str, category_id: int, size_bytes: int, row_bytes: int) -> int:
+    """
+    Write unique, valid MCQ rows until the file reaches `size_bytes`. Returns the number of rows.
+    """
+    padding = "x" * max(row_bytes - 120, 0)
+    rows = 0
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["sno", "Question", "Options", "Correct_options", "Category"])
+        while handle.tell() < size_bytes:
+            for _ in range(10_000):
+                options = [f"a{rows}", f"b{rows}", f"c{rows}", f"d{rows}"]
+                writer.writerow([rows, f"Synthetic question {rows} {padding}?", repr(options),
+                                 repr(options[:1]), category_id])
+                rows += 1
+    return rows
+
+
+def main(args) -> int:
+    start_mappers()
+    user_id, category_id = create_scratch_category(args.role_id)
+    fd, path = tempfile.mkstemp(suffix=".csv", dir=args.tmp_dir)
+    os.close(fd)
+    try:
+        rows = write_synthetic_csv(path, category_id, int(args.size_gb * 1024 ** 3), args.row_bytes)
+        size_mb = os.path.getsize(path) / 1024 ** 2
+        print(f"synthetic file: {size_mb:.0f} MB, {rows} rows, chunk size {settings.BULK_UPLOAD_CHUNK_ROWS} rows")
+
+        baseline = peak_rss_mb()
+        started = time.perf_counter()
+        # discard (rather than buffer) the per-row prints, they would otherwise count as upload memory
+        with open(path, "rb") as handle, open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = MCQService.bulk_upload_csv(SimpleNamespace(file=handle), SimpleNamespace(id=user_id),
+                                                MCQUnitOfWork())
+        elapsed = time.perf_counter() - started
+        growth = peak_rss_mb() - baseline
+
+        print(f"uploaded {result['uploaded_count']} / {result['total_questions']} rows in {elapsed:.1f}s "
+              f"({result['total_questions'] / elapsed:.0f} rows/s), failed {result['failed_count']}")
+        print(f"peak RSS: baseline {baseline:.0f} MB, growth {growth:.0f} MB (ceiling {args.max_rss_mb} MB)")
+    finally:
+        os.remove(path)
+        drop_scratch_category(category_id, user_id)
+
+    if growth > args.max_rss_mb:
+        print("FAIL: peak RSS growth above the ceiling")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure peak RSS of a large bulk upload.")
+    parser.add_argument("--size-gb", type=float, default=2.0)
+    parser.add_argument("--row-bytes", type=int, default=2048)
+    parser.add_argument("--max-rss-mb", type=int, default=512)
+    parser.add_argument("--tmp-dir", default=None)
+    parser.add_argument("--role-id", type=int, default=1)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,91 @@
+"""
+Concurrency benchmark for a running MCQ App server.
+
+Drives the read and quiz routes with a fixed number of concurrent clients and reports
+latency percentiles, so the effect of blocking vs. awaited database I/O on tail latency
+can be compared between builds.
+
+Usage
+-----
+Start the server (e.g. `python -m uvicorn src.app.app_definition:mcq_app --port 8001`) and run:
+
+    python -m src.benchmarks.concurrency_benchmark --base-url http://localhost:8001 \\
+        --email admin@example.com --password secret --category-id 1 --clients 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of the given samples.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await client.post("/login", data={"username": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run_client(client: httpx.AsyncClient, requests: list[tuple[str, str, dict]],
+                     iterations: int, latencies: dict[str, list[float]], errors: dict[str, int]):
+    for _ in range(iterations):
+        for method, path, kwargs in requests:
+            started = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            latencies.setdefault(path, []).append(elapsed_ms)
+            if response.status_code >= 400:
+                errors[path] = errors.get(path, 0) + 1
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        token = await login(client, args.email, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        requests = [
+            ("GET", "/category", {}),
+            ("GET", f"/category/{args.category_id}", {}),
+            ("GET", f"/mcq/{args.mcq_id}", {}),
+            ("POST", f"/quiz/start?category_id={args.category_id}", {"headers": headers}),
+            ("GET", "/quiz/attempts", {"headers": headers}),
+        ]
+
+        latencies: dict[str, list[float]] = {}
+        errors: dict[str, int] = {}
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            run_client(client, requests, args.iterations, latencies, errors) for _ in range(args.clients)
+        ])
+        wall_time = time.perf_counter() - started
+
+    total = sum(len(samples) for samples in latencies.values())
+    print(f"{args.clients} clients, {total} requests in {wall_time:.2f}s ({total / wall_time:.1f} req/s)")
+    print(f"{'route':<40}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'errors':>8}")
+    for path, samples in latencies.items():
+        print(f"{path:<40}{percentile(samples, 50):>10.1f}{percentile(samples, 95):>10.1f}"
+              f"{percentile(samples, 99):>10.1f}{statistics.mean(samples):>10.1f}{errors.get(path, 0):>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure route latency under concurrent load.")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--category-id", type=int, default=1)
+    parser.add_argument("--mcq-id", type=int, default=1)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,153 @@
+"""
+Throughput of the bulk-upload validation stage.
+
+Generates a synthetic CSV chunk (mostly well-formed rows plus a share of malformed and invalid
+ones), validates it with the previous row-by-row loop (`eval` + one `MCQCreate` per row) and with
+the column-wise `validate_mcq_rows`, checks that both produce the same staged rows and error
+records, and reports rows/sec for each. No database is needed.
+
+Usage
+-----
+    python -m src.benchmarks.csv_validation_benchmark --rows 100000 --bad-share 0.05
+"""
+import argparse
+import contextlib
+import csv
+import io
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+from src.app.common.csv_validation import validate_mcq_rows
+from src.app.common.similarity import question_lsh_buckets
+from src.app.entities.mcq import build_mcq_fingerprint
+from src.app.schemas.mcq_schema import MCQCreate
+
+# cells that take the slow path or fail, with the rest of their row kept valid where possible
+UNUSUAL_CELLS = [
+    ("Options", "['a', 'b'"),                    # unclosed list
+    ("Options", "[a, b]"),                       # names instead of strings
+    ("Options", "('a', 'b')"),                   # tuple
+    ("Options", "'ab'"),                         # bare string
+    ("Options", "['a', 1]"),                     # non-string item
+    ("Options", "[\"it's\", 'b \\'q\\'', 'a']"),  # quotes and escapes
+    ("Options", "[]"),                           # empty list
+    ("Options", ""),                             # missing cell
+    ("Correct_options", "['z']"),                # not among the options
+    ("Correct_options", "[]"),                   # no correct option
+    ("Correct_options", "['a',]"),               # trailing comma
+    ("Category", "abc"),                         # not a number
+    ("Category", ""),                            # missing category
+]
+
+
+def build_csv(rows: int, bad_share: float, seed: int) -> bytes:
+    rng = random.Random(seed)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["sno", "Question", "Options", "Correct_options", "Category"])
+    for n in range(rows):
+        # repeat some questions so the duplicate keys are exercised too
+        q = n if rng.random() > 0.1 else rng.randrange(max(n, 1))
+        row = {
+            "sno": n,
+            "Question": f"  Question {q}?  ",
+            "Options": repr(["a", "b", f"Option {q} C", f" option {q} d "]),
+            "Correct_options": repr(["a"]),
+            "Category": rng.randrange(1, 20),
+        }
+        if rng.random() < bad_share:
+            column, cell = rng.choice(UNUSUAL_CELLS)
+            row[column] = cell
+        writer.writerow(row.values())
+    return buffer.getvalue().encode()
+
+
+def validate_per_row(chunk: pd.DataFrame, row_offset: int) -> tuple[list[dict], list[tuple[int, dict]]]:
+    """
+    The previous validation loop, kept as the reference implementation.
+    """
+    staged_rows = []
+    failed_records = []
+    columns = chunk[["Question", "Options", "Correct_options", "Category"]].itertuples(index=False, name=None)
+    for row_no, (question, raw_options, raw_correct_options, raw_category) in enumerate(columns, row_offset):
+        question = question.strip()
+        try:
+            options = eval(raw_options)
+            correct_options = eval(raw_correct_options)
+            category_id = int(raw_category)
+        except Exception as e:
+            failed_records.append((row_no, {"question": question, "error": f"Bad format:{str(e)}"}))
+            continue
+        try:
+            MCQCreate(question=question, options=options, correct_option=correct_options, category=category_id)
+            error = None
+        except Exception as e:
+            error = str(e)
+        staged_rows.append({
+            "row_no": row_no,
+            "question": question,
+            "options": [str(option) for option in options],
+            "correct_option": [str(option) for option in correct_options],
+            "category": category_id,
+            "question_cmp": question.lower(),
+            "fingerprint": build_mcq_fingerprint(question, [str(option) for option in options]),
+            "options_set": sorted({str(option).strip().lower() for option in options}),
+            "correct_set": sorted({str(option).strip().lower() for option in correct_options}),
+            "lsh_buckets": question_lsh_buckets(question),
+            "error": error,
+        })
+    return staged_rows, failed_records
+
+
+def read_chunk(data: bytes) -> pd.DataFrame:
+    return pd.read_csv(io.BytesIO(data), dtype={"Question": str, "Options": str, "Correct_options": str})
+
+
+def timed(function, data: bytes):
+    chunk = read_chunk(data)
+    started = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        result = function(chunk, 0)
+    return result, time.perf_counter() - started
+
+
+def main(args) -> int:
+    data = build_csv(args.rows, args.bad_share, args.seed)
+
+    (reference_rows, reference_failed), per_row_seconds = timed(validate_per_row, data)
+    (staged, failed), column_wise_seconds = timed(validate_mcq_rows, data)
+    staged_rows = [
+        {key: (int(value) if key in ("row_no", "category") else value) for key, value in row.items()}
+        for row in staged.to_dict("records")
+    ]
+
+    print(f"{args.rows} rows, {len(reference_failed)} unparseable, "
+          f"{sum(row['error'] is not None for row in reference_rows)} invalid")
+    print(f"{'row-by-row':>12}: {args.rows / per_row_seconds:>10.0f} rows/s")
+    print(f"{'column-wise':>12}: {args.rows / column_wise_seconds:>10.0f} rows/s "
+          f"({per_row_seconds / column_wise_seconds:.1f}x)")
+
+    # rows the eval-based loop could only reject by executing them are not compared
+    mismatches = [
+        (expected, actual) for expected, actual in zip(reference_rows + reference_failed, staged_rows + failed)
+        if expected != actual and not (isinstance(expected, tuple) and expected[1]["error"].startswith("Bad format:name "))
+    ]
+    if len(reference_rows) != len(staged_rows) or len(reference_failed) != len(failed) or mismatches:
+        print("FAIL: column-wise validation differs from the row-by-row loop")
+        for expected, actual in mismatches[:5]:
+            print("  expected:", expected)
+            print("  actual:  ", actual)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare bulk-upload validation throughput.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--bad-share", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=7)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,99 @@
+"""
+Benchmark of the NDJSON export (`GET /mcq/export`) against growing question banks.
+
+For each bank size the export stream of `MCQService.export_ndjson` is consumed as the HTTP response
+would be, reporting time to first byte, total time and throughput, plain and gzip-compressed, and
+the peak Python memory allocated while streaming (traced in a separate pass). Up to
+`--full-load-max` rows the previous approach, loading every MCQ and serializing the whole list, is
+measured for comparison. A scratch user, category and MCQs are created for the run and removed
+afterwards.
+
+Usage
+-----
+    python -m src.benchmarks.export_benchmark --sizes 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from sqlalchemy import text
+
+from src.app.build_db import DEFAULT_ASYNC_SESSION_FACTORY, async_engine, engine
+from src.app.config import settings
+from src.app.orm.mcq_orm import start_mappers
+from src.app.repositories.mcq_repository import AsyncMCQRepository
+from src.app.services.mcq_services import MCQService
+from src.benchmarks.scratch import create_scratch_category, drop_scratch_category, grow_category
+
+
+async def stream_export(batch_size: int, compress: bool) -> tuple[float, float, int]:
+    """
+    Consume one export. Returns (time to first byte in ms, total seconds, bytes streamed).
+    """
+    started = time.perf_counter()
+    first_byte_ms, streamed = None, 0
+    async for chunk in MCQService.export_ndjson(batch_size, compress):
+        if first_byte_ms is None and chunk:
+            first_byte_ms = (time.perf_counter() - started) * 1000
+        streamed += len(chunk)
+    return first_byte_ms, time.perf_counter() - started, streamed
+
+
+async def full_load() -> bytes:
+    async with DEFAULT_ASYNC_SESSION_FACTORY() as session:
+        mcqs = await AsyncMCQRepository(session).get_all()
+        return json.dumps([item.to_dict() for item in mcqs], default=str).encode()
+
+
+async def traced_peak_mb(coroutine_factory) -> float:
+    tracemalloc.start()
+    try:
+        await coroutine_factory()
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+async def measure(size: int, args):
+    for compress in (False, True):
+        first_byte_ms, seconds, streamed = await stream_export(args.batch_size, compress)
+        peak_mb = await traced_peak_mb(lambda: stream_export(args.batch_size, compress))
+        print(f"{size:>9} {'export+gzip' if compress else 'export':>12} {first_byte_ms:>10.1f} {seconds:>9.2f} "
+              f"{size / seconds:>10.0f} {streamed / 1024 / 1024:>9.1f} {peak_mb:>9.1f}")
+
+    if size <= args.full_load_max:
+        started = time.perf_counter()
+        body = await full_load()
+        seconds = time.perf_counter() - started
+        peak_mb = await traced_peak_mb(full_load)
+        # the whole body is built before its first byte can be sent
+        print(f"{size:>9} {'full list':>12} {seconds * 1000:>10.1f} {seconds:>9.2f} "
+              f"{size / seconds:>10.0f} {len(body) / 1024 / 1024:>9.1f} {peak_mb:>9.1f}")
+
+
+async def main(args):
+    start_mappers()
+    user_id, category_id = create_scratch_category(args.role_id)
+    try:
+        print(f"{'bank':>9} {'mode':>12} {'ttfb ms':>10} {'total s':>9} {'rows/s':>10} {'MB sent':>9} {'peak MB':>9}")
+        current = 0
+        for size in sorted(args.sizes):
+            grow_category(category_id, user_id, current, size)
+            current = size
+            with engine.begin() as conn:
+                conn.execute(text("ANALYZE mcq"))
+            await measure(size, args)
+    finally:
+        drop_scratch_category(category_id, user_id)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the streaming NDJSON export of the question bank.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--batch-size", type=int, default=settings.MCQ_EXPORT_BATCH_SIZE)
+    parser.add_argument("--full-load-max", type=int, default=100_000)
+    parser.add_argument("--role-id", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,89 @@
+"""
+Login storm benchmark for a running MCQ App server.
+
+Fires `--clients` concurrent clients that each log in `--logins` times, while a probe requests the
+cheap `GET /` route every `--probe-interval-ms`. The login latency percentiles show how bcrypt work
+is spread over the password pool; the probe latencies show whether the event loop stays free to
+serve other requests meanwhile. Compare builds by running it against each.
+
+Usage
+-----
+Start the server (e.g. `python -m uvicorn src.app.app_definition:mcq_app --port 8001`) and run:
+
+    python -m src.benchmarks.login_storm_benchmark --base-url http://localhost:8001 \\
+        --email user@example.com --password secret --clients 50 --logins 4
+
+With `--register` the user is registered first (as a regular user).
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from src.benchmarks.concurrency_benchmark import percentile
+
+
+async def run_client(client: httpx.AsyncClient, args, latencies: list[float], statuses: dict[int, int]):
+    for _ in range(args.logins):
+        started = time.perf_counter()
+        response = await client.post("/login", data={"username": args.email, "password": args.password})
+        latencies.append((time.perf_counter() - started) * 1000)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+
+async def run_probe(client: httpx.AsyncClient, interval: float, latencies: list[float], stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/")
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+
+
+def report(name: str, samples: list[float]):
+    print(f"{name:<8} n={len(samples):<6} p50={percentile(samples, 50):>9.1f} ms  "
+          f"p95={percentile(samples, 95):>9.1f} ms  p99={percentile(samples, 99):>9.1f} ms  "
+          f"max={max(samples, default=0.0):>9.1f} ms")
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.clients + 1, max_keepalive_connections=args.clients + 1)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=300) as client:
+        if args.register:
+            response = await client.post("/register", json={
+                "first_name": "storm", "last_name": "bench", "email": args.email,
+                "password": args.password, "role": 2,
+            })
+            print("register:", response.status_code)
+
+        login_latencies, probe_latencies, statuses = [], [], {}
+        stop = asyncio.Event()
+        probe = asyncio.create_task(run_probe(client, args.probe_interval_ms / 1000, probe_latencies, stop))
+        await asyncio.sleep(0.5)  # probe baseline before the storm
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run_client(client, args, login_latencies, statuses) for _ in range(args.clients)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe
+
+        print(f"{len(login_latencies)} logins by {args.clients} clients in {elapsed:.2f} s "
+              f"({len(login_latencies) / elapsed:.1f} logins/s), status codes: {statuses}")
+        report("login", login_latencies)
+        report("GET /", probe_latencies)
+
+        response = await client.get("/health/password-pool")
+        if response.status_code == 200:
+            print("password pool:", response.json())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure /login under a storm of concurrent logins.")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--register", action="store_true")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--logins", type=int, default=4)
+    parser.add_argument("--probe-interval-ms", type=float, default=20)
+    asyncio.run(main(parser.parse_args()))
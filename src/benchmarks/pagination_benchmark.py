@@ -0,0 +1,108 @@
+"""
+Benchmark of `GET /mcq` listing against growing question banks.
+
+Compares loading every MCQ (the previous unpaginated listing: `get_all` + `to_dict`) with fetching
+one keyset page through `MCQService.list_mcqs`, for the first page and a page deep into the bank,
+per sort order and with a category filter. A scratch user, category and MCQs are created for the
+run and removed afterwards.
+
+Usage
+-----
+    python -m src.benchmarks.pagination_benchmark --sizes 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import resource
+import statistics
+import time
+
+from sqlalchemy import select, text
+
+from src.app.build_db import DEFAULT_ASYNC_SESSION_FACTORY, async_engine, engine
+from src.app.common.pagination import MCQ_SORT_OPTIONS, encode_cursor
+from src.app.orm.mcq_orm import mcq, start_mappers
+from src.app.repositories.mcq_repository import AsyncMCQRepository
+from src.app.services.mcq_services import MCQService
+from src.benchmarks.scratch import create_scratch_category, drop_scratch_category, grow_category
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def time_ms(coroutine_factory, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coroutine_factory()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def deep_cursor(category_id: int, sort: str) -> str:
+    """
+    Cursor of the page starting 90% into the scratch category in `sort` order.
+    """
+    column, descending = MCQ_SORT_OPTIONS[sort]
+    keys = [mcq.c.id] if column == "id" else [mcq.c.created_date, mcq.c.id]
+    with engine.connect() as conn:
+        total = conn.execute(text("SELECT count(*) FROM mcq WHERE category = :c"), {"c": category_id}).scalar()
+        row = conn.execute(
+            select(mcq.c.id, mcq.c.created_date).where(mcq.c.category == category_id)
+            .order_by(*(key.desc() if descending else key for key in keys)).offset(int(total * 0.9)).limit(1)
+        ).one()
+    return encode_cursor(sort, row)
+
+
+async def measure(category_id: int, size: int, args):
+    async with DEFAULT_ASYNC_SESSION_FACTORY() as session:
+        service = MCQService(session)
+
+        async def full_load():
+            return [item.to_dict() for item in await AsyncMCQRepository(session).get_all()]
+
+        full_ms = None
+        if size <= args.full_load_max:
+            full_ms = await time_ms(full_load, 1)
+            session.expunge_all()
+
+        results = []
+        for sort in MCQ_SORT_OPTIONS:
+            cursor = deep_cursor(category_id, sort)
+            first = await time_ms(lambda: service.list_mcqs(args.limit, sort), args.repeat)
+            deep = await time_ms(lambda: service.list_mcqs(args.limit, sort, cursor), args.repeat)
+            filtered = await time_ms(lambda: service.list_mcqs(args.limit, sort, cursor, category_id=category_id),
+                                     args.repeat)
+            results.append((sort, first, deep, filtered))
+
+    full = f"{full_ms:>10.1f}" if full_ms is not None else f"{'skipped':>10}"
+    for sort, first, deep, filtered in results:
+        print(f"{size:>9} {full} {sort:>14} {first:>10.2f} {deep:>10.2f} {filtered:>12.2f}")
+    print(f"{'':>9} peak RSS so far: {peak_rss_mb():.0f} MB")
+
+
+async def main(args):
+    start_mappers()
+    user_id, category_id = create_scratch_category(args.role_id)
+    try:
+        print(f"{'bank':>9} {'full ms':>10} {'sort':>14} {'first ms':>10} {'deep ms':>10} {'category ms':>12}")
+        current = 0
+        for size in sorted(args.sizes):
+            grow_category(category_id, user_id, current, size)
+            current = size
+            with engine.begin() as conn:
+                conn.execute(text("ANALYZE mcq"))
+            await measure(category_id, size, args)
+    finally:
+        drop_scratch_category(category_id, user_id)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark MCQ listing with keyset pagination.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--full-load-max", type=int, default=100_000)
+    parser.add_argument("--role-id", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
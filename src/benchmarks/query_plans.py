@@ -0,0 +1,234 @@
+"""
+Query plan check: runs the hot-path repository queries against a seeded database and fails (exit
+status 1) when the plan of any of them sequentially scans a large table.
+
+Every SQL statement a repository method sends is captured on its way to the database and
+EXPLAINed with the same parameters first, so the check follows the repositories as they change.
+Scratch data is generated for the run (MCQs spread over several categories, users, quiz attempts
+and their answers), ANALYZEd, and removed afterwards; with `--no-seed` the existing data is
+checked as it is. Tables with fewer than `--min-rows` rows are not considered large: scanning them
+whole is what Postgres should do.
+
+Usage
+-----
+    python -m src.benchmarks.query_plans --mcqs 100000 --users 20000 --attempts 20000
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, event, insert, select, text
+
+from src.app.build_db import DEFAULT_ASYNC_SESSION_FACTORY, async_engine, engine
+from src.app.common.utils import hash_refresh_token
+from src.app.orm.mcq_orm import attempt_questions, mcq, quiz_attempts, role, start_mappers, user
+from src.app.repositories.mcq_repository import AsyncMCQRepository
+from src.app.repositories.quiz_attempt_question_repository import AsyncAttemptQuestionRepository
+from src.app.repositories.quiz_attempt_repository import AsyncQuizAttemptRepository
+from src.app.repositories.quiz_session_repository import AsyncQuizSessionRepository
+from src.app.repositories.refresh_token_repository import AsyncRefreshTokenRepository
+from src.app.repositories.user_repository import AsyncUserRepository
+from src.benchmarks.scratch import create_scratch_category, drop_scratch_category, grow_category
+
+BATCH_SIZE = 10_000
+ANSWERS_PER_ATTEMPT = 25
+EXPLAINED_STATEMENTS = ("SELECT", "WITH", "UPDATE", "DELETE")
+SEEDED_TABLES = ("mcq", "users", "quiz_attempts", "attempt_questions")
+
+
+class PlanCapture:
+    """
+    EXPLAINs every statement sent through the engine while `label` is set, and keeps the plans by label.
+    """
+    def __init__(self):
+        self.label = None
+        self.plans = {}
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.label is None or not statement.lstrip().upper().startswith(EXPLAINED_STATEMENTS):
+            return
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        plan = cursor.fetchall()[0][0]
+        self.plans.setdefault(self.label, []).append(json.loads(plan) if isinstance(plan, str) else plan)
+
+
+def plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def seed(args, rng: random.Random) -> dict:
+    """
+    Create the scratch data. Returns the scratch ids and the values the checked queries look up.
+    """
+    tag = uuid.uuid4().hex[:8]
+    with engine.connect() as conn:
+        role_id = conn.execute(select(role.c.id).order_by(role.c.id)).scalars().first()
+
+    scratch = [create_scratch_category(role_id) for _ in range(args.categories)]
+    for user_id, category_id in scratch:
+        grow_category(category_id, user_id, 0, args.mcqs // args.categories)
+
+    now = datetime.now()
+    with engine.begin() as conn:
+        user_ids = []
+        for start in range(0, args.users, BATCH_SIZE):
+            user_ids += conn.execute(insert(user).returning(user.c.id), [{
+                "first_name": "plan", "last_name": tag, "email": f"Plan-{tag}-{n}@Example.com",
+                "password": "-", "role": role_id, "created_date": now,
+            } for n in range(start, min(start + BATCH_SIZE, args.users))]).scalars().all()
+
+        mcq_ids = {category_id: conn.execute(select(mcq.c.id).where(mcq.c.category == category_id)).scalars().all()
+                   for _, category_id in scratch}
+        first_attempt_id = conn.execute(text("SELECT coalesce(max(attempt_id), 0) + 1 FROM quiz_attempts")).scalar()
+        for start in range(0, args.attempts, BATCH_SIZE):
+            attempts, answers = [], []
+            for attempt_id in range(first_attempt_id + start, first_attempt_id + min(start + BATCH_SIZE, args.attempts)):
+                category_id = rng.choice(scratch)[1]
+                attempts.append({
+                    "user_id": rng.choice(user_ids), "attempt_id": attempt_id, "category_id": category_id,
+                    "total_questions": ANSWERS_PER_ATTEMPT, "questions_attempted": ANSWERS_PER_ATTEMPT,
+                    "questions_unattempted": 0, "correct_answers": 0, "score": 0,
+                    "created_date": now - timedelta(minutes=rng.randrange(100_000)),
+                })
+                answers += [{"attempt_id": attempt_id, "question_id": question_id, "attempted_answer": "-",
+                             "is_correct": False}
+                            for question_id in rng.sample(mcq_ids[category_id], ANSWERS_PER_ATTEMPT)]
+            conn.execute(insert(quiz_attempts), attempts)
+            conn.execute(insert(attempt_questions), answers)
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in SEEDED_TABLES:
+            conn.execute(text(f"ANALYZE {table}"))
+
+    category_id = scratch[0][1]
+    return {
+        "tag": tag, "scratch": scratch, "category_id": category_id, "user_id": user_ids[0],
+        "email": f"plan-{tag}-0@example.com", "attempt_id": first_attempt_id,
+        "mcq_ids": mcq_ids[category_id][:ANSWERS_PER_ATTEMPT],
+    }
+
+
+def existing_lookups() -> dict:
+    """
+    Look-up values for the checked queries taken from the existing data (`--no-seed`).
+    """
+    with engine.connect() as conn:
+        category_id, mcq_id = conn.execute(select(mcq.c.category, mcq.c.id).order_by(mcq.c.id.desc())).first()
+        user_id, email = conn.execute(select(user.c.id, user.c.email).order_by(user.c.id.desc())).first()
+        attempt_id = conn.execute(select(quiz_attempts.c.attempt_id).order_by(quiz_attempts.c.id.desc())).scalar()
+    return {"category_id": category_id, "user_id": user_id, "email": email, "attempt_id": attempt_id or 0,
+            "mcq_ids": [mcq_id]}
+
+
+def unseed(fixture: dict):
+    # answers first: deleting an MCQ checks every answer row for references to it
+    with engine.begin() as conn:
+        attempt_ids = select(quiz_attempts.c.attempt_id).where(
+            quiz_attempts.c.category_id.in_([category_id for _, category_id in fixture["scratch"]]))
+        conn.execute(delete(attempt_questions).where(attempt_questions.c.attempt_id.in_(attempt_ids)))
+    for user_id, category_id in fixture["scratch"]:
+        drop_scratch_category(category_id, user_id)
+    with engine.begin() as conn:
+        conn.execute(delete(user).where(user.c.last_name == fixture["tag"]))
+
+
+def hot_path_queries(lookups: dict) -> dict:
+    """
+    Label -> coroutine function running one repository query on a session.
+    """
+    now = datetime.now()
+    return {
+        "mcq.get_one": lambda session: AsyncMCQRepository(session).get_one(lookups["mcq_ids"][0]),
+        "mcq.get_page(category)": lambda session: AsyncMCQRepository(session).get_page(
+            100, "id", (lookups["mcq_ids"][0],), category_id=lookups["category_id"]),
+        "mcq.get_page(-created_date)": lambda session: AsyncMCQRepository(session).get_page(100, "-created_date"),
+        "mcq.get_by_category": lambda session: AsyncMCQRepository(session).get_by_category(lookups["category_id"]),
+        "mcq.get_ids_by_category": lambda session: AsyncMCQRepository(session).get_ids_by_category(
+            lookups["category_id"]),
+        "mcq.get_answer_keys": lambda session: AsyncMCQRepository(session).get_answer_keys(lookups["mcq_ids"]),
+        "mcq.get_by_fingerprint": lambda session: AsyncMCQRepository(session).get_by_fingerprint("0" * 64),
+        "users.get_by_email": lambda session: AsyncUserRepository(session).get_by_email(lookups["email"]),
+        "users.get_by_id": lambda session: AsyncUserRepository(session).get_by_id(lookups["user_id"]),
+        "quiz_attempts.get_by_user": lambda session: AsyncQuizAttemptRepository(session).get_by_user(
+            lookups["user_id"]),
+        "quiz_attempts.get_by_attempt_id": lambda session: AsyncQuizAttemptRepository(session).get_by_attempt_id(
+            lookups["attempt_id"]),
+        "attempt_questions.get_by_attempt": lambda session: AsyncAttemptQuestionRepository(session).get_by_attempt(
+            lookups["attempt_id"]),
+        "quiz_sessions.get_one": lambda session: AsyncQuizSessionRepository(session).get_one(lookups["attempt_id"]),
+        "refresh_tokens.get_by_hash": lambda session: AsyncRefreshTokenRepository(session).get_by_hash(
+            hash_refresh_token("plan")),
+        "refresh_tokens.revoke_user": lambda session: AsyncRefreshTokenRepository(session).revoke_user(
+            lookups["user_id"], now),
+    }
+
+
+async def check_plans(lookups: dict, min_rows: int) -> list[str]:
+    """
+    Run the hot-path queries (in a transaction that is rolled back) and return the failures.
+    """
+    with engine.connect() as conn:
+        large_tables = set(conn.execute(text(
+            "SELECT relname FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace "
+            "AND reltuples >= :min_rows"
+        ), {"min_rows": min_rows}).scalars().all())
+    print(f"large tables (>= {min_rows} rows): {', '.join(sorted(large_tables)) or 'none'}")
+
+    capture = PlanCapture()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture.before_cursor_execute)
+    try:
+        async with DEFAULT_ASYNC_SESSION_FACTORY() as session:
+            for label, query in hot_path_queries(lookups).items():
+                capture.label = label
+                await query(session)
+                capture.label = None
+            await session.rollback()
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture.before_cursor_execute)
+
+    failures = []
+    for label in hot_path_queries(lookups):
+        nodes = [node for plan in capture.plans.get(label, []) for node in plan_nodes(plan[0]["Plan"])]
+        scans = sorted({f"{node['Node Type']} on {node['Relation Name']}"
+                        + (f" using {node['Index Name']}" if "Index Name" in node else "")
+                        for node in nodes if "Relation Name" in node})
+        seq_scans = sorted({node["Relation Name"] for node in nodes
+                            if node["Node Type"] == "Seq Scan" and node["Relation Name"] in large_tables})
+        status = "FAIL" if seq_scans else "ok"
+        print(f"{status:<4} {label:<34} {'; '.join(scans) or 'no table access'}")
+        if seq_scans:
+            failures.append(f"{label}: sequential scan of {', '.join(seq_scans)}")
+    return failures
+
+
+async def main(args):
+    start_mappers()
+    fixture = seed(args, random.Random(args.seed)) if not args.no_seed else None
+    try:
+        failures = await check_plans(fixture or existing_lookups(), args.min_rows)
+    finally:
+        if fixture:
+            unseed(fixture)
+        await async_engine.dispose()
+
+    for failure in failures:
+        print(failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail when a hot-path query plan scans a large table.")
+    parser.add_argument("--mcqs", type=int, default=100_000)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--attempts", type=int, default=20_000)
+    parser.add_argument("--min-rows", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-seed", action="store_true")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,79 @@
+"""
+Benchmark of quiz question selection against growing question banks.
+
+Compares loading the whole category and sampling in Python (the previous `/quiz/start`
+behaviour) with `AsyncMCQRepository.sample_by_category`, cold (id cache empty) and warm.
+A scratch user, category and MCQs are created for the run and removed afterwards.
+
+Usage
+-----
+    python -m src.benchmarks.quiz_sampling_benchmark --sizes 100 1000 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from src.app.build_db import DEFAULT_ASYNC_SESSION_FACTORY, async_engine
+from src.app.common.constants import QUIZ_QUESTION_COUNT
+from src.app.orm.mcq_orm import start_mappers
+from src.app.repositories.mcq_repository import AsyncMCQRepository, invalidate_category_ids
+from src.benchmarks.scratch import create_scratch_category, drop_scratch_category, grow_category
+
+
+async def time_ms(coroutine_factory, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coroutine_factory()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def measure(category_id: int, repeat: int) -> dict:
+    async with DEFAULT_ASYNC_SESSION_FACTORY() as session:
+        repo = AsyncMCQRepository(session)
+
+        async def full_load():
+            mcqs = await repo.get_by_category(category_id)
+            random.sample(mcqs, min(len(mcqs), QUIZ_QUESTION_COUNT))
+            session.expunge_all()
+
+        async def sampled_cold():
+            invalidate_category_ids(category_id)
+            await repo.sample_by_category(category_id, QUIZ_QUESTION_COUNT)
+
+        async def sampled_warm():
+            await repo.sample_by_category(category_id, QUIZ_QUESTION_COUNT)
+
+        return {
+            "full_load_ms": await time_ms(full_load, repeat),
+            "sampled_cold_ms": await time_ms(sampled_cold, repeat),
+            "sampled_warm_ms": await time_ms(sampled_warm, repeat),
+        }
+
+
+async def main(args):
+    start_mappers()
+    user_id, category_id = create_scratch_category(args.role_id)
+    current = 0
+    try:
+        print(f"{'bank size':>10}{'full load ms':>15}{'sampled cold ms':>18}{'sampled warm ms':>18}")
+        for size in sorted(args.sizes):
+            grow_category(category_id, user_id, current, size)
+            current = size
+            result = await measure(category_id, args.repeat)
+            print(f"{size:>10}{result['full_load_ms']:>15.2f}{result['sampled_cold_ms']:>18.2f}"
+                  f"{result['sampled_warm_ms']:>18.2f}")
+    finally:
+        drop_scratch_category(category_id, user_id)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark quiz question sampling by bank size.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--role-id", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,88 @@
+"""
+Scratch data for benchmarks: a throwaway user and category filled with generated MCQs,
+removed again (with any quiz attempts made on it) when the benchmark finishes.
+"""
+import random
+import uuid
+from datetime import datetime
+
+from sqlalchemy import delete, insert, select
+
+from src.app.build_db import engine
+from src.app.orm.mcq_orm import attempt_questions, categories, mcq, quiz_attempts, quiz_sessions, refresh_tokens, user
+
+BATCH_SIZE = 10_000
+
+# a vocabulary of 10,000 made-up words, large enough that unrelated generated questions share few words
+SYLLABLES = ["ka", "lo", "mi", "ne", "pu", "ra", "si", "to", "vu", "ze", "bro", "cha", "dre", "fli", "gru",
+             "ho", "jin", "kle", "mor", "nax", "pel", "qui", "sta", "tre", "ulm"]
+WORDS = [first + second + third for first in SYLLABLES for second in SYLLABLES for third in SYLLABLES[:16]]
+
+
+def create_scratch_category(role_id: int) -> tuple[int, int]:
+    """
+    Create a scratch user and category. Returns (user_id, category_id).
+    """
+    tag = uuid.uuid4().hex[:8]
+    with engine.begin() as conn:
+        user_id = conn.execute(insert(user).returning(user.c.id), {
+            "first_name": "bench", "last_name": tag, "email": f"bench-{tag}@example.com",
+            "password": "-", "role": role_id, "created_date": datetime.now(),
+        }).scalar_one()
+        category_id = conn.execute(insert(categories).returning(categories.c.id), {
+            "name": f"bench-{tag}", "created_by": user_id, "created_date": datetime.now(),
+        }).scalar_one()
+    return user_id, category_id
+
+
+def generate_questions(rng: random.Random, count: int, start: int, paraphrase_share: float = 0.0) -> list[str]:
+    """
+    Questions of 8 to 14 random words from `WORDS`, numbered from `start`; a share of them repeat an
+    earlier one with a word swapped and the punctuation changed.
+    """
+    questions = []
+    for n in range(count):
+        if questions and rng.random() < paraphrase_share:
+            words = rng.choice(questions).rstrip("?").split()
+            words[rng.randrange(len(words))] = rng.choice(WORDS)
+            questions.append(" ".join(words) + "!")
+        else:
+            questions.append(f"Q{start + n}: " + " ".join(rng.choices(WORDS, k=rng.randint(8, 14))) + "?")
+    return questions
+
+
+def grow_category(category_id: int, user_id: int, current: int, target: int, question_factory=None):
+    """
+    Insert generated MCQs until the scratch category holds `target` questions. `question_factory`,
+    if given, is called with (start, count) and returns the question texts of a batch.
+    """
+    with engine.begin() as conn:
+        for start in range(current, target, BATCH_SIZE):
+            count = min(BATCH_SIZE, target - start)
+            questions = (question_factory(start, count) if question_factory
+                         else [f"Benchmark question {n}?" for n in range(start, start + count)])
+            rows = [{
+                "question": question,
+                "options": [f"option {n}-{k}" for k in range(4)],
+                "correct_option": [f"option {n}-0"],
+                "category": category_id,
+                "created_by": user_id,
+                "created_date": datetime.now(),
+            } for n, question in enumerate(questions, start)]
+            conn.execute(insert(mcq), rows)
+
+
+def drop_scratch_category(category_id: int, user_id: int):
+    """
+    Remove the scratch category, its MCQs, the quizzes taken on it and the scratch user (with its
+    refresh tokens, if the benchmark logged in as it).
+    """
+    with engine.begin() as conn:
+        attempt_ids = select(quiz_attempts.c.attempt_id).where(quiz_attempts.c.category_id == category_id)
+        conn.execute(delete(attempt_questions).where(attempt_questions.c.attempt_id.in_(attempt_ids)))
+        conn.execute(delete(quiz_attempts).where(quiz_attempts.c.category_id == category_id))
+        conn.execute(delete(quiz_sessions).where(quiz_sessions.c.category_id == category_id))
+        conn.execute(delete(mcq).where(mcq.c.category == category_id))
+        conn.execute(delete(categories).where(categories.c.id == category_id))
+        conn.execute(delete(refresh_tokens).where(refresh_tokens.c.user_id == user_id))
+        conn.execute(delete(user).where(user.c.id == user_id))
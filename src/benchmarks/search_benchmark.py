@@ -0,0 +1,116 @@
+"""
+Benchmark of `/mcq/search` against growing question banks.
+
+Fills a scratch category with generated questions and times, per bank size, a substring scan
+(all rows matching `question ILIKE '%word%'`, what ranked search looks like without an index) against the full-text
+search behind `/mcq/search` (GIN index on the search vector, plus trigram matches where pg_trgm is
+installed), for one-word, two-word and phrase queries. The scratch user, category and MCQs are
+removed afterwards.
+
+Usage
+-----
+    python -m src.benchmarks.search_benchmark --sizes 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import select, text
+
+from src.app.build_db import DEFAULT_ASYNC_SESSION_FACTORY, async_engine, engine
+from src.app.config import settings
+from src.app.orm.mcq_orm import mcq, start_mappers
+from src.app.services.mcq_services import MCQService
+from src.benchmarks.scratch import (
+    WORDS, create_scratch_category, drop_scratch_category, generate_questions, grow_category
+)
+
+
+def build_queries(rng: random.Random, count: int) -> list[str]:
+    """
+    A mix of one-word, two-word and quoted two-word phrase queries over the generated vocabulary.
+    """
+    queries = []
+    for n in range(count):
+        words = rng.sample(WORDS, 2)
+        queries.append([words[0], " ".join(words), f'"{" ".join(words)}"'][n % 3])
+    return queries
+
+
+def substring_scan(category_id: int, query: str) -> int:
+    # every match is needed to rank them, so the scan cannot stop at the first few
+    word = query.strip('"').split()[0]
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(mcq.c.id).where(mcq.c.category == category_id, mcq.c.question.ilike(f"%{word}%"))
+        ).all()
+    return len(rows)
+
+
+async def search(query: str, category_id: int, fuzzy: bool) -> int:
+    async with DEFAULT_ASYNC_SESSION_FACTORY() as session:
+        results = await MCQService(session).search_mcqs(query, category_id, settings.SEARCH_DEFAULT_RESULTS, fuzzy)
+    return len(results)
+
+
+def percentile(samples: list[float], share: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+async def measure(category_id: int, size: int, args, rng: random.Random):
+    queries = build_queries(rng, args.queries)
+
+    scan_ms = []
+    for query in queries[:args.scan_queries]:
+        started = time.perf_counter()
+        substring_scan(category_id, query)
+        scan_ms.append((time.perf_counter() - started) * 1000)
+
+    timings = {}
+    for fuzzy in (False, True):
+        samples = []
+        for query in queries:
+            started = time.perf_counter()
+            await search(query, category_id, fuzzy)
+            samples.append((time.perf_counter() - started) * 1000)
+        timings[fuzzy] = samples
+
+    print(f"{size:>9} {statistics.median(scan_ms):>10.1f} "
+          f"{statistics.median(timings[False]):>10.1f} {percentile(timings[False], 0.95):>10.1f} "
+          f"{statistics.median(timings[True]):>10.1f} {percentile(timings[True], 0.95):>10.1f}")
+
+
+async def main(args):
+    start_mappers()
+    rng = random.Random(args.seed)
+    with engine.connect() as conn:
+        trigram = conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is not None
+    print(f"pg_trgm installed: {trigram}")
+
+    user_id, category_id = create_scratch_category(args.role_id)
+    try:
+        print(f"{'bank':>9} {'scan p50':>10} {'fts p50':>10} {'fts p95':>10} {'fuzzy p50':>10} {'fuzzy p95':>10}")
+        current = 0
+        for size in sorted(args.sizes):
+            grow_category(category_id, user_id, current, size,
+                          question_factory=lambda start, count: generate_questions(rng, count, start))
+            current = size
+            with engine.begin() as conn:
+                conn.execute(text("ANALYZE mcq"))
+            await measure(category_id, size, args, rng)
+    finally:
+        drop_scratch_category(category_id, user_id)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark MCQ search.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=60)
+    parser.add_argument("--scan-queries", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--role-id", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
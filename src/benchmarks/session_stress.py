@@ -0,0 +1,95 @@
+"""
+Concurrency stress check for request-scoped sessions.
+
+Fires concurrent authenticated and anonymous requests at the app through `TestClient` and
+verifies that:
+
+* every response belongs to the request that asked for it (no state shared across requests), and
+* each request checks out at most one pooled connection, auth lookup included.
+
+Usage
+-----
+    python -m src.benchmarks.session_stress --user-ids 2 3 4 --workers 32 --rounds 20
+
+The users must exist and should be non-admin, so that `/quiz/attempts` is scoped to them.
+Exits with a non-zero status when a check fails.
+"""
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from src.app.build_db import DEFAULT_SESSION_FACTORY, async_engine, engine
+from src.app.entities.user import User
+from src.app.services.user_services import UserService
+from src.tests.integration.utils import client
+
+
+def build_tokens(user_ids: list[int]) -> dict[int, str]:
+    with DEFAULT_SESSION_FACTORY() as session:
+        users = session.query(User).filter(User.id.in_(user_ids)).all()
+        return {user.id: UserService.generate_jwt_token(user) for user in users}
+
+
+def check_attempts(user_id: int, token: str) -> list[str]:
+    response = client.get("/quiz/attempts", headers={"Authorization": f"Bearer {token}"})
+    if response.status_code != 200:
+        return [f"/quiz/attempts for user {user_id} returned {response.status_code}"]
+    leaked = [a["attempt_id"] for a in response.json() if a["user_id"] != user_id]
+    return [f"user {user_id} received attempts {leaked} of other users"] if leaked else []
+
+
+def check_category(category_id: int) -> list[str]:
+    response = client.get(f"/category/{category_id}")
+    if response.status_code != 200:
+        return [f"/category/{category_id} returned {response.status_code}"]
+    if response.json()["id"] != category_id:
+        return [f"/category/{category_id} returned category {response.json()['id']}"]
+    return []
+
+
+def main(args) -> int:
+    tokens = build_tokens(args.user_ids)
+    missing = set(args.user_ids) - set(tokens)
+    if missing:
+        print(f"Unknown user ids: {sorted(missing)}")
+        return 2
+
+    with client:
+        category_ids = [category["id"] for category in client.get("/category").json()]
+
+        async_before = async_engine.sync_engine.pool.stats.checkouts
+        sync_before = engine.pool.stats.checkouts
+
+        jobs = []
+        for _ in range(args.rounds):
+            jobs += [(check_attempts, (user_id, token)) for user_id, token in tokens.items()]
+            jobs += [(check_category, (category_id,)) for category_id in category_ids]
+
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(lambda job: job[0](*job[1]), jobs))
+
+        async_checkouts = async_engine.sync_engine.pool.stats.checkouts - async_before
+        sync_checkouts = engine.pool.stats.checkouts - sync_before
+
+    failures = [failure for result in results for failure in result]
+    checkouts = async_checkouts + sync_checkouts
+    per_request = checkouts / len(jobs)
+
+    print(f"{len(jobs)} requests on {args.workers} workers")
+    print(f"pool checkouts: {checkouts} (async {async_checkouts}, sync {sync_checkouts}), "
+          f"{per_request:.2f} per request")
+    for failure in failures:
+        print("FAIL:", failure)
+
+    if per_request > 1:
+        print("FAIL: more than one pooled connection per request")
+        return 1
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress request-scoped sessions for cross-request bleed.")
+    parser.add_argument("--user-ids", type=int, nargs="+", required=True)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=20)
+    sys.exit(main(parser.parse_args()))
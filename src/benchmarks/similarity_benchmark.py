@@ -0,0 +1,126 @@
+"""
+Benchmark of near-duplicate question lookup against growing question banks.
+
+Fills a scratch category with generated questions (a share of them paraphrases of earlier ones),
+then compares a brute-force scan (every question of the bank compared with the probe) with the
+LSH index behind `/mcq/similar`, and times the cluster report of the scratch bank. The scratch
+user, category and MCQs are removed afterwards.
+
+Usage
+-----
+    python -m src.benchmarks.similarity_benchmark --sizes 10000 100000 500000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime
+
+from sqlalchemy import insert, select
+
+from src.app.build_db import DEFAULT_ASYNC_SESSION_FACTORY, async_engine, engine
+from src.app.common.similarity import jaccard_similarity, question_lsh_buckets_many, question_shingles
+from src.app.config import settings
+from src.app.orm.mcq_orm import mcq, start_mappers
+from src.app.services.mcq_services import MCQService
+from src.app.services.unit_of_work import MCQUnitOfWork
+from src.benchmarks.scratch import BATCH_SIZE, create_scratch_category, drop_scratch_category, generate_questions
+
+
+def grow_bank(rng: random.Random, category_id: int, user_id: int, current: int, target: int,
+              paraphrase_share: float):
+    with engine.begin() as conn:
+        for start in range(current, target, BATCH_SIZE):
+            questions = generate_questions(rng, min(BATCH_SIZE, target - start), start, paraphrase_share)
+            conn.execute(insert(mcq), [{
+                "question": question,
+                "options": ["a", "b"],
+                "correct_option": ["a"],
+                "category": category_id,
+                "created_by": user_id,
+                "created_date": datetime.now(),
+                "lsh_buckets": buckets,
+            } for question, buckets in zip(questions, question_lsh_buckets_many(questions))])
+
+
+def brute_force(category_id: int, probe: str) -> list[int]:
+    shingles = question_shingles(probe)
+    with engine.connect() as conn:
+        rows = conn.execute(select(mcq.c.id, mcq.c.question).where(mcq.c.category == category_id))
+        return [row.id for row in rows
+                if jaccard_similarity(shingles, question_shingles(row.question)) >= settings.SIMILARITY_THRESHOLD]
+
+
+async def lsh_lookup(probe: str) -> list[int]:
+    async with DEFAULT_ASYNC_SESSION_FACTORY() as session:
+        similar = await MCQService(session).get_similar_questions(probe, settings.SIMILARITY_THRESHOLD, 100)
+    return [item["id"] for item in similar]
+
+
+def sample_probes(category_id: int, count: int, rng: random.Random) -> list[str]:
+    with engine.connect() as conn:
+        questions = conn.execute(
+            select(mcq.c.question).where(mcq.c.category == category_id).order_by(mcq.c.id.desc()).limit(5000)
+        ).scalars().all()
+    probes = rng.sample(questions, min(count, len(questions)))
+    # probe with paraphrases, as a user would type them
+    return [probe.replace("?", " ?").replace("!", "") for probe in probes]
+
+
+async def measure(category_id: int, size: int, args, rng: random.Random):
+    probes = sample_probes(category_id, args.probes, rng)
+
+    lsh_ms, recall = [], []
+    for probe in probes:
+        started = time.perf_counter()
+        found = set(await lsh_lookup(probe))
+        lsh_ms.append((time.perf_counter() - started) * 1000)
+        if size <= args.brute_force_max:
+            expected = set(brute_force(category_id, probe))
+            # the LSH lookup searches the whole bank and may find matches outside the scratch category
+            recall.append(len(found & expected) / len(expected) if expected else 1.0)
+
+    brute_ms = None
+    if size <= args.brute_force_max:
+        started = time.perf_counter()
+        for probe in probes[:3]:
+            brute_force(category_id, probe)
+        brute_ms = (time.perf_counter() - started) * 1000 / min(3, len(probes))
+
+    started = time.perf_counter()
+    clusters = MCQService.near_duplicate_clusters(MCQUnitOfWork(), settings.SIMILARITY_THRESHOLD)
+    report_s = time.perf_counter() - started
+
+    brute = f"{brute_ms:>10.1f}" if brute_ms is not None else f"{'skipped':>10}"
+    recall_text = f"{statistics.mean(recall):.3f}" if recall else "-"
+    print(f"{size:>9} {brute} {statistics.median(lsh_ms):>10.1f} {max(lsh_ms):>10.1f} {recall_text:>7} "
+          f"{report_s:>9.1f} {len(clusters):>9}")
+
+
+async def main(args):
+    start_mappers()
+    rng = random.Random(args.seed)
+    user_id, category_id = create_scratch_category(args.role_id)
+    try:
+        print(f"{'bank':>9} {'brute ms':>10} {'lsh p50':>10} {'lsh max':>10} {'recall':>7} "
+              f"{'report s':>9} {'clusters':>9}")
+        current = 0
+        for size in sorted(args.sizes):
+            grow_bank(rng, category_id, user_id, current, size, args.paraphrase_share)
+            current = size
+            await measure(category_id, size, args, rng)
+    finally:
+        drop_scratch_category(category_id, user_id)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate question lookup.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--probes", type=int, default=50)
+    parser.add_argument("--paraphrase-share", type=float, default=0.05)
+    parser.add_argument("--brute-force-max", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--role-id", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
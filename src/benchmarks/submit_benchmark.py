@@ -0,0 +1,100 @@
+"""
+Benchmark of the write path of `/quiz/submit`.
+
+Replays the database work of a submission (insert the quiz attempt, insert one
+`attempt_questions` row per answer, commit) with the previous per-object ORM adds and with
+`AsyncAttemptQuestionRepository.add_many`, and reports submissions per second for each answer
+count. A scratch user, category and MCQs are created for the run and removed afterwards.
+
+Usage
+-----
+    python -m src.benchmarks.submit_benchmark --answers 25 100 --submissions 200
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from datetime import datetime
+
+from sqlalchemy import select
+
+from src.app.build_db import DEFAULT_ASYNC_SESSION_FACTORY, async_engine
+from src.app.entities.quiz_attempt import QuizAttempt
+from src.app.entities.quiz_attempt_questions import AttemptQuestion
+from src.app.orm.mcq_orm import mcq, start_mappers
+from src.app.repositories.quiz_attempt_question_repository import AsyncAttemptQuestionRepository
+from src.benchmarks.scratch import create_scratch_category, drop_scratch_category, grow_category
+
+# attempt ids well above what generate_unique_attempt_id hands out, so runs never collide with real quizzes
+ATTEMPT_IDS = itertools.count(2_000_000_000 - random.randrange(10_000_000))
+
+
+def build_answers(question_ids: list[int], count: int) -> list[dict]:
+    return [{
+        "question_id": question_id,
+        "attempted_answer": f"option {question_id}-{random.randrange(4)}",
+        "is_correct": random.random() < 0.5,
+    } for question_id in random.sample(question_ids, count)]
+
+
+async def submit_per_object(session, attempt: QuizAttempt, answers: list[dict]):
+    session.add(attempt)
+    await session.flush()
+    for answer in answers:
+        session.add(AttemptQuestion(attempt_id=attempt.attempt_id, **answer))
+    await session.commit()
+
+
+async def submit_bulk(session, attempt: QuizAttempt, answers: list[dict]):
+    session.add(attempt)
+    await session.flush()
+    await AsyncAttemptQuestionRepository(session).add_many(
+        [{"attempt_id": attempt.attempt_id, **answer} for answer in answers])
+    await session.commit()
+
+
+async def submissions_per_second(submit, user_id: int, category_id: int, question_ids: list[int],
+                                 answer_count: int, submissions: int) -> float:
+    payloads = [build_answers(question_ids, answer_count) for _ in range(submissions)]
+    started = time.perf_counter()
+    for answers in payloads:
+        attempt = QuizAttempt(
+            user_id=user_id, attempt_id=next(ATTEMPT_IDS), category_id=category_id,
+            total_questions=answer_count, questions_attempted=answer_count, questions_unattempted=0,
+            correct_answers=0, score=0, created_date=datetime.now(),
+        )
+        async with DEFAULT_ASYNC_SESSION_FACTORY() as session:
+            await submit(session, attempt, answers)
+    return submissions / (time.perf_counter() - started)
+
+
+async def main(args):
+    start_mappers()
+    user_id, category_id = create_scratch_category(args.role_id)
+    try:
+        grow_category(category_id, user_id, 0, max(args.answers))
+        async with DEFAULT_ASYNC_SESSION_FACTORY() as session:
+            question_ids = list((await session.execute(
+                select(mcq.c.id).where(mcq.c.category == category_id))).scalars())
+
+        print(f"{'answers':>8}{'per-object subs/s':>20}{'add_many subs/s':>18}{'speedup':>10}")
+        for answer_count in sorted(args.answers):
+            # warm up the pool and statement caches before timing
+            await submissions_per_second(submit_bulk, user_id, category_id, question_ids, answer_count, 5)
+            per_object = await submissions_per_second(submit_per_object, user_id, category_id, question_ids,
+                                                      answer_count, args.submissions)
+            bulk = await submissions_per_second(submit_bulk, user_id, category_id, question_ids,
+                                                answer_count, args.submissions)
+            print(f"{answer_count:>8}{per_object:>20.1f}{bulk:>18.1f}{bulk / per_object:>9.2f}x")
+    finally:
+        drop_scratch_category(category_id, user_id)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark quiz submission inserts by answer count.")
+    parser.add_argument("--answers", type=int, nargs="+", default=[25, 100])
+    parser.add_argument("--submissions", type=int, default=200)
+    parser.add_argument("--role-id", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,69 @@
+"""
+User onboarding benchmark for a running MCQ App server: registers `--users` users one `/register`
+call at a time, then imports the same number through `/users/bulk-import`, and reports users/sec
+for both. The users created by the run are deleted afterwards.
+
+Usage
+-----
+Start the server (e.g. `python -m uvicorn src.app.app_definition:mcq_app --port 8001`) and run:
+
+    python -m src.benchmarks.user_import_benchmark --base-url http://localhost:8001 \\
+        --email admin@example.com --password secret --users 200
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+from sqlalchemy import delete
+
+from src.app.build_db import engine
+from src.app.orm.mcq_orm import user
+from src.benchmarks.concurrency_benchmark import login
+
+
+def user_fields(tag: str, prefix: str, n: int) -> dict:
+    return {"first_name": "import", "last_name": tag, "email": f"{prefix}-{tag}-{n}@example.com",
+            "password": f"password-{n}", "role": 2}
+
+
+async def main(args):
+    tag = uuid.uuid4().hex[:8]
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=3600) as client:
+        headers = {"Authorization": f"Bearer {await login(client, args.email, args.password)}"}
+        try:
+            started = time.perf_counter()
+            for n in range(args.users):
+                response = await client.post("/register", json=user_fields(tag, "register", n))
+                response.raise_for_status()
+            register_seconds = time.perf_counter() - started
+
+            rows = [user_fields(tag, "import", n) for n in range(args.users)]
+            body = "first_name,last_name,email,password,role\n" + "".join(
+                f"{row['first_name']},{row['last_name']},{row['email']},{row['password']},{row['role']}\n"
+                for row in rows
+            )
+            started = time.perf_counter()
+            response = await client.post("/users/bulk-import", files={"file": ("users.csv", body, "text/csv")},
+                                         headers=headers)
+            response.raise_for_status()
+            import_seconds = time.perf_counter() - started
+            result = response.json()
+        finally:
+            with engine.begin() as conn:
+                conn.execute(delete(user).where(user.c.last_name == tag))
+
+    print(f"/register loop:      {args.users} users in {register_seconds:>7.2f} s "
+          f"({args.users / register_seconds:>7.1f} users/s)")
+    print(f"/users/bulk-import:  {result['created_count']} users in {import_seconds:>7.2f} s "
+          f"({result['created_count'] / import_seconds:>7.1f} users/s, server-side {result['users_per_second']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare /register one by one with /users/bulk-import.")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--users", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,335 @@
+"""
+Generate a reproducible synthetic dataset for scale testing: categories, MCQs, users, and quiz
+attempts with their answers, built from the entity classes and written straight into the ORM
+tables (COPY on PostgreSQL, batched multi-row inserts elsewhere).
+
+The same `--seed` and settings always produce the same dataset (the salt of the users' shared
+password hash aside). Ids are reserved up front (from the tables' sequences and the attempt id
+sequence on PostgreSQL), so the data can be loaded next to existing rows and the app keeps handing
+out fresh ids afterwards.
+
+Distributions
+-------------
+- `--category-skew`: MCQs per category follow a Zipf law with this exponent (0 spreads them
+  evenly); attempts pick categories in proportion to their MCQs, so large categories are also the
+  most played.
+- `--accuracy`: mean share of correct answers. Every user gets an ability drawn from a Beta
+  distribution with this mean; `--accuracy-concentration` controls how alike users are (higher is
+  more alike).
+- `--answered`: share of the served questions a user answers; the rest count as unattempted.
+- `--paraphrase-share`: share of MCQs that are near-duplicates of an earlier one.
+
+Every generated user and category carries the dataset `--tag`; `--drop` removes the dataset with
+that tag again.
+
+Usage
+-----
+    python -m src.jobs.generate_dataset --seed 1 --categories 200 --mcqs 1000000 --users 100000 --attempts 1000000
+    python -m src.jobs.generate_dataset --seed 1 --drop
+"""
+import argparse
+import dataclasses
+import itertools
+import random
+import sys
+import time
+from bisect import bisect
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, text
+
+from src.app.build_db import IS_SQLITE, create_sqlite_schema, engine
+from src.app.common.constants import ATTEMPT_ID_SEQUENCE, ATTEMPT_ID_SEQUENCE_BLOCK
+from src.app.common.similarity import question_lsh_buckets_many
+from src.app.common.utils import hash_password
+from src.app.entities.category import Category
+from src.app.entities.mcq import MCQ, build_mcq_fingerprint
+from src.app.entities.quiz_attempt import QuizAttempt
+from src.app.entities.quiz_attempt_questions import AttemptQuestion
+from src.app.entities.user import User
+from src.app.orm.mcq_orm import (
+    attempt_questions, categories, mcq, quiz_attempts, quiz_sessions, refresh_tokens, role, user
+)
+from src.app.repositories.mcq_staging_repository import CopyReader
+from src.benchmarks.scratch import generate_questions
+
+OPTIONS_PER_MCQ = 4
+MARKS_PER_CORRECT_ANSWER = 4  # as scored by QuizService.submit_quiz
+
+
+def entity_columns(entity_class, exclude: tuple = ()) -> tuple:
+    return tuple(field.name for field in dataclasses.fields(entity_class) if field.name not in exclude)
+
+
+def zipf_counts(total: int, buckets: int, skew: float) -> list[int]:
+    """
+    Split `total` over `buckets` in proportion to 1 / rank ** skew (largest remainders round up).
+    """
+    weights = [1 / rank ** skew for rank in range(1, buckets + 1)]
+    shares = [total * weight / sum(weights) for weight in weights]
+    counts = [int(share) for share in shares]
+    by_remainder = sorted(range(buckets), key=lambda k: counts[k] - shares[k])
+    for k in by_remainder[:total - sum(counts)]:
+        counts[k] += 1
+    return counts
+
+
+def mcq_options(n: int) -> list[str]:
+    # the first option of every generated MCQ is the correct one
+    return [f"option {n}-{k}" for k in range(OPTIONS_PER_MCQ)]
+
+
+def reserve_ids(conn, table, count: int) -> int:
+    """
+    Reserve `count` consecutive ids of `table` and return the first one.
+    """
+    if conn.dialect.name == "postgresql":
+        sequence = conn.execute(select(func.pg_get_serial_sequence(table.name, "id"))).scalar_one()
+        first = conn.execute(select(func.nextval(sequence))).scalar_one()
+        if count > 1:
+            conn.execute(select(func.setval(sequence, first + count - 1)))
+        return first
+    return conn.execute(select(func.coalesce(func.max(table.c.id), 0) + 1)).scalar_one()
+
+
+def reserve_attempt_ids(conn, count: int) -> int:
+    """
+    Reserve `count` consecutive attempt ids and return the first one. On PostgreSQL the ids are
+    taken from the attempt id sequence in whole blocks, as SequenceAttemptIdGenerator does.
+    """
+    if conn.dialect.name == "postgresql":
+        first = conn.execute(text(f"SELECT nextval('{ATTEMPT_ID_SEQUENCE}')")).scalar_one()
+        blocks = -(-count // ATTEMPT_ID_SEQUENCE_BLOCK)
+        if blocks > 1:
+            conn.execute(text(f"SELECT setval('{ATTEMPT_ID_SEQUENCE}', :last)"),
+                         {"last": first + (blocks - 1) * ATTEMPT_ID_SEQUENCE_BLOCK})
+        return first
+    return conn.execute(select(func.coalesce(func.max(quiz_attempts.c.attempt_id), 0) + 1)).scalar_one()
+
+
+def load(conn, table, columns: tuple, rows, batch_size: int) -> int:
+    """
+    Write an iterable of row dicts into `table`: one streamed COPY on PostgreSQL, batched inserts
+    elsewhere. Returns the number of rows written.
+    """
+    written = 0
+    rows = iter(rows)
+    if conn.dialect.name == "postgresql":
+        def counted():
+            nonlocal written
+            for row in rows:
+                written += 1
+                yield row
+
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                               CopyReader(counted(), columns))
+        finally:
+            cursor.close()
+        return written
+
+    while batch := list(itertools.islice(rows, batch_size)):
+        conn.execute(insert(table), batch)
+        written += len(batch)
+    return written
+
+
+class DatasetGenerator:
+    """
+    Generates the rows of one dataset. All randomness comes from a single generator seeded with
+    `args.seed` and is consumed in a fixed order, which makes the dataset reproducible.
+    """
+    def __init__(self, args, admin_role_id: int, user_role_id: int):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.admin_role_id = admin_role_id
+        self.user_role_id = user_role_id
+        self.end = datetime.fromisoformat(args.end_date)
+        self.start = self.end - timedelta(days=args.days)
+        self.password = hash_password(args.password)
+        self.mcq_counts = zipf_counts(args.mcqs, args.categories, args.category_skew)
+        # generated MCQs are numbered category by category: category k holds numbers [ends[k - 1], ends[k])
+        self.mcq_ends = list(itertools.accumulate(self.mcq_counts))
+        alpha = args.accuracy * args.accuracy_concentration
+        beta = (1 - args.accuracy) * args.accuracy_concentration
+        self.abilities = [self.rng.betavariate(alpha, beta) for _ in range(args.users)]
+        self.user_dates = [self.random_date(self.start) for _ in range(args.users)]
+
+    def random_date(self, after: datetime) -> datetime:
+        return after + (self.end - after) * self.rng.random()
+
+    def users(self, first_id: int):
+        # the first user is the admin who authors the generated categories and MCQs
+        for n in range(self.args.users):
+            yield vars(User(
+                id=first_id + n, first_name="Generated", last_name=self.args.tag,
+                email=f"{self.args.tag}-user-{n}@example.com", password=self.password,
+                role=self.admin_role_id if n == 0 else self.user_role_id, created_date=self.user_dates[n],
+            ))
+
+    def categories(self, first_id: int, admin_id: int):
+        for k in range(self.args.categories):
+            yield vars(Category(id=first_id + k, name=f"{self.args.tag}-category-{k}", created_by=admin_id,
+                                created_date=self.start))
+
+    def mcqs(self, first_id: int, first_category_id: int, admin_id: int):
+        n = 0
+        for k, count in enumerate(self.mcq_counts):
+            for start in range(0, count, self.args.batch_size):
+                questions = generate_questions(self.rng, min(self.args.batch_size, count - start), n,
+                                               self.args.paraphrase_share)
+                buckets = question_lsh_buckets_many(questions) if not self.args.no_lsh else [None] * len(questions)
+                for question, lsh_buckets in zip(questions, buckets):
+                    options = mcq_options(n)
+                    yield vars(MCQ(
+                        id=first_id + n, question=question, options=options, correct_option=options[:1],
+                        category=first_category_id + k, created_by=admin_id, created_date=self.random_date(self.start),
+                        fingerprint=build_mcq_fingerprint(question, options), lsh_buckets=lsh_buckets,
+                    ))
+                    n += 1
+
+    def attempts(self, first_attempt_id: int, first_user_id: int, first_mcq_id: int, first_category_id: int):
+        """
+        Yields (quiz attempt, its answers) for every attempt.
+        """
+        for attempt_id in range(first_attempt_id, first_attempt_id + self.args.attempts):
+            # categories are picked in proportion to their MCQs, players uniformly among the non-admin users
+            k = bisect(self.mcq_ends, self.rng.random() * self.mcq_ends[-1])
+            n = self.rng.randrange(1, self.args.users) if self.args.users > 1 else 0
+            served = self.rng.sample(range(self.mcq_ends[k] - self.mcq_counts[k], self.mcq_ends[k]),
+                                     min(self.args.questions_per_attempt, self.mcq_counts[k]))
+            answers = []
+            for question in served:
+                if self.rng.random() >= self.args.answered:
+                    continue
+                is_correct = self.rng.random() < self.abilities[n]
+                options = mcq_options(question)
+                answers.append(vars(AttemptQuestion(
+                    attempt_id=attempt_id, question_id=first_mcq_id + question,
+                    attempted_answer=options[0] if is_correct else options[self.rng.randrange(1, OPTIONS_PER_MCQ)],
+                    is_correct=is_correct,
+                )))
+            correct = sum(answer["is_correct"] for answer in answers)
+            yield vars(QuizAttempt(
+                user_id=first_user_id + n, attempt_id=attempt_id, category_id=first_category_id + k,
+                total_questions=len(served), questions_attempted=len(answers),
+                questions_unattempted=len(served) - len(answers), correct_answers=correct,
+                score=correct * MARKS_PER_CORRECT_ANSWER, created_date=self.random_date(self.user_dates[n]),
+            )), answers
+
+
+def analyze(conn, *tables):
+    """
+    Refresh the planner statistics of freshly loaded tables (PostgreSQL only). Done inside the load
+    transaction, before the tables referring to them are loaded: the foreign key checks of those
+    loads are planned once, and with the statistics of the still empty tables they would scan the
+    referenced table for every row.
+    """
+    if conn.dialect.name == "postgresql":
+        for table in tables:
+            conn.execute(text(f"ANALYZE {table.name}"))
+
+
+def role_ids(conn) -> tuple[int, int]:
+    roles = dict(conn.execute(select(role.c.role_name, role.c.id)).all())
+    if "admin" not in roles or "user" not in roles:
+        raise RuntimeError("The roles table needs the 'admin' and 'user' roles")
+    return roles["admin"], roles["user"]
+
+
+def generate(args) -> int:
+    started = time.perf_counter()
+
+    def report(table, rows):
+        print(f"{table:<18} {rows:>11,} rows  ({time.perf_counter() - started:.1f}s)")
+
+    with engine.begin() as conn:
+        if conn.execute(select(categories.c.id).where(categories.c.name == f"{args.tag}-category-0")).first():
+            print(f"A dataset tagged {args.tag!r} exists already, remove it with --drop first")
+            return 1
+        generator = DatasetGenerator(args, *role_ids(conn))
+
+        first_user_id = reserve_ids(conn, user, args.users)
+        report("users", load(conn, user, entity_columns(User), generator.users(first_user_id), args.batch_size))
+        first_category_id = reserve_ids(conn, categories, args.categories)
+        report("categories", load(conn, categories, entity_columns(Category),
+                                  generator.categories(first_category_id, first_user_id), args.batch_size))
+        first_mcq_id = reserve_ids(conn, mcq, args.mcqs)
+        report("mcq", load(conn, mcq, entity_columns(MCQ),
+                           generator.mcqs(first_mcq_id, first_category_id, first_user_id), args.batch_size))
+        analyze(conn, user, categories, mcq)
+
+        # attempts and answers are generated twice from the same random state, so that every attempt
+        # is loaded (and analyzed) before the answers referring to it, without holding them in memory
+        first_attempt_id = reserve_attempt_ids(conn, args.attempts)
+        state = generator.rng.getstate()
+        attempts = generator.attempts(first_attempt_id, first_user_id, first_mcq_id, first_category_id)
+        report("quiz_attempts", load(conn, quiz_attempts, entity_columns(QuizAttempt, exclude=("id",)),
+                                     (attempt for attempt, _ in attempts), args.batch_size))
+        analyze(conn, quiz_attempts)
+        generator.rng.setstate(state)
+        attempts = generator.attempts(first_attempt_id, first_user_id, first_mcq_id, first_category_id)
+        report("attempt_questions", load(conn, attempt_questions, entity_columns(AttemptQuestion, exclude=("id",)),
+                                         (answer for _, answers in attempts for answer in answers), args.batch_size))
+        analyze(conn, attempt_questions)
+
+    print(f"dataset {args.tag!r} generated in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+def drop(args):
+    """
+    Remove the dataset tagged `args.tag`, including anything done with its users since.
+    """
+    users = select(user.c.id).where(user.c.email.like(f"{args.tag}-user-%@example.com"),
+                                    user.c.last_name == args.tag)
+    tagged_categories = select(categories.c.id).where(categories.c.name.like(f"{args.tag}-category-%"),
+                                                      categories.c.created_by.in_(users))
+    with engine.begin() as conn:
+        category_ids = conn.execute(tagged_categories).scalars().all()
+        attempt_ids = select(quiz_attempts.c.attempt_id).where(
+            quiz_attempts.c.user_id.in_(users) | quiz_attempts.c.category_id.in_(category_ids))
+        conn.execute(delete(attempt_questions).where(attempt_questions.c.attempt_id.in_(attempt_ids)))
+        conn.execute(delete(quiz_attempts).where(quiz_attempts.c.attempt_id.in_(attempt_ids)))
+        conn.execute(delete(quiz_sessions).where(
+            quiz_sessions.c.user_id.in_(users) | quiz_sessions.c.category_id.in_(category_ids)))
+        conn.execute(delete(refresh_tokens).where(refresh_tokens.c.user_id.in_(users)))
+        mcqs = conn.execute(delete(mcq).where(mcq.c.category.in_(category_ids))).rowcount
+        conn.execute(delete(categories).where(categories.c.id.in_(category_ids)))
+        users_deleted = conn.execute(delete(user).where(user.c.id.in_(users))).rowcount
+    print(f"dataset {args.tag!r} removed: {users_deleted} users, {len(category_ids)} categories, {mcqs} MCQs")
+
+
+def main(args) -> int:
+    args.tag = args.tag or f"gen{args.seed}"
+    if IS_SQLITE:
+        # a SQLite file gets its schema here, as the app creates it on startup
+        create_sqlite_schema()
+    if args.drop:
+        drop(args)
+        return 0
+    return generate(args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a reproducible synthetic dataset for scale testing.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tag", default=None, help="dataset name, gen<seed> by default")
+    parser.add_argument("--categories", type=int, default=200)
+    parser.add_argument("--mcqs", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--attempts", type=int, default=1_000_000)
+    parser.add_argument("--questions-per-attempt", type=int, default=25)
+    parser.add_argument("--category-skew", type=float, default=1.0)
+    parser.add_argument("--accuracy", type=float, default=0.6)
+    parser.add_argument("--accuracy-concentration", type=float, default=5.0)
+    parser.add_argument("--answered", type=float, default=0.9)
+    parser.add_argument("--paraphrase-share", type=float, default=0.02)
+    parser.add_argument("--no-lsh", action="store_true", help="leave the similarity buckets of the MCQs empty")
+    parser.add_argument("--password", default="password", help="password of every generated user")
+    parser.add_argument("--days", type=int, default=365, help="time span of the generated dates")
+    parser.add_argument("--end-date", default="2026-01-01", help="the generated dates end here")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--drop", action="store_true", help="remove the dataset tagged --tag instead")
+    sys.exit(main(parser.parse_args()))
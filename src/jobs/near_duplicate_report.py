@@ -0,0 +1,49 @@
+"""
+Report clusters of near-duplicate questions across the whole MCQ bank.
+
+Candidates come from the LSH buckets stored with every MCQ (`mcq.lsh_buckets`), so only questions
+sharing a bucket are compared instead of every pair in the bank. Prints a summary and the largest
+clusters, and optionally writes the full report as JSON.
+
+Usage
+-----
+    python -m src.jobs.near_duplicate_report --threshold 0.7 --top 20 --output near_duplicates.json
+"""
+import argparse
+import json
+import sys
+import time
+
+from src.app.config import settings
+from src.app.orm.mcq_orm import start_mappers
+from src.app.services.mcq_services import MCQService
+from src.app.services.unit_of_work import MCQUnitOfWork
+
+
+def main(args) -> int:
+    start_mappers()
+    started = time.perf_counter()
+    clusters = MCQService.near_duplicate_clusters(MCQUnitOfWork(), threshold=args.threshold)
+    elapsed = time.perf_counter() - started
+
+    clustered = sum(cluster["size"] for cluster in clusters)
+    print(f"{len(clusters)} near-duplicate clusters covering {clustered} MCQs "
+          f"(threshold {args.threshold}, {elapsed:.1f}s)")
+    for cluster in clusters[:args.top]:
+        print(f"- {cluster['size']} MCQs")
+        for mcq in cluster["mcqs"]:
+            print(f"    #{mcq['id']} (category {mcq['category']}): {mcq['question']}")
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump({"threshold": args.threshold, "clusters": clusters}, handle, indent=2)
+        print(f"report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report clusters of near-duplicate MCQs.")
+    parser.add_argument("--threshold", type=float, default=settings.SIMILARITY_THRESHOLD)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", default=None)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,96 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import OperationalError
+
+from src.app.build_db import IS_SQLITE, create_sqlite_schema, engine
+from src.app.common.utils import hash_password
+from src.app.entities.user import User
+from src.app.orm.mcq_orm import attempt_questions, quiz_attempts, quiz_sessions, refresh_tokens, role, user
+from src.app.services.user_services import UserService
+from src.benchmarks.scratch import create_scratch_category, drop_scratch_category, grow_category
+from src.tests.integration.utils import client
+
+ADMIN_ROLE = "admin"
+USER_ROLE = "user"
+
+
+@pytest.fixture(scope="session")
+def database():
+    """
+    The configured database (see DATABASE_URL / DB_*); the integration tests are skipped when it
+    cannot be reached. A SQLite database gets its schema here, as the app only creates it on startup.
+    """
+    try:
+        with engine.connect() as conn:
+            conn.execute(select(1))
+    except OperationalError as e:
+        pytest.skip(f"database not available: {e.orig}")
+    if IS_SQLITE:
+        create_sqlite_schema()
+    return engine
+
+
+@pytest.fixture
+def app_client(database):
+    """
+    The integration test client, with the app's startup and shutdown run around the test.
+    """
+    with client:
+        yield client
+
+
+@pytest.fixture
+def make_user(database):
+    """
+    Factory creating users with the given role name (and password, if given); returns the User and
+    a bearer token. The users and everything they did are removed after the test.
+    """
+    user_ids = []
+
+    def create(role_name: str = USER_ROLE, password: str = "-") -> tuple[User, str]:
+        tag = uuid.uuid4().hex[:8]
+        with engine.begin() as conn:
+            role_id = conn.execute(select(role.c.id).where(role.c.role_name == role_name)).scalar_one()
+            row = conn.execute(insert(user).returning(*user.c), {
+                "first_name": "test", "last_name": tag, "email": f"test-{tag}@example.com",
+                "password": hash_password(password) if password != "-" else password,
+                "role": role_id, "created_date": datetime.now(),
+            }).one()
+        created = User(**row._mapping)
+        user_ids.append(created.id)
+        return created, UserService.generate_jwt_token(created)
+
+    yield create
+
+    with engine.begin() as conn:
+        attempt_ids = select(quiz_attempts.c.attempt_id).where(quiz_attempts.c.user_id.in_(user_ids))
+        conn.execute(delete(attempt_questions).where(attempt_questions.c.attempt_id.in_(attempt_ids)))
+        conn.execute(delete(quiz_attempts).where(quiz_attempts.c.user_id.in_(user_ids)))
+        conn.execute(delete(quiz_sessions).where(quiz_sessions.c.user_id.in_(user_ids)))
+        conn.execute(delete(refresh_tokens).where(refresh_tokens.c.user_id.in_(user_ids)))
+        conn.execute(delete(user).where(user.c.id.in_(user_ids)))
+
+
+@pytest.fixture
+def scratch_category(database):
+    """
+    Factory creating a category of `size` generated MCQs (owned by a scratch admin); returns
+    (admin user id, category id). Removed after the test.
+    """
+    created = []
+
+    def create(size: int = 50) -> tuple[int, int]:
+        with engine.connect() as conn:
+            admin_role_id = conn.execute(select(role.c.id).where(role.c.role_name == ADMIN_ROLE)).scalar_one()
+        user_id, category_id = create_scratch_category(admin_role_id)
+        created.append((user_id, category_id))
+        grow_category(category_id, user_id, 0, size)
+        return user_id, category_id
+
+    yield create
+
+    for user_id, category_id in created:
+        drop_scratch_category(category_id, user_id)
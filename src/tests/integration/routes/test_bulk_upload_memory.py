@@ -0,0 +1,57 @@
+import contextlib
+import csv
+import os
+import tracemalloc
+from types import SimpleNamespace
+
+from src.app.config import settings
+from src.app.services.mcq_services import MCQService
+from src.app.services.unit_of_work import MCQUnitOfWork
+
+CHUNK_ROWS = 1000
+SMALL_ROWS = 2000
+LARGE_ROWS = 4 * SMALL_ROWS
+# traced peak allowed for any file size at CHUNK_ROWS rows per chunk
+MAX_PEAK_MB = 32
+
+
+def write_csv(path: str, category_id: int, rows: int):
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["sno", "Question", "Options", "Correct_options", "Category"])
+        for n in range(rows):
+            options = [f"a{n}", f"b{n}", f"c{n}", f"d{n}"]
+            # questions are unique across categories, the duplicate check spans the whole bank
+            writer.writerow([n, f"Synthetic question {category_id}-{n} {'x' * 100}?", repr(options),
+                             repr(options[:1]), category_id])
+
+
+def upload_peak_mb(path: str, user_id: int, category_id: int, rows: int) -> float:
+    """
+    Upload a synthetic file of `rows` MCQs the way the route does and return the traced peak.
+    """
+    write_csv(path, category_id, rows)
+    tracemalloc.start()
+    try:
+        # discard (rather than buffer) the per-row prints, they would otherwise count as upload memory
+        with open(path, "rb") as handle, open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = MCQService.bulk_upload_csv(SimpleNamespace(file=handle), SimpleNamespace(id=user_id),
+                                                MCQUnitOfWork())
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert result["uploaded_count"] == rows
+    return peak / 1024 ** 2
+
+
+def test_upload_memory_does_not_grow_with_file_size(scratch_category, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_UPLOAD_CHUNK_ROWS", CHUNK_ROWS)
+    small_user_id, small_category_id = scratch_category(size=0)
+    large_user_id, large_category_id = scratch_category(size=0)
+
+    small_peak = upload_peak_mb(str(tmp_path / "small.csv"), small_user_id, small_category_id, SMALL_ROWS)
+    large_peak = upload_peak_mb(str(tmp_path / "large.csv"), large_user_id, large_category_id, LARGE_ROWS)
+
+    assert large_peak < MAX_PEAK_MB
+    # four times the rows, about the same peak: memory is bounded by the chunk size, not the file
+    assert large_peak < small_peak * 1.5, (small_peak, large_peak)
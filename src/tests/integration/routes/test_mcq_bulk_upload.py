@@ -0,0 +1,30 @@
+import io
+
+from sqlalchemy import select
+
+from src.app.build_db import engine
+from src.app.orm.mcq_orm import mcq
+
+
+def upload(app_client, token: str, content: str):
+    return app_client.post("/mcq/bulk-upload", headers={"Authorization": f"Bearer {token}"},
+                           files={"file": ("mcqs.csv", io.BytesIO(content.encode()), "text/csv")})
+
+
+def test_blank_question_is_uploaded(app_client, make_user, scratch_category):
+    _, token = make_user("admin")
+    _, category_id = scratch_category(size=0)
+    content = (
+        "sno,Question,Options,Correct_options,Category\n"
+        f"1,\"   \",\"['a', 'b']\",\"['a']\",{category_id}\n"
+        f"2,Which option is empty?,\"['', 'b']\",\"['']\",{category_id}\n"
+    )
+
+    response = upload(app_client, token, content)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["uploaded_count"] == 2
+    with engine.connect() as conn:
+        rows = conn.execute(select(mcq.c.question, mcq.c.options).where(mcq.c.category == category_id)
+                            .order_by(mcq.c.id)).all()
+    assert [tuple(row) for row in rows] == [("", ["a", "b"]), ("Which option is empty?", ["", "b"])]
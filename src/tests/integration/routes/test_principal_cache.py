@@ -0,0 +1,44 @@
+from src.app.common.utils import AUTH_COUNTERS
+
+PASSWORD = "secret-password"
+
+
+def login(app_client, email: str) -> dict:
+    response = app_client.post("/login", data={"username": email, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def user_lookups(app_client, access_token: str) -> int:
+    """
+    Make an authenticated request and return the number of database user lookups it made.
+    """
+    before = AUTH_COUNTERS["user_lookups"]
+    response = app_client.get("/quiz/attempts", headers={"Authorization": f"Bearer {access_token}"})
+    assert response.status_code == 200, response.text
+    return AUTH_COUNTERS["user_lookups"] - before
+
+
+def test_logout_drops_cached_principal(app_client, make_user):
+    created, _ = make_user(password=PASSWORD)
+    tokens = login(app_client, created.email)
+    user_lookups(app_client, tokens["access_token"])
+    assert user_lookups(app_client, tokens["access_token"]) == 0
+
+    response = app_client.post("/logout", json={"refresh_token": tokens["refresh_token"]})
+    assert response.json()["revoked_tokens"] == 1
+
+    assert user_lookups(app_client, tokens["access_token"]) == 1
+
+
+def test_refresh_token_reuse_drops_cached_principal(app_client, make_user):
+    created, _ = make_user(password=PASSWORD)
+    tokens = login(app_client, created.email)
+    user_lookups(app_client, tokens["access_token"])
+    assert user_lookups(app_client, tokens["access_token"]) == 0
+
+    assert app_client.post("/token/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 200
+    # the redeemed token again: its family is revoked
+    assert app_client.post("/token/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+    assert user_lookups(app_client, tokens["access_token"]) == 1
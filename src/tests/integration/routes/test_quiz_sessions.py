@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from src.app.build_db import engine
+from src.app.config import settings
+from src.app.orm.mcq_orm import quiz_attempts, quiz_sessions
+from src.app.repositories.quiz_session_repository import ATTEMPT_STATE_CACHE
+from src.app.services.quiz_services import delete_expired_quiz_sessions
+
+
+def add_quiz_session(attempt_id: int, user_id: int, category_id: int, age: timedelta):
+    with engine.begin() as conn:
+        conn.execute(insert(quiz_sessions), {
+            "attempt_id": attempt_id, "user_id": user_id, "category_id": category_id,
+            "question_ids": [], "created_date": datetime.now() - age,
+        })
+
+
+def quiz_session_exists(attempt_id: int) -> bool:
+    with engine.connect() as conn:
+        return conn.execute(select(quiz_sessions.c.attempt_id).where(quiz_sessions.c.attempt_id == attempt_id)).first() is not None
+
+
+def test_submit_of_expired_quiz_is_gone(app_client, make_user, scratch_category):
+    _, category_id = scratch_category(size=5)
+    created, token = make_user()
+    ttl = timedelta(seconds=settings.ATTEMPT_STATE_TTL_SECONDS)
+    add_quiz_session(-1, created.id, category_id, ttl + timedelta(minutes=1))
+    ATTEMPT_STATE_CACHE.pop(-1)
+
+    response = app_client.post("/quiz/submit", headers={"Authorization": f"Bearer {token}"},
+                               json={"attempt_id": -1, "category_id": category_id, "answers": []})
+
+    assert response.status_code == 410
+    assert not quiz_session_exists(-1)
+
+
+def test_concurrently_submitted_quiz_is_a_conflict(app_client, make_user, scratch_category):
+    _, category_id = scratch_category(size=5)
+    created, token = make_user()
+    add_quiz_session(-1, created.id, category_id, timedelta())
+    ATTEMPT_STATE_CACHE.pop(-1)
+    # the other submit recorded the attempt after this one found the quiz session
+    with engine.begin() as conn:
+        conn.execute(insert(quiz_attempts), {
+            "user_id": created.id, "attempt_id": -1, "category_id": category_id, "total_questions": 0,
+            "questions_attempted": 0, "questions_unattempted": 0, "correct_answers": 0, "score": 0,
+            "created_date": datetime.now(),
+        })
+
+    response = app_client.post("/quiz/submit", headers={"Authorization": f"Bearer {token}"},
+                               json={"attempt_id": -1, "category_id": category_id, "answers": []})
+
+    assert response.status_code == 409, response.text
+
+
+def test_cleanup_deletes_only_expired_quizzes(app_client, make_user, scratch_category):
+    _, category_id = scratch_category(size=5)
+    created, _ = make_user()
+    ttl = timedelta(seconds=settings.ATTEMPT_STATE_TTL_SECONDS)
+    add_quiz_session(-1, created.id, category_id, ttl + timedelta(minutes=1))
+    add_quiz_session(-2, created.id, category_id, ttl - timedelta(minutes=1))
+
+    # on the app's event loop, which owns the pooled async connections
+    app_client.portal.call(delete_expired_quiz_sessions)
+
+    assert not quiz_session_exists(-1)
+    assert quiz_session_exists(-2)
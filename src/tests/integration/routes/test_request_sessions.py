@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from src.app.build_db import async_engine, engine
+from src.app.config import settings
+from src.app.middlewares.request_logs import REQUEST_LOGS
+from src.app.orm.mcq_orm import quiz_attempts
+
+USERS = 4
+ATTEMPTS_PER_USER = 3
+ROUNDS = 10
+WORKERS = 16
+
+
+def total_checkouts() -> int:
+    return engine.pool.stats.checkouts + async_engine.sync_engine.pool.stats.checkouts
+
+
+def test_concurrent_requests_use_one_session_each(app_client, make_user, scratch_category, monkeypatch):
+    # keep the request log writer's own inserts out of the checkout count
+    monkeypatch.setattr(REQUEST_LOGS, "submit", lambda record: None)
+    # no cached principals, so every request looks its user up
+    monkeypatch.setattr(settings, "AUTH_PRINCIPAL_CACHE_TTL_SECONDS", 0)
+    _, category_id = scratch_category(size=5)
+
+    users = [make_user() for _ in range(USERS)]
+    expected = {}
+    with engine.begin() as conn:
+        for n, (created, _) in enumerate(users):
+            attempt_ids = [-(n * ATTEMPTS_PER_USER + k + 1) for k in range(ATTEMPTS_PER_USER)]
+            conn.execute(insert(quiz_attempts), [{
+                "user_id": created.id, "attempt_id": attempt_id, "category_id": category_id,
+                "total_questions": 0, "questions_attempted": 0, "questions_unattempted": 0,
+                "correct_answers": 0, "score": 0, "created_date": datetime.now(),
+            } for attempt_id in attempt_ids])
+            expected[created.id] = set(attempt_ids)
+
+    def list_attempts(job):
+        user_id, token = job
+        response = app_client.get("/quiz/attempts", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        return user_id, response.json()
+
+    jobs = [(created.id, token) for _ in range(ROUNDS) for created, token in users]
+    before = total_checkouts()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(list_attempts, jobs))
+    checkouts = total_checkouts() - before
+
+    for user_id, attempts in results:
+        assert {attempt["user_id"] for attempt in attempts} == {user_id}
+        assert {attempt["attempt_id"] for attempt in attempts} == expected[user_id]
+    # the user lookup of the auth dependency shares the request's session: one pooled connection
+    # per request, where a separate auth session took two
+    assert checkouts == len(jobs)
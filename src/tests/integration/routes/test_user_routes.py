@@ -0,0 +1,103 @@
+import io
+import uuid
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from src.app.build_db import engine
+from src.app.common import password_pool
+from src.app.middlewares.request_logs import REQUEST_LOGS
+from src.app.orm.mcq_orm import refresh_tokens, role, user
+from src.tests.integration.utils import client
+
+PASSWORD = "secret-password"
+
+
+@pytest.fixture
+def registration(database, monkeypatch):
+    """
+    Registration payload of a new user, removed after the test.
+    """
+    # keep the request log writer's own inserts out of the checkout counts
+    monkeypatch.setattr(REQUEST_LOGS, "submit", lambda record: None)
+    email = f"register-{uuid.uuid4().hex[:8]}@example.com"
+    with engine.connect() as conn:
+        role_id = conn.execute(select(role.c.id).where(role.c.role_name == "user")).scalar_one()
+    yield {"first_name": "test", "last_name": "register", "email": email, "password": PASSWORD, "role": role_id}
+
+    with engine.begin() as conn:
+        user_ids = select(user.c.id).where(func.lower(user.c.email) == email)
+        conn.execute(delete(refresh_tokens).where(refresh_tokens.c.user_id.in_(user_ids)))
+        conn.execute(delete(user).where(func.lower(user.c.email) == email))
+
+
+def sync_checkouts() -> int:
+    return engine.pool.stats.checkouts
+
+
+def test_register_runs_on_the_async_session(app_client, registration):
+    before = sync_checkouts()
+    response = app_client.post("/register", json=registration)
+    assert sync_checkouts() == before
+
+    assert response.status_code == 200, response.text
+    with engine.connect() as conn:
+        stored = conn.execute(select(user.c.id).where(user.c.email == registration["email"])).scalar_one()
+    assert response.json()["user_id"] == stored
+
+
+def test_register_rejects_a_taken_email(app_client, registration):
+    assert app_client.post("/register", json=registration).status_code == 200
+
+    response = app_client.post("/register", json={**registration, "email": registration["email"].upper()})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "User with this email already exists."
+
+
+def test_login_with_wrong_password_is_rejected(app_client, registration):
+    assert app_client.post("/register", json=registration).status_code == 200
+
+    response = app_client.post("/login", data={"username": registration["email"], "password": "wrong"})
+
+    assert response.status_code == 401
+
+
+def test_login_stores_the_refresh_token_on_the_async_session(app_client, registration):
+    user_id = app_client.post("/register", json=registration).json()["user_id"]
+
+    before = sync_checkouts()
+    response = app_client.post("/login", data={"username": registration["email"], "password": PASSWORD})
+    assert sync_checkouts() == before
+
+    assert response.status_code == 200, response.text
+    with engine.connect() as conn:
+        stored = conn.execute(select(func.count()).select_from(refresh_tokens)
+                              .where(refresh_tokens.c.user_id == user_id)).scalar_one()
+    assert stored == 1
+    refreshed = app_client.post("/token/refresh", json={"refresh_token": response.json()["refresh_token"]})
+    assert refreshed.status_code == 200
+
+
+def test_user_imports_share_one_hash_pool(make_user, registration):
+    _, token = make_user("admin")
+    emails = [registration["email"], registration["email"].replace("register-", "register-2-")]
+
+    def import_user(email: str) -> dict:
+        content = f"first_name,last_name,email,password,role\ntest,import,{email},{PASSWORD},{registration['role']}\n"
+        response = client.post("/users/bulk-import", headers={"Authorization": f"Bearer {token}"},
+                               files={"file": ("users.csv", io.BytesIO(content.encode()), "text/csv")})
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    try:
+        with client:
+            assert import_user(emails[0])["created_count"] == 1
+            pool = password_pool._IMPORT_HASH_POOL
+            assert import_user(emails[1])["created_count"] == 1
+            assert password_pool._IMPORT_HASH_POOL is pool is not None
+        # stopped with the app
+        assert password_pool._IMPORT_HASH_POOL is None
+    finally:
+        with engine.begin() as conn:
+            conn.execute(delete(user).where(user.c.email == emails[1]))
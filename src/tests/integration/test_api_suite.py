@@ -0,0 +1,37 @@
+import json
+import os
+
+from src.app.config import settings
+from src.benchmarks.api_suite import main, parse_args
+
+# results file of an earlier run (`python -m src.benchmarks.api_suite --output ...`); when set, the
+# suite is rerun with that run's settings and any regression against it (beyond API_BENCHMARK_TOLERANCE)
+# fails the test
+BASELINE = os.getenv("API_BENCHMARK_BASELINE")
+TOLERANCE = os.getenv("API_BENCHMARK_TOLERANCE", "0.2")
+
+
+def test_api_suite_has_no_regressions(database, tmp_path, monkeypatch):
+    # the suite turns the request log writer off, restored for the tests that follow
+    monkeypatch.setattr(settings, "REQUEST_LOGS_ENABLED", settings.REQUEST_LOGS_ENABLED)
+    output = tmp_path / "results.json"
+    if BASELINE:
+        with open(BASELINE) as baseline_file:
+            baseline = json.load(baseline_file)
+        meta = baseline["meta"]
+        argv = ["--sizes", *baseline["sizes"], "--iterations", str(meta["iterations"]),
+                "--logins", str(meta["logins"]), "--upload-rows", str(meta["upload_rows"]),
+                "--baseline", BASELINE, "--tolerance", TOLERANCE]
+    else:
+        # without a baseline the suite only has to run through on a small bank
+        argv = ["--sizes", "50", "--iterations", "3", "--logins", "1", "--warmup", "1",
+                "--memory-samples", "1", "--upload-rows", "10"]
+
+    assert main(parse_args([*argv, "--output", str(output)])) == 0
+
+    with open(output) as output_file:
+        results = json.load(output_file)
+    assert results["sizes"]
+    for routes in results["sizes"].values():
+        assert len(routes) == 6
+        assert all(metrics["requests"] > 0 for metrics in routes.values())
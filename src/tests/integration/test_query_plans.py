@@ -0,0 +1,33 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from src.app.build_db import async_engine
+from src.benchmarks.query_plans import check_plans, seed, unseed
+
+# large enough that Postgres prefers an index over a whole-table scan on every seeded table
+SEED = SimpleNamespace(mcqs=20_000, categories=10, users=10_000, attempts=6_000)
+MIN_ROWS = 5_000
+
+
+@pytest.fixture(scope="module")
+def seeded_lookups(database):
+    if database.dialect.name != "postgresql":
+        pytest.skip("query plans are checked on PostgreSQL only")
+    fixture = seed(SEED, random.Random(0))
+    yield fixture
+    unseed(fixture)
+
+
+async def check(lookups: dict) -> list[str]:
+    # outside the app, so no background task's statements are captured with the checked queries
+    try:
+        return await check_plans(lookups, MIN_ROWS)
+    finally:
+        await async_engine.dispose()
+
+
+def test_hot_path_queries_do_not_scan_large_tables(seeded_lookups):
+    assert asyncio.run(check(seeded_lookups)) == []
@@ -0,0 +1,38 @@
+from src.benchmarks.api_suite import find_regressions
+
+
+def results(p95_ms: float, queries: float, peak_memory_kb: float) -> dict:
+    return {"sizes": {"1000": {"GET /mcq": {
+        "p95_ms": p95_ms, "queries_per_request": queries, "peak_memory_kb": peak_memory_kb,
+    }}}}
+
+
+def test_results_within_tolerance_are_no_regression():
+    baseline = results(10.0, 2.0, 1000.0)
+
+    assert find_regressions(results(12.0, 2.0, 1200.0), baseline, tolerance=0.2) == []
+
+
+def test_slower_or_larger_results_are_regressions():
+    baseline = results(10.0, 2.0, 1000.0)
+
+    regressions = find_regressions(results(13.1, 2.0, 1265.0), baseline, tolerance=0.2)
+
+    assert regressions == ["1000 rows, GET /mcq: p95_ms 10.0 -> 13.1",
+                           "1000 rows, GET /mcq: peak_memory_kb 1000.0 -> 1265.0"]
+
+
+def test_an_extra_query_per_request_is_a_regression():
+    baseline = results(10.0, 2.0, 1000.0)
+
+    assert find_regressions(results(10.0, 2.1, 1000.0), baseline, tolerance=0.2) == []
+    assert find_regressions(results(10.0, 3.0, 1000.0), baseline, tolerance=0.2) == [
+        "1000 rows, GET /mcq: queries_per_request 2.0 -> 3.0"]
+
+
+def test_sizes_and_routes_missing_from_the_baseline_are_skipped():
+    current = results(100.0, 9.0, 9000.0)
+    current["sizes"]["1000"]["GET /category"] = current["sizes"]["1000"].pop("GET /mcq")
+
+    assert find_regressions(current, results(10.0, 2.0, 1000.0), tolerance=0.2) == []
+    assert find_regressions(current, {"sizes": {}}, tolerance=0.2) == []
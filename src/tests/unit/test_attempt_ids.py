@@ -0,0 +1,75 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.app.common import attempt_ids
+from src.app.common.attempt_ids import (
+    SequenceAttemptIdGenerator, SnowflakeAttemptIdGenerator, build_attempt_id_generator
+)
+from src.app.config import settings
+
+SQLITE_ENGINE = SimpleNamespace(dialect=SimpleNamespace(name="sqlite", supports_sequences=False))
+POSTGRESQL_ENGINE = SimpleNamespace(dialect=SimpleNamespace(name="postgresql", supports_sequences=True))
+
+
+@pytest.mark.parametrize("generator, engine", [("snowflake", POSTGRESQL_ENGINE), ("sequence", SQLITE_ENGINE)])
+def test_snowflake_ids_without_node_id_refuse_to_start(generator, engine, monkeypatch):
+    monkeypatch.setattr(attempt_ids, "async_engine", engine)
+    monkeypatch.setattr(attempt_ids, "IS_SQLITE_MEMORY", False)
+    monkeypatch.setattr(settings, "ATTEMPT_ID_GENERATOR", generator)
+    monkeypatch.setattr(settings, "ATTEMPT_ID_NODE_ID", None)
+
+    with pytest.raises(ValueError, match="ATTEMPT_ID_NODE_ID"):
+        build_attempt_id_generator()
+
+
+@pytest.mark.parametrize("generator, engine", [("snowflake", POSTGRESQL_ENGINE), ("sequence", SQLITE_ENGINE)])
+def test_snowflake_ids_use_the_configured_node(generator, engine, monkeypatch):
+    monkeypatch.setattr(attempt_ids, "async_engine", engine)
+    monkeypatch.setattr(settings, "ATTEMPT_ID_GENERATOR", generator)
+    monkeypatch.setattr(settings, "ATTEMPT_ID_NODE_ID", 5)
+
+    ids = build_attempt_id_generator()
+
+    assert isinstance(ids, SnowflakeAttemptIdGenerator)
+    assert ids.node_id == 5
+
+
+def test_in_memory_sqlite_defaults_to_node_zero(monkeypatch):
+    monkeypatch.setattr(attempt_ids, "async_engine", SQLITE_ENGINE)
+    monkeypatch.setattr(attempt_ids, "IS_SQLITE_MEMORY", True)
+    monkeypatch.setattr(settings, "ATTEMPT_ID_GENERATOR", "sequence")
+    monkeypatch.setattr(settings, "ATTEMPT_ID_NODE_ID", None)
+
+    ids = build_attempt_id_generator()
+
+    assert isinstance(ids, SnowflakeAttemptIdGenerator)
+    assert ids.node_id == 0
+
+
+def test_sequence_ids_need_no_node_id(monkeypatch):
+    monkeypatch.setattr(attempt_ids, "async_engine", POSTGRESQL_ENGINE)
+    monkeypatch.setattr(settings, "ATTEMPT_ID_GENERATOR", "sequence")
+    monkeypatch.setattr(settings, "ATTEMPT_ID_NODE_ID", None)
+
+    assert isinstance(build_attempt_id_generator(), SequenceAttemptIdGenerator)
+
+
+def test_snowflake_ids_do_not_wait_for_a_clock_that_steps_back(monkeypatch):
+    ids = SnowflakeAttemptIdGenerator(3)
+    now_ns = [1_800_000_000_000 * 1_000_000]
+    monkeypatch.setattr(attempt_ids, "time", SimpleNamespace(time_ns=lambda: now_ns[0]))
+
+    async def take(count: int) -> list[int]:
+        return [await ids.next_id(None) for _ in range(count)]
+
+    issued = asyncio.run(take(10))
+    now_ns[0] -= 5_000 * 1_000_000
+    # the counter overflows several times while the clock stays behind the last id
+    issued += asyncio.run(take(500))
+
+    assert issued == sorted(issued)
+    assert len(set(issued)) == len(issued)
+    node_mask = (1 << attempt_ids.ATTEMPT_ID_NODE_BITS) - 1
+    assert {attempt_id >> attempt_ids.ATTEMPT_ID_COUNTER_BITS & node_mask for attempt_id in issued} == {3}
@@ -0,0 +1,127 @@
+import csv
+import io
+
+import pytest
+
+from src.app.common.csv_validation import parse_list_literal, validate_mcq_rows
+from src.benchmarks.csv_validation_benchmark import read_chunk, validate_per_row
+
+HEADER = ["sno", "Question", "Options", "Correct_options", "Category"]
+VALID_ROW = {"Question": "  Capital of France?  ", "Options": "['Paris', 'London']",
+             "Correct_options": "['Paris']", "Category": "3"}
+
+# one unusual cell per case, the rest of the row valid
+CASES = [
+    ("Options", "['a', 'b'"),                    # unclosed list
+    ("Options", "['a' 'b']"),                    # missing comma, implicit concatenation
+    ("Options", "['a',, 'b']"),                  # syntax error
+    ("Options", "('Paris', 'London')"),          # tuple
+    ("Options", "'Paris'"),                      # bare string
+    ("Options", "['Paris', 1]"),                 # non-string item
+    ("Options", "['Paris', None]"),              # None item
+    ("Options", "['Paris', ['London']]"),        # nested list
+    ("Options", "[\"it's\", 'Paris']"),          # quotes
+    ("Options", "['Par\\'is', 'Paris']"),        # escapes
+    ("Options", "[]"),                           # empty list
+    ("Options", ""),                             # blank cell
+    ("Options", "  ['Paris', 'London']  "),      # surrounding spaces
+    ("Correct_options", "['Rome']"),             # answer outside the options
+    ("Correct_options", "['paris']"),            # answer differing in case only
+    ("Correct_options", "['Paris', 'Rome']"),    # partly outside the options
+    ("Correct_options", "[1]"),                  # non-string answer
+    ("Correct_options", "[None]"),               # None answer
+    ("Correct_options", "[]"),                   # no correct option
+    ("Correct_options", "['Paris',]"),           # trailing comma
+    ("Correct_options", ""),                     # blank cell
+    ("Category", "abc"),                         # not a number
+    ("Category", "2.5"),                         # not an integer
+    ("Category", ""),                            # blank cell
+    ("Question", "   "),                         # blank question
+]
+
+
+def chunk_of(*rows: dict):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADER)
+    for n, row in enumerate(rows):
+        writer.writerow([n, row["Question"], row["Options"], row["Correct_options"], row["Category"]])
+    return read_chunk(buffer.getvalue().encode())
+
+
+def column_wise(chunk, row_offset: int = 0) -> tuple[list[dict], list[tuple[int, dict]]]:
+    staged, failed = validate_mcq_rows(chunk, row_offset)
+    rows = [
+        {key: (int(value) if key in ("row_no", "category") else value) for key, value in row.items()}
+        for row in staged.to_dict("records")
+    ]
+    return rows, failed
+
+
+@pytest.mark.parametrize("column, cell", CASES)
+def test_column_wise_validation_matches_row_loop(column, cell):
+    chunk = chunk_of(VALID_ROW, {**VALID_ROW, column: cell}, VALID_ROW)
+
+    assert column_wise(chunk, 10) == validate_per_row(chunk, 10)
+
+
+def test_mixed_chunk_matches_row_loop():
+    chunk = chunk_of(*[{**VALID_ROW, "Question": f"Question {n}?", column: cell}
+                       for n, (column, cell) in enumerate(CASES)])
+
+    staged, failed = column_wise(chunk)
+    expected_staged, expected_failed = validate_per_row(chunk, 0)
+    assert failed == expected_failed
+    assert staged == expected_staged
+    assert failed and any(row["error"] for row in staged)
+
+
+def test_missing_question_is_an_error_record():
+    # the row loop raised on the blank cell (NaN has no strip) and failed the whole upload
+    chunk = chunk_of(VALID_ROW, {**VALID_ROW, "Question": ""})
+
+    staged, failed = column_wise(chunk)
+
+    assert [row["row_no"] for row in staged] == [0]
+    assert failed == [(1, {"question": "", "error": "Bad format:Question is missing"})]
+
+
+def test_scalar_options_are_an_invalid_row():
+    # the row loop raised iterating the scalar and failed the whole upload
+    chunk = chunk_of(VALID_ROW, {**VALID_ROW, "Options": "5"})
+
+    staged, failed = column_wise(chunk)
+
+    assert failed == []
+    assert staged[0]["error"] is None
+    assert staged[1]["error"]
+
+
+@pytest.mark.parametrize("text", [
+    "['a', 'b']", "[\"a\", 'b',]", "('a',)", "'a'", "[1, 2.5, None, True]", "  ['a']",
+    "['a'", "['a',, 'b']", "", "[",
+])
+def test_parse_list_literal_matches_eval(text):
+    try:
+        expected = eval(text)
+    except Exception as e:
+        with pytest.raises(type(e)) as raised:
+            parse_list_literal(text)
+        assert str(raised.value) == str(e)
+    else:
+        assert parse_list_literal(text) == expected
+
+
+@pytest.mark.parametrize("value", [None, 3, 2.5])
+def test_parse_list_literal_rejects_non_strings_like_eval(value):
+    with pytest.raises(TypeError) as raised:
+        parse_list_literal(value)
+    with pytest.raises(TypeError) as expected:
+        eval(value)
+    assert str(raised.value) == str(expected.value)
+
+
+@pytest.mark.parametrize("text", ["[a, b]", "__import__('os').getcwd()", "[len('a')]", "['a'] ['b']"])
+def test_parse_list_literal_does_not_execute_code(text):
+    with pytest.raises(ValueError, match="not a literal"):
+        parse_list_literal(text)